@@ -0,0 +1,419 @@
+"""
+Token-Craft Analysis Server
+
+Optional long-lived local server that keeps parsed state warm between
+/token-craft invocations:
+- History is parsed once, then only newly appended lines are read (from
+  the compacted history when one exists, like in-process runs)
+- stats-cache.json is re-read only when it changes on disk
+- Profile and latest snapshot stay in memory (reloaded if changed externally)
+
+Clients talk JSON lines over a Unix socket. run_noninteractive.py uses
+request_report() and falls back to in-process analysis when no server
+accepts the request (or on platforms without Unix sockets). Once the
+server has the request it runs, and persists, the analysis, so the
+client never falls back: it waits, then reports the server as busy.
+
+Usage:
+    python analysis_server.py start       # serve in the foreground
+    python analysis_server.py status
+    python analysis_server.py stop
+"""
+
+import io
+import json
+import os
+import socket
+import sys
+import threading
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from token_craft.history_compactor import HistoryCompactor, history_reader
+from token_craft.history_segments import SegmentedHistory
+from token_craft.records import Message, parse_history_lines
+
+DEFAULT_SOCKET = Path.home() / ".claude" / "token-craft" / "analysis.sock"
+
+REPORT_MODES = ("quick", "summary", "full", "v3")
+
+# Client timeouts: no connection within CONNECT_TIMEOUT_SEC means no
+# server (analyze in-process); a report not back within REPORT_TIMEOUT_SEC
+# is ServerBusy (never analyzed twice)
+CONNECT_TIMEOUT_SEC = 1.0
+REPORT_TIMEOUT_SEC = 120.0
+
+
+class ServerBusy(RuntimeError):
+    """The server took a request but did not answer it in time."""
+
+
+class HistoryTail:
+    """
+    History parsed incrementally, from the same source as in-process runs.
+
+    Reads the compacted history (history_compactor) when one exists, as
+    history_reader() does for cold runs, else history.jsonl from the last
+    byte offset read (after its archived segments).
+    """
+
+    def __init__(self, path: Path):
+        """
+        Initialize tail reader (nothing is read until refresh()).
+
+        Args:
+            path: history.jsonl path
+        """
+        self.path = Path(path)
+        self.entries = []
+        self._offset = 0
+        self._file_id = None
+        self._tail_entry = None  # Parsed last line that has no newline yet
+        self._compact_position = None  # Set while following the compact file
+
+    def _reset(self):
+        self.entries = []
+        self._offset = 0
+        self._file_id = None
+        self._tail_entry = None
+        self._compact_position = None
+
+    def refresh(self) -> int:
+        """
+        Read history appended since the last refresh.
+
+        Returns:
+            Number of new entries
+        """
+        reader = history_reader(self.path)
+        if isinstance(reader, HistoryCompactor):
+            return self._refresh_compact(reader)
+        if self._compact_position is not None:
+            self._reset()  # Compact file removed: back to the raw history
+        return self._refresh_raw()
+
+    def _refresh_compact(self, compactor: HistoryCompactor) -> int:
+        """Follow the compact file (compacting new history.jsonl lines first)."""
+        if self._compact_position is None:
+            self._reset()
+        messages, self._compact_position, restarted = compactor.tail(self._compact_position)
+        if restarted:
+            self.entries = messages
+        else:
+            self.entries.extend(messages)
+        return len(messages)
+
+    def _refresh_raw(self) -> int:
+        """
+        Read history.jsonl lines appended since the last refresh.
+
+        The file is re-read from the start if it was replaced or truncated
+        (e.g. rotated), after the archived segments (history.jsonl.1,
+        .2.gz, ...), which are read once per rotation.
+        """
+        try:
+            st = self.path.stat()
+        except OSError:
+            self._reset()
+            return 0
+
+        file_id = (st.st_dev, st.st_ino)
+        archived = 0
+        if file_id != self._file_id or st.st_size < self._offset:
+            self._reset()
+            self._file_id = file_id
+            self.entries = list(SegmentedHistory(self.path).messages(archived_only=True))
+            archived = len(self.entries)
+
+        self._tail_entry = None
+        if st.st_size == self._offset:
+            return archived
+
+        with open(self.path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+
+        # Only consume complete lines; a trailing partial line is parsed
+        # for this refresh but re-read next time
+        end = data.rfind(b"\n") + 1
+        before = len(self.entries)
+        self.entries.extend(self._parse(data[:end]))
+        self._offset += end
+
+        partial = self._parse(data[end:])
+        if partial:
+            self._tail_entry = partial[0]
+
+        return archived + len(self.entries) - before + len(partial)
+
+    @staticmethod
+    def _parse(data: bytes) -> List[Message]:
+        return list(parse_history_lines(data.decode("utf-8", errors="replace").splitlines()))
+
+    def get_entries(self) -> List[Message]:
+        """All parsed entries, same as a full read of the file."""
+        if self._tail_entry is not None:
+            return self.entries + [self._tail_entry]
+        return self.entries
+
+
+class AnalysisServer:
+    """Serve Token-Craft reports from warm in-memory state."""
+
+    def __init__(self, socket_path: Optional[Path] = None, claude_dir: Optional[Path] = None):
+        """
+        Initialize server (not listening yet).
+
+        Args:
+            socket_path: Unix socket path (default: ~/.claude/token-craft/analysis.sock)
+            claude_dir: Claude data directory (default: ~/.claude)
+        """
+        from skill_handler import TokenCraftHandler
+        from token_craft.session_columns import preload_numpy
+
+        preload_numpy()  # Paid once here, so columns vectorize from NUMPY_MIN_ROWS
+        self.socket_path = Path(socket_path) if socket_path else DEFAULT_SOCKET
+        self.handler = TokenCraftHandler(claude_dir)
+        self.history = HistoryTail(self.handler.history_file)
+        self.requests_served = 0
+
+        self._stats_data = {}
+        self._stats_id = None
+        self._profile_mtime = self._mtime(self.handler.profile.profile_path)
+        self._sock = None
+        self._stop = threading.Event()
+
+    @staticmethod
+    def _mtime(path: Path) -> Optional[int]:
+        try:
+            return path.stat().st_mtime_ns
+        except OSError:
+            return None
+
+    def _load_stats(self) -> Dict:
+        """Re-read stats-cache.json only if it changed."""
+        stats_file = self.handler.stats_file
+        try:
+            st = stats_file.stat()
+        except OSError:
+            self._stats_data, self._stats_id = {}, None
+            return self._stats_data
+
+        stats_id = (st.st_mtime_ns, st.st_size)
+        if stats_id != self._stats_id:
+            try:
+                with open(stats_file, "r", encoding="utf-8") as f:
+                    self._stats_data = json.load(f)
+            except Exception as e:
+                print(f"Warning: Could not load stats-cache.json: {e}")
+                self._stats_data = {}
+            self._stats_id = stats_id
+
+        return self._stats_data
+
+    def analyze(self, mode: str) -> Dict:
+        """
+        Produce a report from warm state.
+
+        Args:
+            mode: One of REPORT_MODES
+
+        Returns:
+            Dict with the report and the progress output the run printed
+        """
+        profile = self.handler.profile
+        if self._mtime(profile.profile_path) != self._profile_mtime:
+            # Another process (in-process fallback) updated the profile
+            profile.reload()
+
+        self.history.refresh()
+        data = (self.history.get_entries(), self._load_stats())
+
+        output = io.StringIO()
+        with redirect_stdout(output):
+            report = self.handler.run(mode=mode, data=data)
+
+        self._profile_mtime = self._mtime(profile.profile_path)
+        self.requests_served += 1
+        return {"report": report, "output": output.getvalue()}
+
+    def handle_request(self, request: Dict) -> Dict:
+        """Dispatch one decoded client request."""
+        command = request.get("command", "report")
+
+        if command == "report":
+            mode = request.get("mode", "full")
+            if mode not in REPORT_MODES:
+                return {"error": f"Unknown mode: {mode}"}
+            return self.analyze(mode)
+        if command == "status":
+            return {
+                "pid": os.getpid(),
+                "history_entries": len(self.history.get_entries()),
+                "requests_served": self.requests_served,
+            }
+        if command == "stop":
+            self._stop.set()
+            return {"stopping": True}
+
+        return {"error": f"Unknown command: {command}"}
+
+    def serve_forever(self):
+        """Listen on the socket and answer requests one at a time."""
+        self.socket_path.parent.mkdir(parents=True, exist_ok=True)
+        if self.socket_path.exists():
+            if _ping(self.socket_path):
+                raise RuntimeError(f"Analysis server already running on {self.socket_path}")
+            self.socket_path.unlink()  # Stale socket from a crashed server
+
+        # Warm up before accepting connections
+        self.history.refresh()
+        self._load_stats()
+
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(str(self.socket_path))
+        os.chmod(str(self.socket_path), 0o600)
+        self._sock.listen(8)
+        self._sock.settimeout(0.5)
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    conn, _ = self._sock.accept()
+                except socket.timeout:
+                    continue
+                with conn:
+                    conn.settimeout(None)
+                    self._serve_connection(conn)
+        finally:
+            self._sock.close()
+            try:
+                self.socket_path.unlink()
+            except OSError:
+                pass
+
+    def _serve_connection(self, conn: socket.socket):
+        stream = conn.makefile("rwb")
+        try:
+            line = stream.readline()
+            try:
+                response = self.handle_request(json.loads(line))
+            except Exception as e:
+                response = {"error": str(e)}
+            stream.write(json.dumps(response).encode("utf-8") + b"\n")
+            stream.flush()
+        except OSError:
+            pass  # Client went away
+        finally:
+            stream.close()
+
+    def stop(self):
+        """Ask serve_forever() to return."""
+        self._stop.set()
+
+
+def _send(socket_path: Path, request: Dict, timeout: Optional[float],
+          connect_timeout: Optional[float] = CONNECT_TIMEOUT_SEC) -> Optional[Dict]:
+    """
+    Send one request.
+
+    Args:
+        socket_path: Server socket
+        request: Request object
+        timeout: Seconds to wait for the response once connected
+        connect_timeout: Seconds to wait for the connection
+
+    Returns:
+        The response, or None if no server accepted the connection
+
+    Raises:
+        ServerBusy: Connected, but no (valid) response within timeout
+    """
+    if not hasattr(socket, "AF_UNIX") or not socket_path.exists():
+        return None
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.settimeout(connect_timeout)
+            sock.connect(str(socket_path))
+        except OSError:
+            return None
+
+        try:
+            sock.settimeout(timeout)
+            sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as stream:
+                line = stream.readline()
+            return json.loads(line)
+        except (OSError, ValueError) as e:
+            raise ServerBusy(f"Analysis server at {socket_path} did not answer: {e or 'no response'}") from e
+
+
+def _ping(socket_path: Path) -> bool:
+    try:
+        return _send(socket_path, {"command": "status"}, timeout=2) is not None
+    except ServerBusy:
+        return True  # Listening, just busy
+
+
+def request_report(mode: str, socket_path: Optional[Path] = None,
+                   timeout: float = REPORT_TIMEOUT_SEC) -> Optional[Dict]:
+    """
+    Ask a running analysis server for a report.
+
+    Args:
+        mode: Report mode ('quick', 'summary', 'full' or 'v3')
+        socket_path: Server socket (default: ~/.claude/token-craft/analysis.sock)
+        timeout: Seconds to wait for the report once the server has the request
+
+    Returns:
+        Dict with "report" and "output", or None if no server accepted
+        the request or it rejected it (callers then analyze in-process)
+
+    Raises:
+        ServerBusy: The server has the request but did not answer in time;
+            it may still be analyzing (and saving), so do not analyze again
+    """
+    response = _send(Path(socket_path) if socket_path else DEFAULT_SOCKET,
+                     {"command": "report", "mode": mode}, timeout)
+    if response is None or "error" in response:
+        return None
+    return response
+
+
+def main():
+    """Command-line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Token-Craft warm analysis server")
+    parser.add_argument("command", choices=["start", "status", "stop"])
+    parser.add_argument("--socket", help="Unix socket path")
+    args = parser.parse_args()
+
+    socket_path = Path(args.socket) if args.socket else DEFAULT_SOCKET
+
+    if args.command == "start":
+        if not hasattr(socket, "AF_UNIX"):
+            print("Unix sockets are not available on this platform.")
+            sys.exit(1)
+        server = AnalysisServer(socket_path)
+        print(f"Token-Craft analysis server listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    else:
+        try:
+            response = _send(socket_path, {"command": args.command}, timeout=5)
+        except ServerBusy as e:
+            print(f"{e} (busy with a report?)")
+            sys.exit(1)
+        if response is None:
+            print("No analysis server running.")
+            sys.exit(1)
+        print(json.dumps(response, indent=2))
+
+
+if __name__ == "__main__":
+    main()
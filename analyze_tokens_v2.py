@@ -16,83 +16,81 @@ from pathlib import Path
 from datetime import datetime
 import re
 
-# Category definitions with keywords
-CATEGORIES = {
-    'Git Operations': ['git', 'commit', 'push', 'pull', 'merge', 'branch', 'clone', 'rebase', 'checkout'],
-    'File Operations': ['read', 'write', 'edit', 'file', 'directory', 'folder', 'create file', 'delete file'],
-    'Code Writing': ['implement', 'add feature', 'create function', 'write code', 'develop', 'build'],
-    'Debugging/Fixing': ['fix', 'bug', 'error', 'issue', 'debug', 'problem', 'not working', 'failing'],
-    'Web Scraping/API': ['scrape', 'api', 'fetch', 'request', 'endpoint', 'curl', 'http'],
-    'Search/Exploration': ['search', 'find', 'look for', 'explore', 'show me', 'list', 'where is'],
-    'Refactoring': ['refactor', 'clean up', 'reorganize', 'restructure', 'optimize', 'improve code'],
-    'Documentation': ['document', 'readme', 'comment', 'explain', 'describe'],
-    'Configuration': ['config', 'setup', 'install', 'configure', 'settings'],
-    'Data Processing': ['analyze', 'parse', 'process data', 'calculate', 'statistics', 'csv', 'json', 'transform'],
-    'Testing': ['test', 'pytest', 'unit test', 'integration test'],
-}
-
-WORK_TYPES = {
-    'Coding': ['implement', 'write code', 'function', 'class', 'develop', 'build', 'create'],
-    'Data Processing': ['parse', 'transform', 'csv', 'json', 'data', 'process', 'analyze data'],
-    'DevOps': ['deploy', 'docker', 'kubernetes', 'ci/cd', 'pipeline', 'build'],
-    'Research': ['explore', 'investigate', 'understand', 'how does', 'what is', 'explain'],
-    'Maintenance': ['fix', 'bug', 'refactor', 'clean up', 'update', 'upgrade'],
-}
+from token_craft import profiler
+from token_craft.categories import CATEGORIES, WORK_TYPES, categorize_message, categorize_work_type
+from token_craft.line_scanner import PROMPT_KEYS, scan_lines
+from token_craft.records import Codebook, Message, ProjectCodebook
 
 def load_history_with_metadata(history_path):
-    """Load history with full metadata."""
+    """
+    Load history with full metadata.
+
+    Session IDs and project paths are dictionary-encoded: both returned
+    dicts are keyed by small integer session codes, and each session's
+    metadata carries its project's display-name code and name.
+    """
     sessions = defaultdict(list)
     session_metadata = {}
+    session_codes = Codebook()
+    projects = ProjectCodebook()
 
-    with open(history_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            try:
-                entry = json.loads(line.strip())
-                if 'sessionId' in entry and 'display' in entry:
-                    session_id = entry['sessionId']
-                    sessions[session_id].append({
-                        'message': entry['display'],
+    # Lines without the prompt keys are skipped before decoding
+    for line in scan_lines(history_path, require=PROMPT_KEYS):
+        try:
+            entry = json.loads(line.decode('utf-8', errors='replace'))
+            if 'sessionId' in entry and 'display' in entry:
+                message = Message.from_entry(entry)
+                session_code = session_codes.encode(message.session_id)
+                sessions[session_code].append(message)
+
+                # Store metadata once per session
+                if session_code not in session_metadata:
+                    project_code = projects.encode(entry.get('project', 'Unknown'))
+                    session_metadata[session_code] = {
+                        'session_id': message.session_id,
+                        'project': projects.decode(project_code),
+                        'name_code': projects.name_codes[project_code],
+                        'project_name': projects.name(project_code),
                         'timestamp': entry.get('timestamp', 0)
-                    })
-
-                    # Store metadata once per session
-                    if session_id not in session_metadata:
-                        session_metadata[session_id] = {
-                            'project': entry.get('project', 'Unknown'),
-                            'timestamp': entry.get('timestamp', 0)
-                        }
-            except json.JSONDecodeError:
-                continue
+                    }
+        except json.JSONDecodeError:
+            continue
 
     return sessions, session_metadata
 
 def select_scope(sessions, session_metadata):
-    """Interactive scope selection for projects and users."""
+    """
+    Interactive scope selection for projects and users.
+
+    Returns:
+        Set of selected project name codes (see load_history_with_metadata)
+    """
     print("\n" + "=" * 70)
     print("[*] SCOPE SELECTION")
     print("=" * 70)
 
-    # Extract unique projects
+    # Extract unique projects (keyed by name code, in first-seen order)
     projects = {}
-    for session_id, metadata in session_metadata.items():
-        project_path = metadata['project']
-        project_name = Path(project_path).name if project_path != 'Unknown' else 'Unknown'
-        if project_name not in projects:
-            projects[project_name] = {
-                'path': project_path,
+    for session_code, metadata in session_metadata.items():
+        name_code = metadata['name_code']
+        pstats = projects.get(name_code)
+        if pstats is None:
+            pstats = projects[name_code] = {
+                'name': metadata['project_name'],
+                'path': metadata['project'],
                 'sessions': 0,
                 'messages': 0
             }
-        projects[project_name]['sessions'] += 1
-        projects[project_name]['messages'] += len(sessions[session_id])
+        pstats['sessions'] += 1
+        pstats['messages'] += len(sessions[session_code])
 
     # Display projects
     print("\nAvailable projects:")
     print(f"  [0] ALL PROJECTS ({len(projects)} total)")
 
     project_list = sorted(projects.items(), key=lambda x: x[1]['sessions'], reverse=True)
-    for idx, (name, stats) in enumerate(project_list, 1):
-        print(f"  [{idx}] {name}")
+    for idx, (name_code, stats) in enumerate(project_list, 1):
+        print(f"  [{idx}] {stats['name']}")
         print(f"      Sessions: {stats['sessions']}, Messages: {stats['messages']}")
 
     # Get project selection
@@ -109,41 +107,13 @@ def select_scope(sessions, session_metadata):
             for idx in indices:
                 if 1 <= idx <= len(project_list):
                     selected_projects.add(project_list[idx-1][0])
-            print(f"\n[+] Selected: {', '.join(selected_projects)}")
+            print(f"\n[+] Selected: {', '.join(projects[code]['name'] for code in selected_projects)}")
         except ValueError:
             print("[!] Invalid selection. Using all projects.")
             selected_projects = set(projects.keys())
 
     return selected_projects
 
-def categorize_message(message_text):
-    """Categorize a message based on keywords."""
-    message_lower = message_text.lower()
-    categories = []
-
-    for category, keywords in CATEGORIES.items():
-        if any(keyword in message_lower for keyword in keywords):
-            categories.append(category)
-
-    if not categories:
-        categories.append('Other')
-
-    return categories
-
-def categorize_work_type(message_text):
-    """Determine work type from message."""
-    message_lower = message_text.lower()
-    work_types = []
-
-    for work_type, keywords in WORK_TYPES.items():
-        if any(keyword in message_lower for keyword in keywords):
-            work_types.append(work_type)
-
-    if not work_types:
-        work_types.append('General')
-
-    return work_types
-
 def analyze_scope(sessions, session_metadata, selected_projects, stats):
     """Perform thorough analysis on selected scope."""
     print("\n" + "=" * 70)
@@ -152,51 +122,56 @@ def analyze_scope(sessions, session_metadata, selected_projects, stats):
     print("\nAnalyzing patterns, work types, and optimization opportunities...")
 
     filtered_sessions = {}
-    project_stats = defaultdict(lambda: {
-        'sessions': 0,
-        'messages': 0,
-        'categories': defaultdict(int),
-        'work_types': defaultdict(int),
-        'avg_msg_length': 0,
-        'total_chars': 0
-    })
+    project_stats_by_code = {}
+    project_names = {}
 
     category_counts = defaultdict(int)
     work_type_counts = defaultdict(int)
 
-    # Filter and analyze sessions
-    for session_id, messages in sessions.items():
-        metadata = session_metadata.get(session_id, {})
-        project_path = metadata.get('project', 'Unknown')
-        project_name = Path(project_path).name if project_path != 'Unknown' else 'Unknown'
-
-        if project_name not in selected_projects:
+    # Filter and analyze sessions (project name codes from load time)
+    for session_code, messages in sessions.items():
+        metadata = session_metadata.get(session_code)
+        if metadata is None or metadata['name_code'] not in selected_projects:
             continue
 
-        filtered_sessions[session_id] = messages
+        filtered_sessions[session_code] = messages
 
         # Analyze messages
-        all_messages_text = ' '.join([msg['message'] for msg in messages])
+        all_messages_text = ' '.join([msg.display for msg in messages])
         categories = categorize_message(all_messages_text)
         work_types = categorize_work_type(all_messages_text)
 
         # Update stats
-        project_stats[project_name]['sessions'] += 1
-        project_stats[project_name]['messages'] += len(messages)
-        project_stats[project_name]['total_chars'] += len(all_messages_text)
+        name_code = metadata['name_code']
+        pstats = project_stats_by_code.get(name_code)
+        if pstats is None:
+            pstats = project_stats_by_code[name_code] = {
+                'sessions': 0,
+                'messages': 0,
+                'categories': defaultdict(int),
+                'work_types': defaultdict(int),
+                'avg_msg_length': 0,
+                'total_chars': 0
+            }
+            project_names[name_code] = metadata['project_name']
+        pstats['sessions'] += 1
+        pstats['messages'] += len(messages)
+        pstats['total_chars'] += len(all_messages_text)
 
         for category in categories:
             category_counts[category] += 1
-            project_stats[project_name]['categories'][category] += 1
+            pstats['categories'][category] += 1
 
         for work_type in work_types:
             work_type_counts[work_type] += 1
-            project_stats[project_name]['work_types'][work_type] += 1
+            pstats['work_types'][work_type] += 1
 
-    # Calculate averages
-    for project_name, pstats in project_stats.items():
+    # Calculate averages; reports and snapshots are keyed by project name
+    project_stats = {}
+    for name_code, pstats in project_stats_by_code.items():
         if pstats['messages'] > 0:
             pstats['avg_msg_length'] = pstats['total_chars'] / pstats['messages']
+        project_stats[project_names[name_code]] = pstats
 
     return {
         'filtered_sessions': filtered_sessions,
@@ -718,14 +693,19 @@ def main():
     stats_path = claude_dir / 'stats-cache.json'
 
     print("\nLoading conversation history...")
-    sessions, session_metadata = load_history_with_metadata(history_path)
+    with profiler.stage("load.history") as st:
+        sessions, session_metadata = load_history_with_metadata(history_path)
+        st.count("sessions_built", len(sessions))
+        st.count("messages_parsed", sum(len(msgs) for msgs in sessions.values()))
 
     print("Loading token statistics...")
-    with open(stats_path, 'r', encoding='utf-8') as f:
-        stats = json.load(f)
+    with profiler.stage("load.stats"):
+        with open(stats_path, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
 
     # Check for previous snapshot
-    previous_snapshot = load_previous_snapshot()
+    with profiler.stage("load.snapshot"):
+        previous_snapshot = load_previous_snapshot()
     if previous_snapshot:
         print(f"\n[+] Found previous snapshot from {previous_snapshot['datetime']}")
         compare = input("Compare with previous snapshot? (y/n): ").strip().lower()
@@ -739,10 +719,13 @@ def main():
     selected_projects = select_scope(sessions, session_metadata)
 
     # Phase 2: Thorough Analysis
-    analysis = analyze_scope(sessions, session_metadata, selected_projects, stats)
+    with profiler.stage("score.analyze_scope") as st:
+        analysis = analyze_scope(sessions, session_metadata, selected_projects, stats)
+        st.count("sessions_analyzed", analysis['total_sessions'])
 
     # Phase 3: Display Breakdown
-    display_analysis_breakdown(analysis, stats)
+    with profiler.stage("render.breakdown"):
+        display_analysis_breakdown(analysis, stats)
 
     # Ask if user wants to continue to optimization
     print("\n" + "=" * 70)
@@ -752,7 +735,8 @@ def main():
         return
 
     # Phase 4: Identify Opportunities
-    opportunities = identify_optimization_opportunities(analysis, stats)
+    with profiler.stage("score.opportunities"):
+        opportunities = identify_optimization_opportunities(analysis, stats)
 
     # Phase 5: Interactive Selection
     selected_optimizations = interactive_optimization_selection(opportunities)
@@ -767,7 +751,8 @@ def main():
         applied = apply_selected_optimizations(selected_optimizations, analysis['project_stats'])
 
         # Phase 7: Save Snapshot
-        snapshot_file = save_snapshot(analysis, selected_optimizations, analysis['project_stats'])
+        with profiler.stage("persist.snapshot"):
+            snapshot_file = save_snapshot(analysis, selected_optimizations, analysis['project_stats'])
 
         print("\n" + "=" * 70)
         print("[*] COMPLETE")
@@ -782,6 +767,8 @@ def main():
         compare_with_previous(analysis, previous_snapshot)
 
 if __name__ == '__main__':
+    # --profile[=FILE] prints stage timings (interactive prompts excluded) on exit
+    profiler.configure_from_argv(sys.argv)
     try:
         main()
     except KeyboardInterrupt:
@@ -0,0 +1,6 @@
+"""
+Token-Craft benchmarks.
+
+Run individual benchmarks as modules from the repository root, e.g.:
+    python -m benchmarks.import_time
+"""
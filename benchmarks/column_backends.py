@@ -0,0 +1,117 @@
+"""
+Column Backend Crossover Benchmark
+
+Times the scorer's per-run column workload (token_craft.session_columns:
+build the columns, filter, head/tail means, tolist) on the list and NumPy
+backends at several row counts, and measures the NumPy import in a fresh
+interpreter. From these it reports the two thresholds session_columns
+uses:
+- warm: smallest size where NumPy (already imported) is faster
+- cold: size where NumPy's savings pay for importing it
+
+Usage:
+    python -m benchmarks.column_backends
+    python -m benchmarks.column_backends --sizes 100,1000,100000 --json
+"""
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.import_time import measure_import
+from token_craft.session_columns import HAS_NUMPY, Column
+
+DEFAULT_SIZES = [50, 100, 200, 500, 1000, 10000, 100000, 500000]
+
+
+def scorer_workload(values: List[int], use_numpy: bool):
+    """Column operations of one TokenCraftScorer run (five columns)."""
+    columns = [Column(values, use_numpy) for _ in range(5)]
+    columns[0].total()
+    tokens = columns[1].positive()
+    third = len(tokens) // 3
+    tokens.head(third).mean()
+    tokens.tail(third).mean()
+    tokens.tolist()
+    columns[2].positive().tolist()
+    columns[3].head(third).total()
+    columns[4].tail(third).total()
+    columns[0].tolist()
+
+
+def time_backends(rows: int, repeat: int = 9) -> Dict:
+    """Median workload time per backend, in ms."""
+    rng = random.Random(rows)
+    values = [rng.randint(0, 50000) for _ in range(rows)]
+    result = {"rows": rows}
+
+    for name, use_numpy in (("list_ms", False), ("numpy_ms", True)):
+        scorer_workload(values, use_numpy)  # Warm-up (and NumPy import)
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            scorer_workload(values, use_numpy)
+            times.append(time.perf_counter() - start)
+        result[name] = round(statistics.median(times) * 1000, 3)
+
+    return result
+
+
+def crossover(results: List[Dict], import_ms: float) -> Dict:
+    """
+    Thresholds from the timings.
+
+    warm is the first size from which NumPy stays faster; cold
+    extrapolates the per-row saving at the largest size to the import
+    cost.
+    """
+    warm = None
+    for r in reversed(results):
+        if r["numpy_ms"] >= r["list_ms"]:
+            break
+        warm = r["rows"]
+
+    largest = results[-1]
+    saving_per_row = (largest["list_ms"] - largest["numpy_ms"]) / largest["rows"]
+    cold = int(import_ms / saving_per_row) if saving_per_row > 0 else None
+    return {"warm_rows": warm, "cold_rows": cold}
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Measure the list/NumPy column crossover")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES),
+                        help="Comma-separated row counts")
+    parser.add_argument("--repeat", type=int, default=9, help="Timed runs per size and backend")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    if not HAS_NUMPY:
+        print("numpy is not installed; nothing to compare", file=sys.stderr)
+        sys.exit(1)
+
+    sizes = sorted(int(s) for s in args.sizes.split(","))
+    results = [time_backends(rows, args.repeat) for rows in sizes]
+    import_ms = measure_import("numpy")["total_ms"]
+    summary = dict(crossover(results, import_ms), numpy_import_ms=import_ms)
+
+    if args.json:
+        print(json.dumps({"results": results, **summary}, indent=2))
+    else:
+        for r in results:
+            print(f"{r['rows']:>9} rows  list {r['list_ms']:9.3f} ms  numpy {r['numpy_ms']:9.3f} ms")
+        print(f"\nnumpy import: {import_ms:.1f} ms")
+        print(f"warm crossover: {summary['warm_rows']} rows")
+        print(f"cold crossover: ~{summary['cold_rows']} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Import-Time Benchmark
+
+Measures CLI startup cost with `python -X importtime` in a fresh
+interpreter per target, so results are not skewed by modules already
+loaded in the calling process.
+
+Usage:
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time skill_handler --top 15
+    python -m benchmarks.import_time --max-ms 60 --json
+"""
+
+import argparse
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_TARGETS = [
+    "token_craft",
+    "token_craft.scoring_engine",
+    "skill_handler",
+    "skill_handler_full",
+]
+
+# "import time: self [us] | cumulative | imported package"
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S.*)$")
+
+
+def measure_import(module: str, runs: int = 3) -> Dict:
+    """
+    Measure the import cost of one module.
+
+    Args:
+        module: Dotted module name importable from the repository root
+        runs: Fresh interpreters to start; the fastest run is reported
+
+    Returns:
+        Dict with total_ms and the per-module self/cumulative times
+    """
+    best = None
+
+    for _ in range(max(1, runs)):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            cwd=str(REPO_ROOT),
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {module} failed:\n{proc.stderr.strip()[-2000:]}")
+
+        modules = []
+        for line in proc.stderr.splitlines():
+            match = _LINE_RE.match(line)
+            if match:
+                modules.append({
+                    "module": match.group(4).strip(),
+                    "self_us": int(match.group(1)),
+                    "cumulative_us": int(match.group(2)),
+                    "depth": len(match.group(3)) // 2,
+                })
+
+        # Top-level entries (depth 0) sum to the whole import cost
+        total_us = sum(m["cumulative_us"] for m in modules if m["depth"] == 0)
+        if best is None or total_us < best["total_us"]:
+            best = {"total_us": total_us, "modules": modules}
+
+    return {
+        "module": module,
+        "total_ms": round(best["total_us"] / 1000, 2),
+        "module_count": len(best["modules"]),
+        "modules": best["modules"],
+    }
+
+
+def top_modules(result: Dict, top: int = 10, key: str = "cumulative_us") -> List[Dict]:
+    """Most expensive modules of a measurement, by self or cumulative time."""
+    return sorted(result["modules"], key=lambda m: m[key], reverse=True)[:top]
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Measure Token-Craft import time")
+    parser.add_argument("targets", nargs="*", default=DEFAULT_TARGETS, help="Modules to import")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per target (best is kept)")
+    parser.add_argument("--top", type=int, default=10, help="Show the N most expensive modules")
+    parser.add_argument("--max-ms", type=float, help="Exit non-zero if any target exceeds this")
+    parser.add_argument("--json", action="store_true", help="Print machine-readable results")
+    args = parser.parse_args()
+
+    results = [measure_import(target, args.runs) for target in args.targets]
+
+    if args.json:
+        print(json.dumps([
+            {
+                "module": r["module"],
+                "total_ms": r["total_ms"],
+                "module_count": r["module_count"],
+                "top": top_modules(r, args.top),
+            }
+            for r in results
+        ], indent=2))
+    else:
+        for r in results:
+            print(f"\n{r['module']}: {r['total_ms']:.1f} ms ({r['module_count']} modules)")
+            for m in top_modules(r, args.top):
+                print(f"  {m['cumulative_us'] / 1000:8.2f} ms cum  {m['self_us'] / 1000:7.2f} ms self  {m['module']}")
+
+    if args.max_ms is not None:
+        slow = [r for r in results if r["total_ms"] > args.max_ms]
+        for r in slow:
+            print(f"FAIL: {r['module']} imports in {r['total_ms']:.1f} ms (limit {args.max_ms} ms)", file=sys.stderr)
+        sys.exit(1 if slow else 0)
+
+
+if __name__ == "__main__":
+    main()
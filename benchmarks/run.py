@@ -0,0 +1,310 @@
+"""
+Pipeline Benchmark Suite
+
+Times every pipeline stage separately at several data sizes, on
+deterministic synthetic data (benchmarks/synthetic.py):
+- history load and session grouping
+- each calculate_*_score category and calculate_total_score
+- snapshot write and read
+- report generation
+- team aggregation and leaderboard build
+
+Per stage it records median/min wall time (after one warm-up run), tracemalloc peak and net
+allocations (measured in a separate run, so tracing does not skew the
+timings) and the process peak RSS so far. Results go to a JSON file
+and can be gated against a stored baseline from the same machine.
+
+Usage:
+    python -m benchmarks.run --sizes small,medium --update-baseline
+    python -m benchmarks.run --sizes small,medium   # fails on regression
+"""
+
+import argparse
+import gc
+import io
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks import synthetic
+
+try:
+    import resource
+    HAS_RESOURCE = True
+except ImportError:  # Windows
+    HAS_RESOURCE = False
+
+SIZES = {
+    "small": {"sessions": 200, "members": 50},
+    "medium": {"sessions": 2000, "members": 500},
+    "large": {"sessions": 20000, "members": 5000},
+}
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Process peak resident set size so far, in MB (None if unavailable)."""
+    if not HAS_RESOURCE:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+def quiet(fn: Callable) -> Callable:
+    """Wrap a stage that prints progress so output does not flood the console."""
+    def wrapper():
+        with redirect_stdout(io.StringIO()):
+            return fn()
+    return wrapper
+
+
+class StageRunner:
+    """Run and measure named stages."""
+
+    def __init__(self, repeat: int = 3, trace_memory: bool = True):
+        """
+        Initialize runner.
+
+        Args:
+            repeat: Timed runs per stage (median and min are kept)
+            trace_memory: Also measure allocations with tracemalloc
+        """
+        self.repeat = max(1, repeat)
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    def run(self, name: str, fn: Callable):
+        """Measure one stage and return the value of its last run."""
+        fn()  # Warm-up: first-call imports and caches are not part of the stage
+        times = []
+        for _ in range(self.repeat):
+            gc.collect()
+            started = time.perf_counter()
+            value = fn()
+            times.append((time.perf_counter() - started) * 1000)
+
+        result = {
+            "wall_ms": round(statistics.median(times), 3),
+            "wall_ms_min": round(min(times), 3),
+            "runs": self.repeat,
+        }
+
+        if self.trace_memory:
+            gc.collect()
+            tracemalloc.start()
+            value = fn()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            result["alloc_peak_kb"] = round(peak / 1024, 1)
+            result["alloc_net_kb"] = round(current / 1024, 1)
+
+        result["rss_peak_mb"] = peak_rss_mb()
+        self.stages[name] = result
+        return value
+
+
+def prepare_data(size: str, seed: int, data_root: Path) -> Dict:
+    """Generate (or reuse) synthetic inputs for one size."""
+    params = SIZES[size]
+    root = data_root / f"{size}-seed{seed}"
+    marker = root / "complete.json"
+
+    if not marker.exists():
+        synthetic.write_claude_dir(root / "claude", sessions=params["sessions"], seed=seed)
+        synthetic.write_team_dir(root / "team", members=params["members"], seed=seed)
+        synthetic.write_leaderboard_dir(root / "leaderboard", members=params["members"], seed=seed)
+        marker.write_text(json.dumps(params), encoding="utf-8")
+
+    return {
+        "claude_dir": root / "claude",
+        "team_dir": root / "team",
+        "leaderboard_dir": root / "leaderboard",
+    }
+
+
+def benchmark_size(size: str, seed: int, data_root: Path, repeat: int, trace_memory: bool) -> Dict:
+    """Run every stage on one data size."""
+    from skill_handler import TokenCraftHandler
+    from team_aggregator import aggregate_team_stats
+    from token_craft.leaderboard_generator import LeaderboardGenerator
+    from token_craft.rank_system import SpaceRankSystem
+    from token_craft.report_generator import ReportGenerator
+    from token_craft.scoring_engine import TokenCraftScorer
+    from token_craft.snapshot_manager import SnapshotManager
+
+    paths = prepare_data(size, seed, data_root)
+    runner = StageRunner(repeat, trace_memory)
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        handler = TokenCraftHandler(paths["claude_dir"])
+        profile = handler.profile.get_current_state()
+
+        history_data, stats_data = runner.run("history_load", quiet(handler.load_data))
+        scorer = runner.run(
+            "scorer_init",
+            lambda: TokenCraftScorer(history_data, stats_data, rank=1, user_profile=dict(profile))
+        )
+        runner.run("session_grouping", scorer._group_by_sessions)
+
+        for name in sorted(dir(scorer)):
+            if name.startswith("calculate_") and name.endswith("_score") and name != "calculate_total_score":
+                runner.run(f"score.{name[len('calculate_'):-len('_score')]}", getattr(scorer, name))
+
+        score_data = runner.run("total_score", scorer.calculate_total_score)
+        rank_data = SpaceRankSystem.get_rank(score_data["total_score"])
+
+        snapshot_dir = Path(work_dir) / "snapshots"
+        manager = SnapshotManager(snapshot_dir)
+        runner.run("snapshot_write", lambda: manager.create_snapshot(profile, score_data, rank_data))
+        runner.run("snapshot_read", lambda: SnapshotManager(snapshot_dir).get_latest_snapshot())
+
+        runner.run("report_full", lambda: handler._generate_v3_full_report(score_data, rank_data, None))
+        runner.run("report_summary", lambda: ReportGenerator().generate_summary(profile, score_data, rank_data))
+
+        runner.run("team_aggregation", quiet(lambda: aggregate_team_stats(paths["team_dir"], prompt_save=False)))
+        runner.run(
+            "leaderboard_build",
+            lambda: LeaderboardGenerator(paths["leaderboard_dir"]).generate_company_leaderboard()
+        )
+
+    return {
+        "params": SIZES[size],
+        "history_entries": len(history_data),
+        "stages": runner.stages,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.25,
+            min_delta_ms: float = 2.0, min_delta_kb: float = 64.0) -> List[str]:
+    """
+    Find stages that regressed against a baseline.
+
+    A stage regresses when its best time is more than `tolerance` slower (or allocates
+    more than `tolerance` extra at peak) and the absolute difference is
+    above the noise floor.
+
+    Returns:
+        Human-readable regression descriptions (empty if none)
+    """
+    regressions = []
+
+    for size, result in current.get("results", {}).items():
+        base_stages = baseline.get("results", {}).get(size, {}).get("stages", {})
+        for stage, measured in result["stages"].items():
+            base = base_stages.get(stage)
+            if not base:
+                continue
+
+            # Best-of-N is far less noisy than the median on a shared machine
+            wall, base_wall = measured["wall_ms_min"], base["wall_ms_min"]
+            if wall > base_wall * (1 + tolerance) and wall - base_wall > min_delta_ms:
+                regressions.append(
+                    f"{size}/{stage}: {wall:.2f} ms vs baseline {base_wall:.2f} ms "
+                    f"(+{(wall / base_wall - 1) * 100 if base_wall else float('inf'):.0f}%)"
+                )
+
+            alloc, base_alloc = measured.get("alloc_peak_kb"), base.get("alloc_peak_kb")
+            if alloc is not None and base_alloc is not None:
+                if alloc > base_alloc * (1 + tolerance) and alloc - base_alloc > min_delta_kb:
+                    regressions.append(
+                        f"{size}/{stage}: peak allocations {alloc:.0f} KB vs baseline {base_alloc:.0f} KB"
+                    )
+
+    return regressions
+
+
+def format_table(results: Dict) -> str:
+    """Render results as a fixed-width table."""
+    lines = [f"{'size':<8} {'stage':<30} {'wall ms':>10} {'min ms':>10} {'peak KB':>10} {'RSS MB':>8}"]
+    lines.append("-" * len(lines[0]))
+    for size, result in results.items():
+        for stage, m in result["stages"].items():
+            alloc = m.get("alloc_peak_kb")
+            rss = m.get("rss_peak_mb")
+            lines.append(
+                f"{size:<8} {stage:<30} {m['wall_ms']:>10.2f} {m['wall_ms_min']:>10.2f} "
+                f"{alloc if alloc is not None else '-':>10} {rss if rss is not None else '-':>8}"
+            )
+    return "\n".join(lines)
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Per-stage Token-Craft pipeline benchmarks")
+    parser.add_argument("--sizes", default="small,medium", help=f"Comma-separated sizes ({', '.join(SIZES)})")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage")
+    parser.add_argument("--seed", type=int, default=0, help="Synthetic data seed")
+    parser.add_argument("--data-dir", help="Where generated inputs are cached")
+    parser.add_argument("--output", default="benchmark_results.json", help="Results JSON file")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="Baseline JSON to compare against")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown ratio (0.25 = 25%%)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc allocation runs")
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in sizes if s not in SIZES]
+    if unknown:
+        parser.error(f"Unknown size(s): {', '.join(unknown)}")
+
+    data_root = Path(args.data_dir) if args.data_dir else Path(tempfile.gettempdir()) / "token-craft-bench"
+
+    output = {
+        "meta": {
+            "created_at": datetime.now().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+    for size in sizes:
+        print(f"Benchmarking {size}...", file=sys.stderr)
+        output["results"][size] = benchmark_size(size, args.seed, data_root, args.repeat, not args.no_memory)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+
+    print(format_table(output["results"]))
+    print(f"\nResults written to {args.output}")
+
+    baseline_path = Path(args.baseline)
+    if args.update_baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+        print(f"Baseline updated: {baseline_path}")
+        return
+
+    if not baseline_path.exists():
+        print("No baseline to compare against (run with --update-baseline).")
+        return
+
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        regressions = compare(output, json.load(f), args.tolerance)
+
+    if regressions:
+        print(f"\nREGRESSIONS (tolerance {args.tolerance:.0%}):")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+
+    print(f"\nNo regressions beyond {args.tolerance:.0%} against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
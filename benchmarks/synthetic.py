@@ -0,0 +1,537 @@
+"""
+Synthetic Data Generator
+
+Deterministic, seedable stand-ins for the files Token-Craft reads, at any
+scale:
+- history.jsonl: user prompts plus assistant turns with tool_use blocks
+- stats-cache.json: modelUsage, dailyModelTokens and dailyActivity that
+  match the generated history
+- Team export directories in the team_aggregator.py export format
+- Leaderboard directories in the TeamExporter format
+
+The same seed and arguments always produce byte-identical output.
+History is streamed to disk, so 10^6+ messages never sit in memory.
+
+Usage:
+    python -m benchmarks.synthetic claude-dir /tmp/claude --messages 1000000
+    python -m benchmarks.synthetic team-dir /tmp/team --members 10000
+"""
+
+import argparse
+import json
+import random
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+DEFAULT_START = datetime(2025, 1, 6, tzinfo=timezone.utc)
+
+# LeaderboardGenerator only picks up files matching *_2026*.json
+LEADERBOARD_STAMP = "20260105_090000"
+
+RANK_NAMES = ["Cadet", "Pilot", "Navigator", "Commander", "Captain", "Admiral", "Galactic Legend"]
+
+MODELS = [
+    ("claude-sonnet-4-5-20250929", 0.70),
+    ("claude-opus-4-1-20250805", 0.15),
+    ("claude-haiku-4-5-20251001", 0.15),
+]
+
+PROJECT_NAMES = [
+    "billing-service", "web-frontend", "data-pipeline", "infra-terraform", "mobile-app",
+    "auth-gateway", "ml-experiments", "docs-site", "search-indexer", "etl-jobs",
+    "design-system", "reporting-api", "notification-worker", "cli-tools", "sdk-python",
+]
+
+# Prompt templates cover the keyword sets used by the scorer and analyzer
+# (categories, work types, XML/CoT/example prompting, defer, docs)
+PROMPT_TEMPLATES = [
+    "fix the bug in {file} where {func} returns None",
+    "the test {test} is failing with KeyError, debug it",
+    "implement {func} in {file} and add a unit test",
+    "refactor {file} to clean up the duplicated parsing logic",
+    "search for where {func} is called",
+    "find all usages of {func} and list them",
+    "show me the config for the {project} deployment",
+    "explain how {func} works step by step",
+    "add a docstring and update the readme for {func}",
+    "git commit the changes and push to the feature branch",
+    "create a pull request for this branch",
+    "parse the csv export and calculate monthly statistics",
+    "optimize {func}, it is slow on large inputs",
+    "write code to fetch the /users api endpoint with retries",
+    "setup docker and the ci/cd pipeline for {project}",
+    "defer the documentation until after the release",
+    "<task>Update {func}</task><context>{file}</context>",
+    "let's think step by step about why {test} is flaky",
+    "for example, {func}(1, 2) should return 3 - make it so",
+    "be concise: rename {func} to {func}_v2",
+    "run pytest",
+    "yes",
+    "continue",
+]
+
+TOOLS = ["Read", "Edit", "Grep", "Glob", "Bash", "Write"]
+TOOL_WEIGHTS = [0.35, 0.2, 0.15, 0.1, 0.15, 0.05]
+
+FILE_STEMS = ["models", "views", "utils", "client", "handlers", "schema", "service", "parser", "config", "cli"]
+FUNC_NAMES = ["load_data", "parse_line", "build_index", "sync_users", "render_page", "compute_totals",
+              "validate", "retry_request", "merge_results", "export_csv"]
+
+
+def _weighted(rng: random.Random, items: List, weights: List[float]):
+    return rng.choices(items, weights=weights, k=1)[0]
+
+
+def _uuid(rng: random.Random) -> str:
+    """UUID4-shaped identifier drawn from the seeded generator."""
+    value = rng.getrandbits(128)
+    h = f"{value:032x}"
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-a{h[17:20]}-{h[20:32]}"
+
+
+def _day(timestamp_ms: int) -> str:
+    return datetime.fromtimestamp(timestamp_ms / 1000, timezone.utc).strftime("%Y-%m-%d")
+
+
+def plan_sessions(
+    sessions: int,
+    prompts_per_session: float = 12.0,
+    projects: int = 8,
+    days: int = 90,
+    seed: int = 0,
+    start: datetime = DEFAULT_START,
+    project_root: str = "/home/dev/work",
+) -> Iterator[Dict]:
+    """
+    Yield session plans in chronological order.
+
+    Each plan fixes the session's project, start time, prompt count and
+    per-turn model/token draws, so history files and team exports built
+    from the same seed agree.
+
+    Args:
+        sessions: Number of sessions
+        prompts_per_session: Mean user prompts per session (exponential, min 1)
+        projects: Distinct projects (Zipf-weighted: a few dominate)
+        days: Calendar span the sessions are spread over
+        seed: Random seed
+        start: First day of the span (UTC)
+        project_root: Parent directory of the project paths
+
+    Yields:
+        Dict with session_id, project, start_ms and turns
+        (each turn: timestamp, model, input/output/cache token counts)
+    """
+    rng = random.Random(seed)
+    project_paths = [
+        f"{project_root}/{PROJECT_NAMES[i % len(PROJECT_NAMES)]}" + (f"-{i // len(PROJECT_NAMES)}" if i >= len(PROJECT_NAMES) else "")
+        for i in range(max(1, projects))
+    ]
+    project_weights = [1.0 / (rank + 1) for rank in range(len(project_paths))]
+    model_names = [m for m, _ in MODELS]
+    model_weights = [w for _, w in MODELS]
+    start_ms = int(start.timestamp() * 1000)
+
+    # Session start times: weekdays favoured, working hours favoured
+    starts = []
+    for _ in range(sessions):
+        day = rng.randrange(max(1, days))
+        if (start + timedelta(days=day)).weekday() >= 5 and rng.random() < 0.7:
+            day = max(0, day - rng.randint(1, 2))
+        hour = min(23, max(0, int(rng.gauss(14, 3))))
+        offset_ms = ((day * 24 + hour) * 3600 + rng.randrange(3600)) * 1000
+        starts.append(start_ms + offset_ms)
+    starts.sort()
+
+    for session_start in starts:
+        n_prompts = max(1, min(int(rng.expovariate(1.0 / prompts_per_session)) + 1, int(prompts_per_session * 8)))
+        model = _weighted(rng, model_names, model_weights)
+        timestamp = session_start
+        turns = []
+        for _ in range(n_prompts):
+            input_tokens = int(rng.lognormvariate(8.0, 0.8))  # median ~3k
+            turns.append({
+                "timestamp": timestamp,
+                "model": model,
+                "input_tokens": input_tokens,
+                "output_tokens": int(rng.lognormvariate(6.2, 0.9)),  # median ~500
+                "cache_read_tokens": int(input_tokens * rng.uniform(0.2, 0.9)),
+                "cache_creation_tokens": int(input_tokens * rng.uniform(0.0, 0.2)),
+            })
+            timestamp += int(rng.uniform(20, 600) * 1000)
+
+        yield {
+            "session_id": _uuid(rng),
+            "project": _weighted(rng, project_paths, project_weights),
+            "start_ms": session_start,
+            "turns": turns,
+        }
+
+
+def _prompt(rng: random.Random, project: str) -> str:
+    template = rng.choice(PROMPT_TEMPLATES)
+    text = template.format(
+        file=f"src/{rng.choice(FILE_STEMS)}.py",
+        func=rng.choice(FUNC_NAMES),
+        test=f"test_{rng.choice(FUNC_NAMES)}",
+        project=project.rsplit("/", 1)[-1],
+    )
+    # Occasional long pasted context, as real prompts have
+    if rng.random() < 0.08:
+        text += "\n\n" + "\n".join(f"    line {i}: value = compute({i})" for i in range(rng.randint(20, 120)))
+    return text
+
+
+def _tool_use(rng: random.Random, project: str) -> Dict:
+    name = _weighted(rng, TOOLS, TOOL_WEIGHTS)
+    path = f"{project}/src/{rng.choice(FILE_STEMS)}.py"
+    if name in ("Read", "Edit", "Write"):
+        tool_input = {"file_path": path}
+    elif name == "Bash":
+        tool_input = {"command": rng.choice(["pytest -q", "git status", "grep -rn TODO src", "ls src"])}
+    else:
+        tool_input = {"pattern": rng.choice(FUNC_NAMES)}
+    return {"type": "tool_use", "id": f"toolu_{rng.getrandbits(64):016x}", "name": name, "input": tool_input}
+
+
+def iter_history(plans: Iterator[Dict], seed: int = 0, assistant_turns: bool = True) -> Iterator[Dict]:
+    """
+    Expand session plans into history.jsonl entries.
+
+    Args:
+        plans: Output of plan_sessions()
+        seed: Random seed for prompt text and tool calls
+        assistant_turns: Also emit assistant entries with tool_use blocks
+
+    Yields:
+        History entries in file order
+    """
+    rng = random.Random(seed ^ 0x5EED)
+
+    for plan in plans:
+        for turn in plan["turns"]:
+            yield {
+                "display": _prompt(rng, plan["project"]),
+                "pastedContents": {},
+                "timestamp": turn["timestamp"],
+                "project": plan["project"],
+                "sessionId": plan["session_id"],
+            }
+            if assistant_turns:
+                n_tools = rng.choice((0, 1, 1, 2, 3))
+                content = [{"type": "text", "text": "Done."}]
+                content.extend(_tool_use(rng, plan["project"]) for _ in range(n_tools))
+                yield {
+                    "type": "assistant",
+                    "role": "assistant",
+                    "timestamp": turn["timestamp"] + 1000,
+                    "project": plan["project"],
+                    "sessionId": plan["session_id"],
+                    "model": turn["model"],
+                    "content": content,
+                    "tokens": turn["input_tokens"] + turn["output_tokens"],
+                }
+
+
+class _StatsAccumulator:
+    """Builds stats-cache.json fields from session plans."""
+
+    def __init__(self):
+        self.model_usage = defaultdict(lambda: {
+            "inputTokens": 0, "outputTokens": 0,
+            "cacheReadInputTokens": 0, "cacheCreationInputTokens": 0,
+            "webSearchRequests": 0,
+        })
+        self.daily_tokens = defaultdict(lambda: defaultdict(int))
+        self.daily_activity = defaultdict(lambda: {"messageCount": 0, "sessionCount": 0, "toolCallCount": 0})
+        self.sessions = 0
+        self.messages = 0
+
+    def add(self, plan: Dict, tool_calls: int = 0):
+        self.sessions += 1
+        self.daily_activity[_day(plan["start_ms"])]["sessionCount"] += 1
+        if tool_calls:
+            self.daily_activity[_day(plan["start_ms"])]["toolCallCount"] += tool_calls
+
+        for turn in plan["turns"]:
+            day = _day(turn["timestamp"])
+            usage = self.model_usage[turn["model"]]
+            usage["inputTokens"] += turn["input_tokens"]
+            usage["outputTokens"] += turn["output_tokens"]
+            usage["cacheReadInputTokens"] += turn["cache_read_tokens"]
+            usage["cacheCreationInputTokens"] += turn["cache_creation_tokens"]
+            self.daily_tokens[day][turn["model"]] += turn["input_tokens"] + turn["output_tokens"]
+            self.daily_activity[day]["messageCount"] += 1
+            self.messages += 1
+
+    def model_usage_dict(self) -> Dict:
+        return {model: dict(usage) for model, usage in sorted(self.model_usage.items())}
+
+    def daily_activity_list(self) -> List[Dict]:
+        return [dict(date=day, **counts) for day, counts in sorted(self.daily_activity.items())]
+
+    def daily_model_tokens_list(self) -> List[Dict]:
+        return [
+            {"date": day, "tokensByModel": dict(sorted(models.items()))}
+            for day, models in sorted(self.daily_tokens.items())
+        ]
+
+    def to_stats_cache(self) -> Dict:
+        days = sorted(self.daily_activity)
+        return {
+            "version": 1,
+            "lastComputedDate": days[-1] if days else None,
+            "dailyActivity": self.daily_activity_list(),
+            "dailyModelTokens": self.daily_model_tokens_list(),
+            "modelUsage": self.model_usage_dict(),
+            "totalSessions": self.sessions,
+            "totalMessages": self.messages,
+            "firstSessionDate": days[0] if days else None,
+        }
+
+
+def sessions_for_messages(messages: int, prompts_per_session: float = 12.0, assistant_turns: bool = True) -> int:
+    """Number of sessions that yields roughly `messages` history lines."""
+    per_session = prompts_per_session * (2 if assistant_turns else 1)
+    return max(1, int(round(messages / per_session)))
+
+
+def write_claude_dir(
+    out_dir: Path,
+    sessions: int = 1000,
+    prompts_per_session: float = 12.0,
+    projects: int = 8,
+    days: int = 90,
+    seed: int = 0,
+    assistant_turns: bool = True,
+) -> Dict:
+    """
+    Write history.jsonl and a matching stats-cache.json.
+
+    Args:
+        out_dir: Directory laid out like ~/.claude
+        sessions: Number of sessions
+        prompts_per_session: Mean user prompts per session
+        projects: Distinct projects
+        days: Calendar span
+        seed: Random seed
+        assistant_turns: Include assistant entries with tool_use blocks
+
+    Returns:
+        Summary with paths and counts
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    history_path = out_dir / "history.jsonl"
+    stats_path = out_dir / "stats-cache.json"
+
+    stats = _StatsAccumulator()
+    lines = 0
+
+    def tracked_plans():
+        for plan in plan_sessions(sessions, prompts_per_session, projects, days, seed):
+            yield plan
+            stats.add(plan)
+
+    with open(history_path, "w", encoding="utf-8") as f:
+        for entry in iter_history(tracked_plans(), seed, assistant_turns):
+            f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+            lines += 1
+            if entry.get("role") == "assistant":
+                tool_calls = sum(1 for c in entry["content"] if c["type"] == "tool_use")
+                stats.daily_activity[_day(entry["timestamp"])]["toolCallCount"] += tool_calls
+
+    with open(stats_path, "w", encoding="utf-8") as f:
+        json.dump(stats.to_stats_cache(), f, indent=2)
+
+    return {
+        "history_path": str(history_path),
+        "stats_path": str(stats_path),
+        "sessions": stats.sessions,
+        "prompts": stats.messages,
+        "history_lines": lines,
+        "history_bytes": history_path.stat().st_size,
+    }
+
+
+def member_export(
+    index: int,
+    sessions: int = 40,
+    prompts_per_session: float = 12.0,
+    projects: int = 8,
+    days: int = 90,
+    seed: int = 0,
+) -> Dict:
+    """
+    Build one team member's export in the team_aggregator.py format.
+
+    Args:
+        index: Member number (drives name, email and per-member seed)
+        sessions: Mean sessions for this member (varies +/-50%)
+        prompts_per_session: Mean prompts per session
+        projects: Distinct projects shared across the team
+        days: Calendar span
+        seed: Team-level random seed
+
+    Returns:
+        Export dict (same keys as export_personal_stats writes)
+    """
+    member_seed = seed * 1_000_003 + index
+    rng = random.Random(member_seed)
+    member_sessions = max(1, int(sessions * rng.uniform(0.5, 1.5)))
+
+    stats = _StatsAccumulator()
+    by_project = defaultdict(lambda: {"sessions": 0, "messages": 0})
+    first = last = None
+
+    for plan in plan_sessions(member_sessions, prompts_per_session, projects, days, member_seed):
+        stats.add(plan, tool_calls=len(plan["turns"]))
+        name = plan["project"].rsplit("/", 1)[-1]
+        by_project[name]["sessions"] += 1
+        by_project[name]["messages"] += len(plan["turns"])
+        first = plan["start_ms"] if first is None else first
+        last = plan["turns"][-1]["timestamp"]
+
+    def iso(ms: Optional[int]) -> Optional[str]:
+        return datetime.fromtimestamp(ms / 1000, timezone.utc).replace(tzinfo=None).isoformat() if ms else None
+
+    return {
+        "exported_at": iso(last),
+        "user": {"name": f"Member {index:05d}", "email": f"member{index:05d}@example.com"},
+        "date_range": {"from": iso(first), "to": iso(last)},
+        "summary": {
+            "total_sessions": stats.sessions,
+            "total_messages": stats.messages,
+            "model_usage": stats.model_usage_dict(),
+        },
+        "by_project": dict(by_project),
+        "daily_activity": stats.daily_activity_list(),
+        "daily_model_tokens": stats.daily_model_tokens_list(),
+    }
+
+
+def write_team_dir(
+    out_dir: Path,
+    members: int = 100,
+    sessions: int = 40,
+    prompts_per_session: float = 12.0,
+    projects: int = 8,
+    days: int = 90,
+    seed: int = 0,
+) -> Dict:
+    """
+    Write one export file per team member (`<user>_at_<domain>_<stamp>.json`).
+
+    Args:
+        out_dir: Team stats directory for aggregate_team_stats()
+        members: Team size
+        sessions: Mean sessions per member
+        prompts_per_session: Mean prompts per session
+        projects: Distinct projects shared across the team
+        days: Calendar span
+        seed: Random seed
+
+    Returns:
+        Summary with the directory and file count
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    for index in range(members):
+        export = member_export(index, sessions, prompts_per_session, projects, days, seed)
+        stamp = (export["exported_at"] or "").replace("-", "").replace(":", "").replace("T", "_")[:15]
+        filename = f"{export['user']['email'].replace('@', '_at_')}_{stamp}.json"
+        with open(out_dir / filename, "w", encoding="utf-8") as f:
+            json.dump(export, f, indent=2)
+
+    return {"team_dir": str(out_dir), "members": members}
+
+
+def write_leaderboard_dir(out_dir: Path, members: int = 100, seed: int = 0) -> Dict:
+    """
+    Write one TeamExporter-format file per member for LeaderboardGenerator.
+
+    Args:
+        out_dir: Leaderboard stats directory
+        members: Team size
+        seed: Random seed
+
+    Returns:
+        Summary with the directory and file count
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed ^ 0x1EAD)
+    departments = ["Engineering", "Data", "Platform", "Mobile", "QA"]
+    projects = PROJECT_NAMES[:8]
+
+    for index in range(members):
+        email = f"member{index:05d}@example.com"
+        score = round(rng.lognormvariate(6.3, 0.5), 1)
+        sessions = max(1, int(rng.lognormvariate(3.5, 0.7)))
+        avg_tokens = int(rng.lognormvariate(9.2, 0.4))
+        export = {
+            "export_timestamp": "2026-01-05T09:00:00",
+            "user_email": email,
+            "department": rng.choice(departments),
+            "projects": {
+                name: {"sessions": max(1, sessions // 2), "messages": sessions * 6}
+                for name in rng.sample(projects, rng.randint(1, 3))
+            },
+            "current_rank": RANK_NAMES[min(len(RANK_NAMES) - 1, int(score // 200))],
+            "current_score": score,
+            "total_sessions": sessions,
+            "total_messages": sessions * 12,
+            "total_tokens": sessions * avg_tokens,
+            "avg_tokens_per_session": avg_tokens,
+            "achievements": [],
+            "metadata": {"version": "1.0.0", "exporter": "token-craft"},
+        }
+        safe_email = email.replace("@", "_at_").replace(".", "_")
+        with open(out_dir / f"{safe_email}_{LEADERBOARD_STAMP}.json", "w", encoding="utf-8") as f:
+            json.dump(export, f, indent=2)
+
+    return {"leaderboard_dir": str(out_dir), "members": members}
+
+
+def main():
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Generate deterministic synthetic Token-Craft data")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    for name in ("claude-dir", "team-dir"):
+        p = sub.add_parser(name)
+        p.add_argument("out_dir", help="Output directory")
+        p.add_argument("--seed", type=int, default=0, help="Random seed")
+        p.add_argument("--projects", type=int, default=8, help="Distinct projects")
+        p.add_argument("--days", type=int, default=90, help="Calendar span in days")
+        p.add_argument("--prompts-per-session", type=float, default=12.0, help="Mean prompts per session")
+        p.add_argument("--sessions", type=int, default=None, help="Sessions (per member for team-dir)")
+
+    sub.choices["claude-dir"].add_argument("--messages", type=int, help="Target history lines (overrides --sessions)")
+    sub.choices["claude-dir"].add_argument("--prompts-only", action="store_true", help="Omit assistant entries")
+    sub.choices["team-dir"].add_argument("--members", type=int, default=100, help="Team size")
+
+    args = parser.parse_args()
+
+    if args.command == "claude-dir":
+        assistant_turns = not args.prompts_only
+        sessions = args.sessions or 1000
+        if args.messages:
+            sessions = sessions_for_messages(args.messages, args.prompts_per_session, assistant_turns)
+        result = write_claude_dir(
+            args.out_dir, sessions, args.prompts_per_session, args.projects, args.days, args.seed, assistant_turns
+        )
+    else:
+        result = write_team_dir(
+            args.out_dir, args.members, args.sessions or 40, args.prompts_per_session,
+            args.projects, args.days, args.seed
+        )
+
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,8 @@
 """
 Non-interactive wrapper for Token-Craft skill handler.
+
+Uses a running analysis server (python analysis_server.py start) when one
+is available, otherwise runs the analysis in-process.
 """
 import sys
 from pathlib import Path
@@ -7,7 +10,8 @@ from pathlib import Path
 # Add token_craft to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from skill_handler import TokenCraftHandler
+from analysis_server import ServerBusy, request_report
+from token_craft import profiler
 import io
 
 # Fix Windows CMD encoding issues
@@ -15,10 +19,26 @@ if sys.platform == "win32":
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
+# --profile[=FILE] times stages in-process (so the warm server is skipped)
+profiler.configure_from_argv(sys.argv)
+
 # Get mode from command line, default to 'full'
 mode = sys.argv[1] if len(sys.argv) > 1 else 'full'
 
-# Run analysis
-handler = TokenCraftHandler()
-report = handler.run(mode=mode)
-print(report)
+# Ask the warm server first; fall back to in-process analysis only if no
+# server took the request (a busy one may still be saving this run)
+try:
+    response = None if profiler.is_enabled() else request_report(mode)
+except ServerBusy as e:
+    print(f"Error: {e}")
+    print("The analysis server is still busy with this report; try again shortly.")
+    sys.exit(1)
+if response is not None:
+    print(response["output"], end="")
+    print(response["report"])
+else:
+    from skill_handler import TokenCraftHandler
+
+    handler = TokenCraftHandler()
+    report = handler.run(mode=mode)
+    print(report)
@@ -12,6 +12,7 @@ Supports v3.0 gamification system with:
 - Regression detection
 """
 
+import copy
 import json
 import sys
 from pathlib import Path
@@ -26,23 +27,30 @@ from token_craft.user_profile import UserProfile
 from token_craft.snapshot_manager import SnapshotManager
 from token_craft.delta_calculator import DeltaCalculator
 from token_craft.report_generator import ReportGenerator
-from token_craft.difficulty_modifier import DifficultyModifier
-from token_craft.streak_system import StreakSystem
-from token_craft.achievement_engine import AchievementEngine
-from token_craft.time_based_mechanics import TimeBasedMechanics
+from token_craft.history_compactor import history_reader
+from token_craft import profiler
 
 
 class TokenCraftHandler:
     """Main handler for Token-Craft skill."""
 
-    def __init__(self):
-        """Initialize handler."""
-        self.claude_dir = Path.home() / ".claude"
+    def __init__(self, claude_dir: Optional[Path] = None):
+        """
+        Initialize handler.
+
+        Args:
+            claude_dir: Claude data directory (default: ~/.claude)
+        """
+        self.claude_dir = Path(claude_dir) if claude_dir else Path.home() / ".claude"
         self.history_file = self.claude_dir / "history.jsonl"
         self.stats_file = self.claude_dir / "stats-cache.json"
 
-        self.profile = UserProfile()
-        self.snapshot_manager = SnapshotManager()
+        if claude_dir:
+            self.profile = UserProfile(profile_dir=self.claude_dir / "token-craft")
+            self.snapshot_manager = SnapshotManager(self.claude_dir / "token-craft" / "snapshots")
+        else:
+            self.profile = UserProfile()
+            self.snapshot_manager = SnapshotManager()
         self.report_generator = ReportGenerator()
 
     def load_data(self) -> tuple:
@@ -50,31 +58,30 @@ class TokenCraftHandler:
         Load history and stats data.
 
         Returns:
-            Tuple of (history_data, stats_data)
+            Tuple of (history_data as records.Message list, stats_data)
         """
         # Load history.jsonl
         history_data = []
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            try:
-                                history_data.append(json.loads(line))
-                            except json.JSONDecodeError:
-                                continue
-            except Exception as e:
-                print(f"Warning: Could not load history.jsonl: {e}")
+        with profiler.stage("load.history") as st:
+            # Compacted history if present, else history.jsonl plus any
+            # rotated (possibly compressed) segments
+            history = history_reader(self.history_file)
+            if history.exists():
+                try:
+                    history_data = list(history.messages())
+                except Exception as e:
+                    print(f"Warning: Could not load history.jsonl: {e}")
+            st.count("lines_parsed", len(history_data))
 
         # Load stats-cache.json
         stats_data = {}
-        if self.stats_file.exists():
-            try:
-                with open(self.stats_file, "r", encoding="utf-8") as f:
-                    stats_data = json.load(f)
-            except Exception as e:
-                print(f"Warning: Could not load stats-cache.json: {e}")
+        with profiler.stage("load.stats"):
+            if self.stats_file.exists():
+                try:
+                    with open(self.stats_file, "r", encoding="utf-8") as f:
+                        stats_data = json.load(f)
+                except Exception as e:
+                    print(f"Warning: Could not load stats-cache.json: {e}")
 
         return history_data, stats_data
 
@@ -91,17 +98,21 @@ class TokenCraftHandler:
         Returns:
             Score data with v3.0 metrics
         """
-        scorer = TokenCraftScorer(history_data, stats_data, user_rank=user_rank, user_profile=self.profile.get_current_state())
-        score_data = scorer.calculate_total_score(previous_snapshot)
+        # Deep copy: the scorer's achievement engine appends to profile lists
+        profile_state = copy.deepcopy(self.profile.get_current_state())
+        with profiler.stage("score"):
+            scorer = TokenCraftScorer(history_data, stats_data, rank=user_rank, user_profile=profile_state)
+            score_data = scorer.calculate_total_score(previous_snapshot)
 
         return score_data
 
-    def run(self, mode: str = "full") -> str:
+    def run(self, mode: str = "full", data: Optional[tuple] = None) -> str:
         """
         Run the Token-Craft v3.0 analysis.
 
         Args:
             mode: 'full', 'summary', 'quick', or 'v3'
+            data: Preloaded (history_data, stats_data); read from disk if omitted
 
         Returns:
             Formatted report
@@ -109,13 +120,14 @@ class TokenCraftHandler:
         try:
             # Load data
             print("Loading your data...")
-            history_data, stats_data = self.load_data()
+            history_data, stats_data = data if data is not None else self.load_data()
 
             if not history_data:
                 return "No history data found. Start using Claude Code to track your progress!"
 
             # Get previous snapshot for comparison
-            previous_snapshot = self.snapshot_manager.get_latest_snapshot()
+            with profiler.stage("load.snapshot"):
+                previous_snapshot = self.snapshot_manager.get_latest_snapshot()
 
             # Get current rank (for difficulty scaling in v3.0)
             previous_profile = None
@@ -157,30 +169,33 @@ class TokenCraftHandler:
             self._check_achievements(score_data, rank_data, delta_data)
 
             # Save profile
-            self.profile.save()
+            with profiler.stage("persist.profile"):
+                self.profile.save()
 
             # Create snapshot
             print("Saving snapshot...")
-            self.snapshot_manager.create_snapshot(
-                self.profile.get_current_state(),
-                score_data,
-                rank_data
-            )
-
-            # Generate report
-            print("Generating report...")
-            if mode == "summary":
-                report = self.report_generator.generate_summary(
+            with profiler.stage("persist.snapshot"):
+                self.snapshot_manager.create_snapshot(
                     self.profile.get_current_state(),
                     score_data,
                     rank_data
                 )
-            elif mode == "quick":
-                report = self._generate_quick_status(score_data, rank_data)
-            elif mode == "v3":
-                report = self._generate_v3_full_report(score_data, rank_data, delta_data)
-            else:  # full
-                report = self._generate_v3_full_report(score_data, rank_data, delta_data)
+
+            # Generate report
+            print("Generating report...")
+            with profiler.stage("render"):
+                if mode == "summary":
+                    report = self.report_generator.generate_summary(
+                        self.profile.get_current_state(),
+                        score_data,
+                        rank_data
+                    )
+                elif mode == "quick":
+                    report = self._generate_quick_status(score_data, rank_data)
+                elif mode == "v3":
+                    report = self._generate_v3_full_report(score_data, rank_data, delta_data)
+                else:  # full
+                    report = self._generate_v3_full_report(score_data, rank_data, delta_data)
 
             return report
 
@@ -318,7 +333,11 @@ class TokenCraftHandler:
             lines.append("-"*70)
             lines.append(f"  Current Rank: {diff.get('rank_name', 'Unknown')}")
             lines.append(f"  Difficulty: {diff.get('difficulty_label', 'Standard')}")
-            lines.append(f"  Token Efficiency Baseline: {diff.get('token_efficiency_baseline', 'N/A'):,} tokens/session")
+            baseline = diff.get("token_efficiency_baseline")
+            if isinstance(baseline, (int, float)):
+                lines.append(f"  Token Efficiency Baseline: {baseline:,} tokens/session")
+            else:
+                lines.append("  Token Efficiency Baseline: N/A")
 
         # Regression Analysis
         regression = score_data.get("regression_analysis", {})
@@ -393,10 +412,12 @@ def show_menu():
 
 
 def main():
-    """Main entry point - fully interactive."""
+    """Main entry point - fully interactive (--profile prints stage timings on exit)."""
     import sys
     import io
 
+    profiler.configure_from_argv(sys.argv)
+
     # Fix Windows CMD encoding issues
     if sys.platform == "win32":
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -5,6 +5,7 @@ Main entry point with all features: leaderboards, team export, hero badges, inte
 Supports v3.0 gamification with difficulty scaling, streaks, achievements, and regression detection.
 """
 
+import copy
 import json
 import sys
 from pathlib import Path
@@ -19,16 +20,14 @@ from token_craft.user_profile import UserProfile
 from token_craft.snapshot_manager import SnapshotManager
 from token_craft.delta_calculator import DeltaCalculator
 from token_craft.report_generator import ReportGenerator
+from token_craft.history_compactor import history_reader
+from token_craft import profiler
 from token_craft.leaderboard_generator import LeaderboardGenerator
 from token_craft.hero_api_client import MockHeroClient
+from token_craft.badge_outbox import BadgeOutbox, BackgroundFlusher
 from token_craft.team_exporter import TeamExporter
 from token_craft.recommendation_engine import RecommendationEngine
 from token_craft.interactive_menu import InteractiveMenu
-from token_craft.difficulty_modifier import DifficultyModifier
-from token_craft.streak_system import StreakSystem
-from token_craft.achievement_engine import AchievementEngine
-from token_craft.time_based_mechanics import TimeBasedMechanics
-from token_craft.regression_detector import RegressionDetector
 
 
 class TokenCraftHandlerFull:
@@ -45,6 +44,8 @@ class TokenCraftHandlerFull:
         self.report_generator = ReportGenerator()
         self.leaderboard_generator = LeaderboardGenerator()
         self.hero_client = MockHeroClient()
+        self.badge_outbox = None  # Opened on first badge sync
+        self.badge_flusher = None  # Started on first badge sync with pending changes
         self.team_exporter = TeamExporter()
         self.recommendation_engine = RecommendationEngine()
         self.menu = InteractiveMenu()
@@ -57,26 +58,25 @@ class TokenCraftHandlerFull:
     def load_data(self) -> tuple:
         """Load history and stats data."""
         history_data = []
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, "r", encoding="utf-8") as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            try:
-                                history_data.append(json.loads(line))
-                            except json.JSONDecodeError:
-                                continue
-            except Exception as e:
-                print(f"Warning: Could not load history.jsonl: {e}")
+        with profiler.stage("load.history") as st:
+            # Compacted history if present, else history.jsonl plus any
+            # rotated (possibly compressed) segments
+            history = history_reader(self.history_file)
+            if history.exists():
+                try:
+                    history_data = list(history.messages())
+                except Exception as e:
+                    print(f"Warning: Could not load history.jsonl: {e}")
+            st.count("lines_parsed", len(history_data))
 
         stats_data = {}
-        if self.stats_file.exists():
-            try:
-                with open(self.stats_file, "r", encoding="utf-8") as f:
-                    stats_data = json.load(f)
-            except Exception as e:
-                print(f"Warning: Could not load stats-cache.json: {e}")
+        with profiler.stage("load.stats"):
+            if self.stats_file.exists():
+                try:
+                    with open(self.stats_file, "r", encoding="utf-8") as f:
+                        stats_data = json.load(f)
+                except Exception as e:
+                    print(f"Warning: Could not load stats-cache.json: {e}")
 
         return history_data, stats_data
 
@@ -93,8 +93,11 @@ class TokenCraftHandlerFull:
         Returns:
             Score data with v3.0 metrics
         """
-        scorer = TokenCraftScorer(history_data, stats_data, user_rank=user_rank, user_profile=self.profile.get_current_state())
-        score_data = scorer.calculate_total_score(previous_snapshot)
+        # Deep copy: the scorer's achievement engine appends to profile lists
+        profile_state = copy.deepcopy(self.profile.get_current_state())
+        with profiler.stage("score"):
+            scorer = TokenCraftScorer(history_data, stats_data, rank=user_rank, user_profile=profile_state)
+            score_data = scorer.calculate_total_score(previous_snapshot)
         return score_data
 
     def run_analysis(self) -> bool:
@@ -113,7 +116,8 @@ class TokenCraftHandlerFull:
                 return False
 
             # Get previous snapshot
-            previous_snapshot = self.snapshot_manager.get_latest_snapshot()
+            with profiler.stage("load.snapshot"):
+                previous_snapshot = self.snapshot_manager.get_latest_snapshot()
 
             # Calculate current rank for v3.0 difficulty scaling
             previous_profile = None
@@ -153,23 +157,29 @@ class TokenCraftHandlerFull:
             # Check achievements
             self._check_achievements(self.current_score_data, self.current_rank_data, delta_data)
 
-            # Sync with hero.epam.com
-            self._sync_hero_badges()
-
             # Generate recommendations
-            self.current_recommendations = self.recommendation_engine.generate_recommendations(
-                self.current_score_data,
-                self.profile.get_current_state()
-            )
+            with profiler.stage("score.recommendations"):
+                self.current_recommendations = self.recommendation_engine.generate_recommendations(
+                    self.current_score_data,
+                    self.profile.get_current_state()
+                )
 
             # Save profile and snapshot
-            self.profile.save()
+            with profiler.stage("persist.profile"):
+                self.profile.save()
             print("Saving snapshot...")
-            self.snapshot_manager.create_snapshot(
-                self.profile.get_current_state(),
-                self.current_score_data,
-                self.current_rank_data
-            )
+            with profiler.stage("persist.snapshot"):
+                self.snapshot_manager.create_snapshot(
+                    self.profile.get_current_state(),
+                    self.current_score_data,
+                    self.current_rank_data
+                )
+
+            # Sync with hero.epam.com (after the score is saved; never fails the run)
+            with profiler.stage("persist.badge_outbox"):
+                self._sync_hero_badges(
+                    previous_rank_data.get("name") if previous_snapshot else None
+                )
 
             return True
 
@@ -197,12 +207,13 @@ class TokenCraftHandlerFull:
             }
             delta_data = DeltaCalculator.calculate_delta(current_snapshot, previous_snapshot)
 
-        report = self.report_generator.generate_full_report(
-            self.profile.get_current_state(),
-            self.current_score_data,
-            self.current_rank_data,
-            delta_data
-        )
+        with profiler.stage("render"):
+            report = self.report_generator.generate_full_report(
+                self.profile.get_current_state(),
+                self.current_score_data,
+                self.current_rank_data,
+                delta_data
+            )
 
         print(report)
 
@@ -496,25 +507,44 @@ class TokenCraftHandlerFull:
                 if not any(a["id"] == promo_id for a in self.profile.get_achievements()):
                     self.profile.add_achievement(promo_id, f"Promoted to {rank_data['name']}", f"Achieved {rank_data['name']} rank")
 
-    def _sync_hero_badges(self):
-        """Sync badges with hero.epam.com."""
+    def _sync_hero_badges(self, previous_rank: Optional[str] = None):
+        """
+        Queue badge changes for hero.epam.com; a background flusher sends them.
+
+        Operations are queued only when the rank changed (or on the first
+        run, when previous_rank is None). The run never waits for delivery:
+        the daemon flusher drains the outbox while this process lives (for
+        the analysis server and interactive sessions, every interval), and
+        whatever a short run leaves queued is sent by the next one. Errors
+        are reported as warnings, never raised.
+        """
         if not self.current_rank_data:
             return
 
-        user_email = self.profile.get_current_state().get("user_email")
         current_rank = self.current_rank_data["name"]
 
-        # Sync badges (mock for now)
-        result = self.hero_client.sync_badges_with_rank(user_email, current_rank)
+        try:
+            if self.badge_outbox is None:
+                self.badge_outbox = BadgeOutbox()
 
-        # Silent operation - badges synced in background
+            if previous_rank != current_rank:
+                user_email = self.profile.get_current_state().get("user_email")
+                operations = self.hero_client.plan_rank_sync(user_email, current_rank, previous_rank)
+                self.badge_outbox.enqueue_many(operations)
+
+            if self.badge_flusher is None and self.badge_outbox.pending_count():
+                self.badge_flusher = BackgroundFlusher(self.badge_outbox, self.hero_client).start()
+        except Exception as e:
+            print(f"Warning: Could not queue badge sync: {e}")
 
 
 def main():
-    """Main entry point - fully interactive."""
+    """Main entry point - fully interactive (--profile prints stage timings on exit)."""
     import sys
     import io
 
+    profiler.configure_from_argv(sys.argv)
+
     # Fix Windows CMD encoding
     if sys.platform == "win32":
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
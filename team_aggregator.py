@@ -12,6 +12,12 @@ from datetime import datetime, timedelta
 import subprocess
 import re
 
+from token_craft import codec, profiler
+
+# Analysis modules are imported by the commands that use them, so each
+# command (and the interactive menu) only pays for its own imports
+
+
 def get_user_identity():
     """Get user identity from git config."""
     try:
@@ -169,8 +175,17 @@ def get_date_range():
         else:
             print("  [!] Invalid choice. Enter preset code or 'C'")
 
-def export_personal_stats(output_dir, date_from=None, date_to=None):
-    """Export personal token statistics."""
+def export_personal_stats(output_dir, date_from=None, date_to=None, fmt=None):
+    """Export personal token statistics.
+
+    fmt is 'json' (indented, the default) or 'binary' (compact, see
+    token_craft.codec); aggregate reads both.
+    """
+    from token_craft.history_compactor import history_reader
+    from token_craft.line_scanner import PROMPT_KEYS
+    from token_craft.persistence import create_unique
+    from token_craft.records import Codebook, ProjectCodebook
+
     print_header("EXPORTING PERSONAL STATISTICS")
 
     # Load data
@@ -189,18 +204,23 @@ def export_personal_stats(output_dir, date_from=None, date_to=None):
     ts_from = int(date_from.timestamp() * 1000) if date_from else None
     ts_to = int(date_to.timestamp() * 1000) if date_to else None
 
-    # Load sessions with time filtering
-    sessions = defaultdict(list)
-    session_metadata = {}
-
-    with open(history_path, 'r', encoding='utf-8') as f:
-        for line in f:
+    # Load sessions with time filtering; session IDs and project paths are
+    # dictionary-encoded so grouping and aggregation run on int keys
+    with profiler.stage("load.history") as st:
+        sessions = defaultdict(list)
+        session_projects = {}  # session code -> project name code
+        session_codes = Codebook()
+        projects = ProjectCodebook()
+
+        # Compacted history if present; otherwise rotated segments wholly
+        # outside the date range are not decompressed
+        history = history_reader(history_path)
+        for message in history.messages(ts_from, ts_to, require=PROMPT_KEYS):
             try:
-                entry = json.loads(line.strip())
-                if 'sessionId' not in entry or 'display' not in entry:
+                if message.session_id is None or message.display is None:
                     continue
 
-                timestamp = entry.get('timestamp', 0)
+                timestamp = message.get('timestamp', 0)
 
                 # Apply time filtering
                 if ts_from and timestamp < ts_from:
@@ -208,80 +228,82 @@ def export_personal_stats(output_dir, date_from=None, date_to=None):
                 if ts_to and timestamp > ts_to:
                     continue
 
-                session_id = entry['sessionId']
-                sessions[session_id].append({
-                    'message': entry['display'],
-                    'timestamp': timestamp
-                })
-
-                if session_id not in session_metadata:
-                    session_metadata[session_id] = {
-                        'project': entry.get('project', 'Unknown'),
-                        'timestamp': timestamp
-                    }
+                session_code = session_codes.encode(message.session_id)
+                sessions[session_code].append(message)
+
+                if session_code not in session_projects:
+                    project_code = projects.encode(message.get('project', 'Unknown'))
+                    session_projects[session_code] = projects.name_codes[project_code]
             except:
                 continue
+        st.count("messages_parsed", sum(len(msgs) for msgs in sessions.values()))
+        st.count("sessions_built", len(sessions))
+        st.count("segments_skipped", history.segments_skipped)
 
     if not sessions:
         print("\n[!] No sessions found in the specified date range")
         return None
 
     # Load token stats
-    with open(stats_path, 'r', encoding='utf-8') as f:
-        stats = json.load(f)
+    with profiler.stage("load.stats"):
+        with open(stats_path, 'r', encoding='utf-8') as f:
+            stats = json.load(f)
 
     # Get user identity
     user = get_user_identity()
 
-    # Calculate statistics
-    total_sessions = len(sessions)
-    total_messages = sum(len(msgs) for msgs in sessions.values())
-
-    # Calculate by project
-    project_stats = defaultdict(lambda: {'sessions': 0, 'messages': 0})
-    for session_id, messages in sessions.items():
-        metadata = session_metadata.get(session_id, {})
-        project_path = metadata.get('project', 'Unknown')
-        project_name = Path(project_path).name if project_path != 'Unknown' else 'Unknown'
-
-        project_stats[project_name]['sessions'] += 1
-        project_stats[project_name]['messages'] += len(messages)
-
-    # Calculate date range
-    all_timestamps = [m['timestamp'] for msgs in sessions.values() for m in msgs]
-    actual_range = {
-        'from': min(all_timestamps) if all_timestamps else 0,
-        'to': max(all_timestamps) if all_timestamps else 0
-    }
+    with profiler.stage("score.summary"):
+        # Calculate statistics
+        total_sessions = len(sessions)
+        total_messages = sum(len(msgs) for msgs in sessions.values())
+
+        # Calculate by project (on name codes, first-seen order)
+        project_sessions = {}
+        project_messages = {}
+        for session_code, messages in sessions.items():
+            name_code = session_projects[session_code]
+            project_sessions[name_code] = project_sessions.get(name_code, 0) + 1
+            project_messages[name_code] = project_messages.get(name_code, 0) + len(messages)
+
+        project_names = projects.names.values
+        project_stats = {
+            project_names[code]: {'sessions': count, 'messages': project_messages[code]}
+            for code, count in project_sessions.items()
+        }
 
-    # Create export data
-    export_data = {
-        'exported_at': datetime.now().isoformat(),
-        'user': user,
-        'date_range': {
-            'from': datetime.fromtimestamp(actual_range['from'] / 1000).isoformat() if actual_range['from'] else None,
-            'to': datetime.fromtimestamp(actual_range['to'] / 1000).isoformat() if actual_range['to'] else None
-        },
-        'summary': {
-            'total_sessions': total_sessions,
-            'total_messages': total_messages,
-            'model_usage': stats.get('modelUsage', {})
-        },
-        'by_project': dict(project_stats),
-        'daily_activity': stats.get('dailyActivity', []),
-        'daily_model_tokens': stats.get('dailyModelTokens', [])
-    }
+        # Calculate date range
+        all_timestamps = [m.timestamp if m.timestamp is not None else 0 for msgs in sessions.values() for m in msgs]
+        actual_range = {
+            'from': min(all_timestamps) if all_timestamps else 0,
+            'to': max(all_timestamps) if all_timestamps else 0
+        }
 
-    # Save to output directory
-    output_dir = Path(output_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
+        # Create export data
+        export_data = {
+            'exported_at': datetime.now().isoformat(),
+            'user': user,
+            'date_range': {
+                'from': datetime.fromtimestamp(actual_range['from'] / 1000).isoformat() if actual_range['from'] else None,
+                'to': datetime.fromtimestamp(actual_range['to'] / 1000).isoformat() if actual_range['to'] else None
+            },
+            'summary': {
+                'total_sessions': total_sessions,
+                'total_messages': total_messages,
+                'model_usage': stats.get('modelUsage', {})
+            },
+            'by_project': dict(project_stats),
+            'daily_activity': stats.get('dailyActivity', []),
+            'daily_model_tokens': stats.get('dailyModelTokens', [])
+        }
 
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = f"{user['email'].replace('@', '_at_')}_{timestamp}.json"
-    output_path = output_dir / filename
+    # Save to output directory
+    with profiler.stage("persist.export"):
+        output_dir = Path(output_dir)
 
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(export_data, f, indent=2)
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        fmt = fmt or codec.default_format()
+        filename = f"{user['email'].replace('@', '_at_')}_{timestamp}{codec.suffix_for(fmt)}"
+        output_path = create_unique(output_dir / filename, codec.dumps(export_data, fmt))
 
     print(f"\n[+] Statistics Exported!")
     print(f"    File: {output_path}")
@@ -299,8 +321,213 @@ def export_personal_stats(output_dir, date_from=None, date_to=None):
 
     return str(output_path)
 
-def aggregate_team_stats(stats_dir):
-    """Aggregate statistics from all team members."""
+def compact_history(rebuild=False):
+    """Write or update the compacted history that analysis reads instead of history.jsonl."""
+    from token_craft.history_compactor import HistoryCompactor
+    from token_craft.history_segments import find_segments
+
+    print_header("COMPACTING HISTORY")
+
+    history_path = Path.home() / '.claude' / 'history.jsonl'
+    if not history_path.exists():
+        print(f"\n[!] Error: Claude history not found at {history_path}")
+        return None
+
+    compactor = HistoryCompactor(history_path)
+    with profiler.stage("persist.compact") as st:
+        added = compactor.sync(rebuild=rebuild)
+        st.count("messages_compacted", added)
+
+    source_bytes = sum(segment.path.stat().st_size for segment in find_segments(history_path))
+    compact_bytes = compactor.compact_path.stat().st_size
+    print(f"\n[+] {added} new messages compacted")
+    print(f"    File: {compactor.compact_path}")
+    print(f"    Size: {compact_bytes / 1024:.0f} KB vs {source_bytes / 1024:.0f} KB of history"
+          f" ({compact_bytes / source_bytes * 100 if source_bytes else 0:.0f}%)")
+    print("    Analysis now reads the compact file and keeps it in sync")
+
+    return compactor.compact_path
+
+def load_rollup_cube(cube_path=None, rebuild=False):
+    """Load the daily rollup cube and fold in new history.jsonl lines."""
+    from token_craft.rollup_cube import RollupCube
+
+    history_path = Path.home() / '.claude' / 'history.jsonl'
+
+    with profiler.stage("load.rollup") as st:
+        cube = RollupCube(cube_path) if rebuild else RollupCube.load(cube_path)
+        counted = cube.update(history_path)
+        st.count("messages_parsed", counted)
+        if counted or rebuild:
+            cube.save()
+
+    return cube
+
+def show_rollup(date_from=None, date_to=None, by='day', projects=None, cube_path=None, rebuild=False):
+    """Print window totals from the daily rollup cube (no history rescan)."""
+    print_header("DAILY ROLLUP")
+
+    cube = load_rollup_cube(cube_path, rebuild)
+    if not cube.cells:
+        print("\n[!] No history found to roll up")
+        return None
+
+    with profiler.stage("score.rollup"):
+        groups = cube.rollup(date_from, date_to, projects, by)
+        totals = cube.totals(date_from, date_to, projects)
+
+    days = cube.days()
+    print(f"\nCube covers {days[0]} to {days[-1]} ({len(days)} active days)")
+    window_from = date_from.strftime('%Y-%m-%d') if date_from else days[0]
+    window_to = date_to.strftime('%Y-%m-%d') if date_to else days[-1]
+    print(f"Window: {window_from} to {window_to}")
+    if projects:
+        print(f"Projects: {', '.join(projects)}")
+
+    with profiler.stage("render"):
+        print(f"\n  {by.upper():24} {'SESS-DAYS':>9} {'MESSAGES':>9} {'AVG CHARS':>10}")
+        for label, counts in groups.items():
+            avg_chars = counts['chars'] / counts['messages'] if counts['messages'] else 0
+            print(f"  {label:24} {counts['session_days']:>9} {counts['messages']:>9} {avg_chars:>10.0f}")
+        print(f"\n  {'TOTAL':24} {totals['session_days']:>9} {totals['messages']:>9}")
+        print("\n  Session-days: a session active on several days counts once per day")
+
+    return groups
+
+def compare_periods(windows, output_file=None):
+    """Compare named date windows side by side from one pass over the history."""
+    from token_craft.history_compactor import history_reader
+    from token_craft.line_scanner import PROMPT_KEYS
+    from token_craft.window_compare import METRICS, compare_windows
+
+    print_header("COMPARING TIME WINDOWS")
+
+    claude_dir = Path.home() / '.claude'
+    history_path = claude_dir / 'history.jsonl'
+    stats_path = claude_dir / 'stats-cache.json'
+
+    if not history_path.exists():
+        print(f"\n[!] Error: Claude history not found at {history_path}")
+        return None
+
+    stats = {}
+    with profiler.stage("load.stats"):
+        if stats_path.exists():
+            with open(stats_path, 'r', encoding='utf-8') as f:
+                stats = json.load(f)
+
+    # Parse and partition in the same streaming pass
+    # Only segments overlapping some window are read
+    ts_from = int(datetime.strptime(min(w.date_from for w in windows), '%Y-%m-%d').timestamp() * 1000)
+    ts_to = int((datetime.strptime(max(w.date_to for w in windows), '%Y-%m-%d')
+                 + timedelta(days=1)).timestamp() * 1000)
+
+    with profiler.stage("score.compare") as st:
+        history = history_reader(history_path)
+        report = compare_windows(history.messages(ts_from, ts_to, require=PROMPT_KEYS), windows, stats)
+        st.count("messages_parsed", report['messages_scanned'])
+        st.count("segments_skipped", history.segments_skipped)
+
+    with profiler.stage("render"):
+        results = report['windows']
+        deltas = {delta['name']: delta for delta in report['deltas']}
+
+        cells = {}
+        for metric in METRICS:
+            for result in results:
+                value = result[metric]
+                change = deltas.get(result['name'], {}).get(metric)
+                cell = f"{value:,}" if isinstance(value, int) else f"{value:,.1f}"
+                if change is not None:
+                    cell += f" ({change:+.0f}%)"
+                cells[metric, result['name']] = cell
+        width = max(len(cell) for cell in list(cells.values()) + [r['name'] for r in results] + ['00-00..00-00']) + 3
+
+        print()
+        print(f"  {'':26}" + "".join(f"{r['name']:>{width}}" for r in results))
+        print(f"  {'':26}" + "".join(f"{r['from'][5:] + '..' + r['to'][5:]:>{width}}" for r in results))
+        for metric in METRICS:
+            print(f"  {metric.replace('_', ' '):26}" + "".join(f"{cells[metric, r['name']]:>{width}}" for r in results))
+
+        # Top projects across all windows
+        project_totals = defaultdict(int)
+        for result in results:
+            for project, pstats in result['by_project'].items():
+                project_totals[project] += pstats['sessions']
+        top_projects = sorted(project_totals, key=project_totals.get, reverse=True)[:5]
+        if top_projects:
+            print("\n  Sessions by project:")
+            for project in top_projects:
+                row = f"  {project[:26]:26}"
+                for result in results:
+                    row += f"{result['by_project'].get(project, {}).get('sessions', 0):>{width}}"
+                print(row)
+
+        if len(results) > 1:
+            print(f"\n  (%) change vs '{results[0]['name']}'")
+
+    if output_file:
+        with profiler.stage("persist.export"):
+            report['compared_at'] = datetime.now().isoformat()
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2)
+        print(f"\n[+] Report saved to: {output_file}")
+
+    return report
+
+def batch_score(histories_dir, output_dir=None, workers=None):
+    """Score every user's raw history in a directory across a process pool.
+
+    Writes one results table to output_dir (default: the leaderboard's
+    team-stats directory) and returns its path.
+    """
+    from token_craft.batch_scorer import build_table, discover_users, score_users, table_records, write_table
+
+    print_header("BATCH SCORING")
+
+    histories_dir = Path(histories_dir)
+    if not histories_dir.is_dir():
+        print(f"\n[!] Directory not found: {histories_dir}")
+        return None
+
+    with profiler.stage("load.glob") as st:
+        jobs = discover_users(histories_dir)
+        st.count("users_found", len(jobs))
+
+    if not jobs:
+        print(f"\n[!] No user directories with a history.jsonl found in {histories_dir}")
+        return None
+
+    print(f"\nScoring {len(jobs)} user(s)...")
+    with profiler.stage("score.batch") as st:
+        rows = score_users(jobs, workers)
+        st.count("users_scored", len(rows))
+
+    output_dir = Path(output_dir) if output_dir else Path.home() / '.claude' / 'token-craft' / 'team-stats'
+    with profiler.stage("persist.export"):
+        table_path = write_table(rows, output_dir)
+
+    with profiler.stage("render"):
+        records = list(table_records(build_table(rows), include_errors=True))
+        print(f"\n  {'USER':32} {'SCORE':>8} {'RANK':14} {'SESSIONS':>9} {'TOKENS/SESSION':>15}")
+        for record in sorted(records, key=lambda r: r['current_score'] or 0, reverse=True):
+            if record['error']:
+                print(f"  {record['user_email'][:32]:32} [!] {record['error']}")
+                continue
+            print(f"  {record['user_email'][:32]:32} {record['current_score']:>8.1f} {record['current_rank']:14} "
+                  f"{record['total_sessions']:>9} {record['avg_tokens_per_session']:>15,.0f}")
+
+    print(f"\n[+] Results table saved to: {table_path}")
+    return table_path
+
+def aggregate_team_stats(stats_dir, prompt_save=True):
+    """Aggregate statistics from all team members.
+
+    Set prompt_save=False to skip the interactive "save report" question
+    (automation and benchmarks).
+    """
+    from token_craft.change_point import team_change_points
+
     print_header("AGGREGATING TEAM STATISTICS")
 
     stats_dir = Path(stats_dir)
@@ -310,27 +537,30 @@ def aggregate_team_stats(stats_dir):
 
     # Load all team member stats
     team_data = []
-    json_files = list(stats_dir.glob('*_at_*.json'))
+    with profiler.stage("load.glob") as st:
+        json_files = codec.glob_any(stats_dir, '*_at_*.json')
+        st.count("files_globbed", len(json_files))
 
     if not json_files:
         print(f"\n[!] No team statistics files found in {stats_dir}")
-        print("    Files should match pattern: *_at_*.json")
+        print("    Files should match pattern: *_at_*.json (or *_at_*.tkc)")
         return None
 
     print(f"\nFound {len(json_files)} potential stat file(s)...")
 
-    for stat_file in json_files:
-        try:
-            with open(stat_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+    with profiler.stage("load.exports") as st:
+        for stat_file in json_files:
+            try:
+                data = codec.load(stat_file)
                 # Validate structure
-                if 'user' in data and 'summary' in data:
+                if isinstance(data, dict) and 'user' in data and 'summary' in data:
                     team_data.append(data)
                     print(f"  [+] Loaded: {stat_file.name}")
                 else:
                     print(f"  [!] Skipped (invalid format): {stat_file.name}")
-        except Exception as e:
-            print(f"  [!] Error loading {stat_file.name}: {e}")
+            except Exception as e:
+                print(f"  [!] Error loading {stat_file.name}: {e}")
+        st.count("files_loaded", len(team_data))
 
     if not team_data:
         print("\n[!] No valid statistics files found")
@@ -338,115 +568,130 @@ def aggregate_team_stats(stats_dir):
 
     print(f"\n[+] Successfully loaded {len(team_data)} team member(s)")
 
-    # Aggregate data
-    team_summary = {
-        'aggregated_at': datetime.now().isoformat(),
-        'team_size': len(team_data),
-        'members': [],
-        'totals': {
-            'sessions': 0,
-            'messages': 0,
-            'tokens': defaultdict(lambda: {'input': 0, 'output': 0})
-        },
-        'by_project': defaultdict(lambda: {'sessions': 0, 'messages': 0, 'contributors': set()}),
-        'by_member': []
-    }
+    with profiler.stage("score.aggregate"):
+        # Aggregate data
+        team_summary = {
+            'aggregated_at': datetime.now().isoformat(),
+            'team_size': len(team_data),
+            'members': [],
+            'totals': {
+                'sessions': 0,
+                'messages': 0,
+                'tokens': defaultdict(lambda: {'input': 0, 'output': 0})
+            },
+            'by_project': defaultdict(lambda: {'sessions': 0, 'messages': 0, 'contributors': set()}),
+            'by_member': []
+        }
 
-    for member_data in team_data:
-        user = member_data['user']
-        summary = member_data['summary']
-
-        # Add member info
-        team_summary['members'].append({
-            'name': user['name'],
-            'email': user['email'],
-            'sessions': summary['total_sessions'],
-            'messages': summary['total_messages']
-        })
-
-        # Aggregate totals
-        team_summary['totals']['sessions'] += summary['total_sessions']
-        team_summary['totals']['messages'] += summary['total_messages']
-
-        # Aggregate tokens by model
-        for model, usage in summary.get('model_usage', {}).items():
-            team_summary['totals']['tokens'][model]['input'] += usage.get('inputTokens', 0)
-            team_summary['totals']['tokens'][model]['output'] += usage.get('outputTokens', 0)
-
-        # Aggregate by project
-        for project, pstats in member_data.get('by_project', {}).items():
-            team_summary['by_project'][project]['sessions'] += pstats['sessions']
-            team_summary['by_project'][project]['messages'] += pstats['messages']
-            team_summary['by_project'][project]['contributors'].add(user['email'])
-
-        # Member-level stats
-        team_summary['by_member'].append({
-            'user': user,
-            'sessions': summary['total_sessions'],
-            'messages': summary['total_messages'],
-            'top_projects': sorted(
-                member_data.get('by_project', {}).items(),
-                key=lambda x: x[1]['sessions'],
-                reverse=True
-            )[:3]
-        })
-
-    # Convert sets to lists for JSON serialization
-    for project in team_summary['by_project'].values():
-        project['contributors'] = list(project['contributors'])
-        project['contributor_count'] = len(project['contributors'])
-
-    team_summary['totals']['tokens'] = dict(team_summary['totals']['tokens'])
-    team_summary['by_project'] = dict(team_summary['by_project'])
-
-    # Display results
-    print_header("TEAM SUMMARY")
-
-    print(f"\n[+] Team Overview:")
-    print(f"    Team size: {team_summary['team_size']} members")
-    print(f"    Total sessions: {team_summary['totals']['sessions']}")
-    print(f"    Total messages: {team_summary['totals']['messages']}")
-
-    print(f"\n[+] Team Members:")
-    sorted_members = sorted(team_summary['members'], key=lambda x: x['sessions'], reverse=True)
-    for member in sorted_members:
-        print(f"    {member['name']} <{member['email']}>")
-        print(f"      Sessions: {member['sessions']}, Messages: {member['messages']}")
-
-    print(f"\n[+] Top Team Projects:")
-    sorted_projects = sorted(
-        team_summary['by_project'].items(),
-        key=lambda x: x[1]['sessions'],
-        reverse=True
-    )[:10]
-
-    for project, pstats in sorted_projects:
-        print(f"    {project}")
-        print(f"      Sessions: {pstats['sessions']}, Messages: {pstats['messages']}")
-        print(f"      Contributors: {pstats['contributor_count']}")
-
-    print(f"\n[+] Token Usage by Model:")
-    for model, usage in team_summary['totals']['tokens'].items():
-        model_name = model.split('/')[-1]
-        total = usage['input'] + usage['output']
-        print(f"    {model_name}:")
-        print(f"      Input: {usage['input']:,}, Output: {usage['output']:,}")
-        print(f"      Total: {total:,}")
-
-    print(f"\n[+] Individual Contributions:")
-    for member_stats in sorted(team_summary['by_member'], key=lambda x: x['sessions'], reverse=True):
-        user = member_stats['user']
-        print(f"\n    {user['name']}:")
-        print(f"      Total sessions: {member_stats['sessions']}")
-        print(f"      Total messages: {member_stats['messages']}")
-        if member_stats['top_projects']:
-            print(f"      Top projects:")
-            for project, pstats in member_stats['top_projects']:
-                print(f"        - {project}: {pstats['sessions']} sessions")
+        for member_data in team_data:
+            user = member_data['user']
+            summary = member_data['summary']
+
+            # Add member info
+            team_summary['members'].append({
+                'name': user['name'],
+                'email': user['email'],
+                'sessions': summary['total_sessions'],
+                'messages': summary['total_messages']
+            })
+
+            # Aggregate totals
+            team_summary['totals']['sessions'] += summary['total_sessions']
+            team_summary['totals']['messages'] += summary['total_messages']
+
+            # Aggregate tokens by model
+            for model, usage in summary.get('model_usage', {}).items():
+                team_summary['totals']['tokens'][model]['input'] += usage.get('inputTokens', 0)
+                team_summary['totals']['tokens'][model]['output'] += usage.get('outputTokens', 0)
+
+            # Aggregate by project
+            for project, pstats in member_data.get('by_project', {}).items():
+                team_summary['by_project'][project]['sessions'] += pstats['sessions']
+                team_summary['by_project'][project]['messages'] += pstats['messages']
+                team_summary['by_project'][project]['contributors'].add(user['email'])
+
+            # Member-level stats
+            team_summary['by_member'].append({
+                'user': user,
+                'sessions': summary['total_sessions'],
+                'messages': summary['total_messages'],
+                'top_projects': sorted(
+                    member_data.get('by_project', {}).items(),
+                    key=lambda x: x[1]['sessions'],
+                    reverse=True
+                )[:3]
+            })
+
+        # Convert sets to lists for JSON serialization
+        for project in team_summary['by_project'].values():
+            project['contributors'] = list(project['contributors'])
+            project['contributor_count'] = len(project['contributors'])
+
+        team_summary['totals']['tokens'] = dict(team_summary['totals']['tokens'])
+        team_summary['by_project'] = dict(team_summary['by_project'])
+
+    with profiler.stage("score.change_points") as st:
+        # Page-Hinkley over each member's daily tokens/session, one detector per member
+        team_summary['efficiency_changes'] = team_change_points(team_data)
+        st.count("members_flagged", sum(1 for m in team_summary['efficiency_changes'] if m['active']))
+
+    with profiler.stage("render"):
+        # Display results
+        print_header("TEAM SUMMARY")
+
+        print(f"\n[+] Team Overview:")
+        print(f"    Team size: {team_summary['team_size']} members")
+        print(f"    Total sessions: {team_summary['totals']['sessions']}")
+        print(f"    Total messages: {team_summary['totals']['messages']}")
+
+        print(f"\n[+] Team Members:")
+        sorted_members = sorted(team_summary['members'], key=lambda x: x['sessions'], reverse=True)
+        for member in sorted_members:
+            print(f"    {member['name']} <{member['email']}>")
+            print(f"      Sessions: {member['sessions']}, Messages: {member['messages']}")
+
+        print(f"\n[+] Top Team Projects:")
+        sorted_projects = sorted(
+            team_summary['by_project'].items(),
+            key=lambda x: x[1]['sessions'],
+            reverse=True
+        )[:10]
+
+        for project, pstats in sorted_projects:
+            print(f"    {project}")
+            print(f"      Sessions: {pstats['sessions']}, Messages: {pstats['messages']}")
+            print(f"      Contributors: {pstats['contributor_count']}")
+
+        print(f"\n[+] Token Usage by Model:")
+        for model, usage in team_summary['totals']['tokens'].items():
+            model_name = model.split('/')[-1]
+            total = usage['input'] + usage['output']
+            print(f"    {model_name}:")
+            print(f"      Input: {usage['input']:,}, Output: {usage['output']:,}")
+            print(f"      Total: {total:,}")
+
+        print(f"\n[+] Individual Contributions:")
+        for member_stats in sorted(team_summary['by_member'], key=lambda x: x['sessions'], reverse=True):
+            user = member_stats['user']
+            print(f"\n    {user['name']}:")
+            print(f"      Total sessions: {member_stats['sessions']}")
+            print(f"      Total messages: {member_stats['messages']}")
+            if member_stats['top_projects']:
+                print(f"      Top projects:")
+                for project, pstats in member_stats['top_projects']:
+                    print(f"        - {project}: {pstats['sessions']} sessions")
+
+        flagged = [m for m in team_summary['efficiency_changes'] if m['change_dates']]
+        if flagged:
+            print(f"\n[+] Tokens/Session Shifts (Page-Hinkley):")
+            for member in sorted(flagged, key=lambda m: m['change_dates'][-1], reverse=True):
+                status = "ACTIVE" if member['active'] else "past"
+                print(f"    {member['user'].get('name', 'unknown')}: "
+                      f"shifted up on {', '.join(member['change_dates'])} ({status})")
 
     # Ask to save report
     print("\n" + "=" * 70)
-    save_report = get_yes_no("Save team report to file?")
+    save_report = prompt_save and get_yes_no("Save team report to file?")
 
     if save_report:
         report_name = input("  Report filename (or Enter for default): ").strip()
@@ -625,6 +870,10 @@ COMMAND-LINE MODE:
   For automation, use:
     python team_aggregator.py export --output-dir ./dir
     python team_aggregator.py aggregate --stats-dir ./dir
+    python team_aggregator.py score --histories ./histories --workers 8
+    python team_aggregator.py rollup --by week
+    python team_aggregator.py compare --window jan=2024-01-01:2024-01-31 \\
+                                      --window feb=2024-02-01:2024-02-29
 
   Run with --help for all options
 """)
@@ -633,6 +882,8 @@ COMMAND-LINE MODE:
 
 def main():
     """Main entry point."""
+    profiler.configure_from_argv(sys.argv)
+
     try:
         # Check if command-line args provided (automation mode)
         if len(sys.argv) > 1:
@@ -647,18 +898,47 @@ def main():
             export_parser.add_argument('--date-from', help='Filter from date (YYYY-MM-DD)')
             export_parser.add_argument('--date-to', help='Filter to date (YYYY-MM-DD)')
             export_parser.add_argument('--commit', action='store_true', help='Auto-commit to git')
+            export_parser.add_argument('--format', choices=codec.FORMATS,
+                                       help='json (readable, default) or binary (compact .tkc)')
 
             # Aggregate command
             aggregate_parser = subparsers.add_parser('aggregate', help='Aggregate team statistics')
             aggregate_parser.add_argument('--stats-dir', required=True, help='Directory with team stats')
 
+            # Score command (raw histories of many users, process pool)
+            score_parser = subparsers.add_parser('score', help='Batch-score many users\' raw histories')
+            score_parser.add_argument('--histories', required=True,
+                                      help='Directory with one sub-directory (history.jsonl, stats-cache.json) per user')
+            score_parser.add_argument('--output-dir', help='Results table directory (default: ~/.claude/token-craft/team-stats)')
+            score_parser.add_argument('--workers', type=int, help='Worker processes (default: CPU count)')
+
+            # Compare command (many windows, one pass)
+            compare_parser = subparsers.add_parser('compare', help='Compare date windows side by side')
+            compare_parser.add_argument('--window', action='append', required=True, metavar='NAME=FROM:TO',
+                                        help='Named window, e.g. before=2024-01-01:2024-01-31 (repeatable, inclusive)')
+            compare_parser.add_argument('--output', help='Also save the report as JSON')
+
+            # Rollup command (daily cube, updated incrementally)
+            rollup_parser = subparsers.add_parser('rollup', help='Window totals from the daily rollup cube')
+            rollup_parser.add_argument('--date-from', help='Window start (YYYY-MM-DD)')
+            rollup_parser.add_argument('--date-to', help='Window end, inclusive (YYYY-MM-DD)')
+            rollup_parser.add_argument('--by', default='day',
+                                       help='Grouping: total, day, week, project, category or work_type (default: day)')
+            rollup_parser.add_argument('--project', action='append', help='Only this project (repeatable)')
+            rollup_parser.add_argument('--cube', help='Cube file (default: ~/.claude/token-craft/rollup_cube.json)')
+            rollup_parser.add_argument('--rebuild', action='store_true', help='Rebuild the cube from the full history')
+
+            # Compact command (slimmed history for analysis)
+            compact_parser = subparsers.add_parser('compact', help='Write a compacted history for faster analysis')
+            compact_parser.add_argument('--rebuild', action='store_true', help='Recompact the full history')
+
             args = parser.parse_args()
 
             if args.command == 'export':
                 date_from = datetime.strptime(args.date_from, '%Y-%m-%d') if args.date_from else None
                 date_to = datetime.strptime(args.date_to, '%Y-%m-%d') if args.date_to else None
 
-                output_file = export_personal_stats(args.output_dir, date_from, date_to)
+                output_file = export_personal_stats(args.output_dir, date_from, date_to, args.format)
 
                 if args.commit and output_file:
                     try:
@@ -674,6 +954,28 @@ def main():
             elif args.command == 'aggregate':
                 aggregate_team_stats(args.stats_dir)
 
+            elif args.command == 'score':
+                batch_score(args.histories, args.output_dir, args.workers)
+
+            elif args.command == 'compare':
+                from token_craft.window_compare import DateWindow
+                try:
+                    windows = [DateWindow.parse(spec) for spec in args.window]
+                except ValueError as e:
+                    parser.error(str(e))
+                compare_periods(windows, args.output)
+
+            elif args.command == 'rollup':
+                from token_craft.rollup_cube import GROUP_BY
+                if args.by not in GROUP_BY:
+                    parser.error(f"argument --by: invalid choice: {args.by!r} (choose from {', '.join(GROUP_BY)})")
+                date_from = datetime.strptime(args.date_from, '%Y-%m-%d') if args.date_from else None
+                date_to = datetime.strptime(args.date_to, '%Y-%m-%d') if args.date_to else None
+                show_rollup(date_from, date_to, args.by, args.project, args.cube, args.rebuild)
+
+            elif args.command == 'compact':
+                compact_history(args.rebuild)
+
             else:
                 parser.print_help()
 
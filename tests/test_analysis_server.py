@@ -0,0 +1,151 @@
+"""
+Unit tests for the warm analysis server and incremental history reader.
+"""
+
+import json
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from analysis_server import AnalysisServer, HistoryTail, ServerBusy, request_report
+from token_craft.history_compactor import HistoryCompactor
+
+
+def _entry(i: int) -> str:
+    return json.dumps({
+        "display": f"fix the failing test in module{i}.py",
+        "timestamp": 1760000000000 + i * 60000,
+        "project": f"/work/project{i % 3}",
+        "sessionId": f"session{i // 10}",
+    })
+
+
+def _fields(messages) -> list:
+    return [(m.session_id, m.timestamp, m.display) for m in messages]
+
+
+class TestHistoryTail(unittest.TestCase):
+    """Test incremental history.jsonl parsing."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "history.jsonl"
+        self.path.write_text("\n".join(_entry(i) for i in range(5)) + "\n", encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_reads_only_appended_lines(self):
+        """Test a refresh after an append parses just the new lines."""
+        tail = HistoryTail(self.path)
+        self.assertEqual(tail.refresh(), 5)
+        self.assertEqual(tail.refresh(), 0)
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(_entry(5) + "\nnot json\n")
+        self.assertEqual(tail.refresh(), 1)
+        self.assertEqual(len(tail.get_entries()), 6)
+
+    def test_partial_last_line_not_duplicated(self):
+        """Test a line written without its newline is counted once."""
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(_entry(5))
+        tail = HistoryTail(self.path)
+        tail.refresh()
+        self.assertEqual(len(tail.get_entries()), 6)
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n" + _entry(6) + "\n")
+        tail.refresh()
+        self.assertEqual(len(tail.get_entries()), 7)
+
+    def test_truncated_file_is_reread(self):
+        """Test a rewritten, shorter file is parsed from the start."""
+        tail = HistoryTail(self.path)
+        tail.refresh()
+        self.path.write_text(_entry(9) + "\n", encoding="utf-8")
+        tail.refresh()
+        self.assertEqual(len(tail.get_entries()), 1)
+
+    def test_reads_compact_history_when_present(self):
+        """Test the tail follows the compact history, like in-process runs."""
+        compactor = HistoryCompactor(self.path)
+        compactor.sync()
+        tail = HistoryTail(self.path)
+        self.assertEqual(tail.refresh(), 5)
+        self.assertEqual(_fields(tail.get_entries()), _fields(compactor.messages()))
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(_entry(5) + "\n")
+        self.assertEqual(tail.refresh(), 1)
+        self.assertEqual(_fields(tail.get_entries()), _fields(compactor.messages()))
+
+        compactor.sync(rebuild=True)
+        tail.refresh()
+        self.assertEqual(_fields(tail.get_entries()), _fields(compactor.messages()))
+
+
+@unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix sockets not available")
+class TestAnalysisServer(unittest.TestCase):
+    """Test report requests over the Unix socket."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.claude_dir = Path(self.tmp.name)
+        self.history = self.claude_dir / "history.jsonl"
+        self.history.write_text("\n".join(_entry(i) for i in range(100)) + "\n", encoding="utf-8")
+        self.socket_path = self.claude_dir / "analysis.sock"
+
+        self.server = AnalysisServer(self.socket_path, self.claude_dir)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        for _ in range(100):
+            if self.socket_path.exists():
+                break
+            time.sleep(0.01)
+
+    def tearDown(self):
+        self.server.stop()
+        self.thread.join(timeout=5)
+        self.tmp.cleanup()
+
+    def test_quick_report_served(self):
+        """Test the server answers a quick report request."""
+        response = request_report("quick", self.socket_path)
+        self.assertIsNotNone(response)
+        self.assertIn("points", response["report"])
+        self.assertNotIn("Error running Token-Craft", response["report"])
+
+    def test_history_growth_picked_up(self):
+        """Test appended history is included in the next report."""
+        request_report("quick", self.socket_path)
+        with open(self.history, "a", encoding="utf-8") as f:
+            f.write(_entry(100) + "\n")
+        request_report("summary", self.socket_path)
+        self.assertEqual(len(self.server.history.get_entries()), 101)
+
+    def test_no_server_returns_none(self):
+        """Test clients fall back when nothing is listening."""
+        self.assertIsNone(request_report("quick", self.claude_dir / "missing.sock"))
+
+    def test_hung_server_is_busy(self):
+        """Test a server that takes a request but never answers is busy, not absent."""
+        hung_path = self.claude_dir / "hung.sock"
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as hung:
+            hung.bind(str(hung_path))
+            hung.listen(1)
+            started = time.perf_counter()
+            with self.assertRaises(ServerBusy):
+                request_report("quick", hung_path, timeout=0.2)
+            self.assertLess(time.perf_counter() - started, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Unit tests for the streaming dynamic baseline.
+"""
+
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.baseline_estimator import BUCKET_GROWTH, StreamingBaseline
+
+
+def sorted_baseline(counts, total_tokens, fixed):
+    """Reference: the former sort-based P25 baseline."""
+    if len(counts) < 10 or sum(counts) == 0:
+        return fixed
+    best = sorted(counts)[:max(1, len(counts) // 4)]
+    best_avg = sum(best) * total_tokens / (len(best) * sum(counts))
+    dynamic = max(15000, best_avg * 0.90)
+    if dynamic < (total_tokens / len(counts)) * 0.5:
+        return fixed
+    return round(min(dynamic, fixed), 0)
+
+
+class TestStreamingBaseline(unittest.TestCase):
+    """Test histogram selection against sorting every session."""
+
+    def test_matches_sorted_selection(self):
+        """Baseline equals the sort-based result on random inputs."""
+        rng = random.Random(3)
+        for _ in range(200):
+            counts = [rng.randint(0, 60) for _ in range(rng.randint(0, 120))]
+            total_tokens = rng.randint(10 ** 5, 10 ** 7)
+            estimator = StreamingBaseline.from_counts(counts, 30000)
+            self.assertEqual(estimator.baseline(total_tokens), sorted_baseline(counts, total_tokens, 30000))
+
+    def test_incremental_updates(self):
+        """Adding, growing and removing sessions matches a fresh build."""
+        estimator = StreamingBaseline(30000)
+        counts = [5, 40, 12, 3, 3, 25, 8, 60, 14, 9, 31, 2]
+        for count in counts:
+            estimator.add_session(count)
+
+        estimator.update_session(3, 7)
+        estimator.remove_session(60)
+        counts[counts.index(3)] = 7
+        counts.remove(60)
+
+        fresh = StreamingBaseline.from_counts(counts, 30000)
+        self.assertEqual(estimator.lowest_quartile(), fresh.lowest_quartile())
+        self.assertEqual(estimator.baseline(2000000), sorted_baseline(counts, 2000000, 30000))
+        self.assertEqual(StreamingBaseline.from_state(estimator.state()).lowest_quartile(), fresh.lowest_quartile())
+
+        with self.assertRaises(ValueError):
+            estimator.remove_session(999)
+
+    def test_token_sizes_stay_bounded(self):
+        """Distinct token totals share log buckets; the quartile sum stays within the bucket width."""
+        rng = random.Random(5)
+        tokens = [rng.randint(2000, 5 * 10 ** 6) for _ in range(50000)]
+        estimator = StreamingBaseline.from_counts(tokens, 10 ** 7)
+
+        self.assertLess(len(estimator.state()["buckets"]), 1000)
+        self.assertEqual(estimator.total, sum(tokens))
+        selected, size = estimator.lowest_quartile()
+        best = sorted(tokens)[:selected]
+        self.assertLessEqual(abs(size - sum(best)), BUCKET_GROWTH * sum(best))
+        restored = StreamingBaseline.from_state(estimator.state())
+        self.assertEqual(restored.lowest_quartile(), (selected, size))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Unit tests for team batch scoring.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.batch_scorer import COLUMNS, discover_users, score_users, table_records, write_table
+from token_craft.leaderboard_generator import LeaderboardGenerator
+
+
+class TestBatchScorer(unittest.TestCase):
+    """Test discovery, pooled scoring and the leaderboard hand-off."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.histories = self.temp_dir / "histories"
+
+        for user, sessions in (("alice@company.com", 12), ("bob", 3)):
+            user_dir = self.histories / user
+            user_dir.mkdir(parents=True)
+            with open(user_dir / "history.jsonl", "w", encoding="utf-8") as f:
+                for i in range(sessions * 4):
+                    f.write(json.dumps({
+                        "display": f"please fix the failing test number {i}",
+                        "timestamp": 1767600000000 + i * 600000,
+                        "project": f"/work/{'api' if i % 3 else 'web'}",
+                        "sessionId": f"{user}-{i // 4}",
+                    }) + "\n")
+                    # Assistant turns are not prompts
+                    f.write(json.dumps({
+                        "timestamp": 1767600000000 + i * 600000 + 1000,
+                        "sessionId": f"{user}-{i // 4}",
+                        "role": "assistant",
+                        "tokens": 400,
+                    }) + "\n")
+            with open(user_dir / "stats-cache.json", "w", encoding="utf-8") as f:
+                json.dump({"modelUsage": {"sonnet": {"inputTokens": 90000 * sessions, "outputTokens": 9000}}}, f)
+
+        (self.histories / "bob" / "user.json").write_text(json.dumps({"email": "bob@company.com"}))
+        (self.histories / "carol").mkdir()
+        (self.histories / "carol" / "history.jsonl").write_text("")
+        (self.histories / "carol" / "stats-cache.json").write_text("{broken")
+        (self.histories / "notes").mkdir()  # no history.jsonl: not a user
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_pool_matches_in_process(self):
+        """Pooled rows equal in-process rows; failures become error rows."""
+        jobs = discover_users(self.histories)
+        self.assertEqual([job["user"] for job in jobs], ["alice@company.com", "bob", "carol"])
+
+        pooled = score_users(jobs, workers=2, max_tasks_per_child=1)
+        self.assertEqual(pooled, score_users(jobs, workers=1))
+
+        rows = [dict(zip(COLUMNS, row)) for row in pooled]
+        self.assertEqual(rows[0]["total_messages"], 48)
+        self.assertEqual(rows[0]["projects"]["api"]["sessions"] + rows[0]["projects"]["web"]["sessions"], 12)
+        self.assertEqual(rows[1]["user_email"], "bob@company.com")
+        self.assertIn("JSONDecodeError", rows[2]["error"])
+
+    def test_leaderboard_reads_latest_table(self):
+        """The leaderboard ranks table rows like per-user exports."""
+        rows = score_users(discover_users(self.histories), workers=1)
+        stats_dir = self.temp_dir / "team-stats"
+        table_path = write_table(rows, stats_dir)
+        self.assertEqual(len(list(table_records(json.loads(table_path.read_text()), include_errors=True))), 3)
+
+        # An older table is ignored
+        stale = dict(zip(COLUMNS, rows[0]), user_email="old@company.com", error=None)
+        (stats_dir / "batch_scores_20000101_000000.json").write_text(json.dumps(
+            {"columns": list(COLUMNS), "rows": [[stale[c] for c in COLUMNS]]}))
+
+        leaderboard = LeaderboardGenerator(stats_dir).generate_company_leaderboard(anonymous=False)
+        self.assertEqual(sorted(r["name"] for r in leaderboard["rankings"]),
+                         ["alice@company.com", "bob@company.com"])
+
+
+if __name__ == "__main__":
+    unittest.main()
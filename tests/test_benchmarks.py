@@ -0,0 +1,55 @@
+"""
+Unit tests for the benchmark harness regression gate.
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.run import StageRunner, compare
+
+
+def _results(**stages):
+    return {"results": {"small": {"stages": {
+        name: {"wall_ms": ms, "wall_ms_min": ms, "alloc_peak_kb": kb} for name, (ms, kb) in stages.items()
+    }}}}
+
+
+class TestRegressionGate(unittest.TestCase):
+    """Test baseline comparison."""
+
+    def test_slowdown_beyond_tolerance_flagged(self):
+        """Test a 2x slower stage is reported and a 10% one is not."""
+        baseline = _results(load=(100.0, 100.0), score=(100.0, 100.0))
+        current = _results(load=(200.0, 100.0), score=(110.0, 100.0))
+        regressions = compare(current, baseline, tolerance=0.25)
+        self.assertEqual(len(regressions), 1)
+        self.assertIn("small/load", regressions[0])
+
+    def test_noise_floor_ignores_tiny_stages(self):
+        """Test sub-millisecond stages do not fail the gate on jitter."""
+        baseline = _results(tiny=(0.1, 1.0))
+        current = _results(tiny=(0.5, 5.0))
+        self.assertEqual(compare(current, baseline), [])
+
+    def test_allocation_growth_flagged(self):
+        """Test peak allocation growth is reported."""
+        baseline = _results(load=(10.0, 1000.0))
+        current = _results(load=(10.0, 5000.0))
+        self.assertEqual(len(compare(current, baseline)), 1)
+
+    def test_stage_runner_records_metrics(self):
+        """Test a measured stage has timing and allocation fields."""
+        runner = StageRunner(repeat=2)
+        value = runner.run("build", lambda: [0] * 10000)
+        self.assertEqual(len(value), 10000)
+        stage = runner.stages["build"]
+        self.assertEqual(stage["runs"], 2)
+        self.assertGreater(stage["alloc_peak_kb"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Unit tests for streaming change-point detection.
+"""
+
+import json
+import random
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.change_point import PageHinkley, scan, team_change_points
+from token_craft.regression_detector import RegressionDetector
+
+
+def noisy(level: float, count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    return [level * rng.lognormvariate(0, 0.3) for _ in range(count)]
+
+
+class TestPageHinkley(unittest.TestCase):
+    """Test detection, robustness and persistence."""
+
+    def test_detects_upward_shift(self):
+        """A doubling of tokens/session is flagged shortly after it starts."""
+        result = scan(noisy(40000, 60, 1) + noisy(80000, 20, 2))
+        self.assertEqual(len(result["change_points"]), 1)
+        self.assertTrue(60 <= result["change_points"][0] < 70)
+        self.assertTrue(result["active"])
+
+    def test_stable_series_and_outliers_do_not_alarm(self):
+        """Noise, a single huge session and improvements raise no alarm."""
+        values = noisy(40000, 100, 3)
+        values[50] = 4000000
+        values += noisy(20000, 30, 4)
+        result = scan(values)
+        self.assertEqual(result["change_points"], [])
+        self.assertFalse(result["active"])
+
+    def test_state_round_trip(self):
+        """A restored detector continues exactly where it left off."""
+        values = noisy(40000, 40, 5) + noisy(90000, 20, 6)
+        detector = PageHinkley()
+        for value in values[:45]:
+            detector.update(value)
+        restored = PageHinkley.from_state(json.loads(json.dumps(detector.state())))
+        for value in values[45:]:
+            self.assertEqual(restored.update(value), detector.update(value))
+        self.assertEqual(restored.summary(), detector.summary())
+
+    def test_regression_signal(self):
+        """An active change point adds a regression signal."""
+        change_point = RegressionDetector.detect_change_point(noisy(40000, 60, 7) + noisy(120000, 15, 8))
+        analysis = RegressionDetector.analyze_regression(500, 1.0, 1.0, [], change_point=change_point)
+        self.assertEqual(analysis["regression_signals"], 1)
+        self.assertTrue(analysis["change_point"]["has_change_point"])
+
+    def test_resumed_detector_reports_each_shift_once(self):
+        """Saved state feeds only new sessions; an old shift is not counted again."""
+        values = noisy(40000, 60, 7) + noisy(120000, 15, 8)
+        first = RegressionDetector.detect_change_point(values)
+        state = json.loads(json.dumps(first["state"]))
+
+        again = RegressionDetector.detect_change_point(values, state)
+        self.assertEqual(again["new_sessions"], 0)
+        self.assertEqual(again["change_points"], [])
+        self.assertTrue(again["active"])
+        self.assertFalse(again["has_change_point"])
+        analysis = RegressionDetector.analyze_regression(500, 1.0, 1.0, [], change_point=again)
+        self.assertEqual(analysis["regression_signals"], 0)
+
+        more = values + noisy(120000, 5, 9)
+        resumed = RegressionDetector.detect_change_point(more, state)
+        self.assertEqual(resumed["new_sessions"], 5)
+        self.assertEqual(resumed["state"], RegressionDetector.detect_change_point(more)["state"])
+
+        restarted = RegressionDetector.detect_change_point(values[:30], state)
+        self.assertEqual(restarted["state"]["sessions_seen"], 30)
+        self.assertEqual(restarted["observations"], 30)
+
+
+class TestTeamChangePoints(unittest.TestCase):
+    """Test the batched pass over team exports."""
+
+    def test_members_get_their_own_detectors(self):
+        """Only the member whose daily tokens/session rose is flagged."""
+        def export(email, values):
+            dates = [f"2026-{1 + i // 28:02d}-{1 + i % 28:02d}" for i in range(len(values))]
+            return {
+                "user": {"name": email.split("@")[0], "email": email},
+                "daily_activity": [{"date": d, "sessionCount": 2} for d in dates],
+                "daily_model_tokens": [{"date": d, "tokensByModel": {"sonnet": v * 2}}
+                                       for d, v in zip(dates, values)],
+            }
+
+        results = team_change_points([
+            export("ana@example.com", noisy(30000, 50, 9)),
+            export("bo@example.com", noisy(30000, 40, 10) + noisy(90000, 10, 11)),
+        ])
+        flagged = {r["user"]["name"]: r["change_dates"] for r in results}
+        self.assertEqual(flagged["ana"], [])
+        self.assertEqual(len(flagged["bo"]), 1)
+        self.assertEqual(results[1]["days"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+"""
+Unit tests for the compact storage codec.
+"""
+
+import gzip
+import json
+import shutil
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft import codec
+from token_craft.snapshot_manager import SnapshotManager
+
+
+class TestCodec(unittest.TestCase):
+    """Test encoding, format detection and snapshot storage."""
+
+    def setUp(self):
+        self.data = {
+            "user": {"name": "Alice", "email": "alice@company.com"},
+            "daily_model_tokens": [{"date": f"2026-01-{d:02d}", "tokensByModel": {"sonnet": d * 1000}}
+                                   for d in range(1, 29)],
+            "ratio": 0.25,
+            "flags": [True, None],
+        }
+
+    def test_round_trip_and_detection(self):
+        """Binary, gzipped JSON and plain JSON all decode to the same data."""
+        for compression in ("gzip", "none"):
+            blob = codec.encode(self.data, compression)
+            self.assertTrue(blob.startswith(codec.MAGIC))
+            self.assertEqual(codec.decode(blob), self.data)
+
+        self.assertEqual(codec.decode(codec.dumps(self.data)), self.data)
+        self.assertEqual(codec.decode(gzip.compress(json.dumps(self.data).encode())), self.data)
+        self.assertLess(len(codec.dumps(self.data, "binary")), len(codec.dumps(self.data)) / 4)
+
+    def test_rejects_unreadable_headers(self):
+        """Newer schema versions and unknown flags fail loudly."""
+        blob = codec.encode(self.data, "none")
+        newer = codec.MAGIC + bytes([codec.SCHEMA_VERSION + 1]) + blob[len(codec.MAGIC) + 1:]
+        with self.assertRaises(ValueError):
+            codec.decode(newer)
+        with self.assertRaises(ValueError):
+            codec.decode(codec.MAGIC + bytes([1]) + b"jx" + b"{}")
+        with self.assertRaises(ValueError):
+            codec.encode(self.data, "lz4")
+
+    def test_snapshots_mix_formats(self):
+        """Binary snapshots list and load next to JSON ones."""
+        temp_dir = Path(tempfile.mkdtemp())
+        try:
+            SnapshotManager(temp_dir, fmt="json").create_snapshot({"total_sessions": 1}, {}, {})
+            manager = SnapshotManager(temp_dir, fmt="binary")
+            filename = manager.create_snapshot({"total_sessions": 2}, {"total_score": 5.0}, {})
+
+            self.assertTrue(filename.endswith(codec.BINARY_SUFFIX))
+            self.assertEqual(manager.get_snapshot_count(), 2)
+            self.assertEqual(SnapshotManager(temp_dir).get_snapshot(filename)["profile"], {"total_sessions": 2})
+            self.assertEqual(manager.get_latest_snapshot(), SnapshotManager(temp_dir).get_snapshot(filename))
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,284 @@
+"""
+Unit tests for the hero API client bulk and asyncio badge sync paths,
+and the durable badge outbox.
+
+Tests run against the local stand-in server (no network access needed).
+"""
+
+import asyncio
+import tempfile
+import time
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.hero_api_client import HeroAPIClient, MockHeroClient
+from token_craft.hero_async_client import AsyncHeroAPIClient, TokenBucket, sync_many
+from token_craft.hero_stub_server import HeroStubServer
+from token_craft.badge_outbox import BackgroundFlusher, BadgeOutbox
+
+
+class TestHeroBulkSync(unittest.TestCase):
+    """Test batched, pooled and retrying badge sync."""
+
+    def setUp(self):
+        self.team = [
+            {"user_email": f"user{i}@example.com", "current_rank": "Captain", "previous_rank": "Pilot"}
+            for i in range(120)
+        ]
+
+    def test_plan_rank_sync_issue_and_revoke(self):
+        """Test rank change plans an issue and a revoke."""
+        ops = HeroAPIClient().plan_rank_sync("a@example.com", "Captain", "Pilot")
+        self.assertEqual([op["op"] for op in ops], ["issue", "revoke"])
+        self.assertEqual(ops[0]["badge_id"], "token_craft_captain")
+        self.assertEqual(ops[1]["badge_id"], "token_craft_pilot")
+
+    def test_team_sync_is_batched(self):
+        """Test 240 operations go out as 3 bulk requests of 100."""
+        with HeroStubServer() as server:
+            client = HeroAPIClient(api_url=server.url, batch_size=100)
+            summary = client.sync_team_badges(self.team)
+            client.close()
+
+            self.assertEqual(summary["submitted"], 240)
+            self.assertEqual(summary["succeeded"], 240)
+            self.assertEqual(summary["batches"], 3)
+            self.assertEqual(server.request_count, 3)
+            badges = server.get_badges("user0@example.com")
+            self.assertEqual([b["badge_id"] for b in badges], ["token_craft_captain"])
+
+    def test_transient_failures_are_retried(self):
+        """Test 503 responses are retried with backoff."""
+        with HeroStubServer(fail_first=2) as server:
+            client = HeroAPIClient(api_url=server.url, max_workers=1, backoff_base=0.01)
+            summary = client.sync_team_badges(self.team[:10])
+            client.close()
+
+            self.assertEqual(summary["failed"], 0)
+            self.assertEqual(server.failed_count, 2)
+
+    def test_retries_exhausted_reports_failure(self):
+        """Test a batch is reported failed once retries run out."""
+        with HeroStubServer(fail_first=10) as server:
+            client = HeroAPIClient(api_url=server.url, max_retries=1, backoff_base=0.01)
+            summary = client.sync_team_badges(self.team[:5])
+            client.close()
+
+            self.assertEqual(summary["succeeded"], 0)
+            self.assertEqual(summary["failed"], 10)
+            self.assertTrue(summary["errors"])
+
+    def test_idempotent_batch_replay(self):
+        """Test a retried request (same key) is applied once."""
+        ops = HeroAPIClient().plan_rank_sync("a@example.com", "Captain")
+        with HeroStubServer() as server:
+            client = HeroAPIClient(api_url=server.url)
+            key = client.new_idempotency_key()
+            client._request_with_retry("POST", "/badges/bulk", {"operations": ops}, idempotency_key=key)
+            client._request_with_retry("POST", "/badges/bulk", {"operations": ops}, idempotency_key=key)
+            client.close()
+
+            self.assertEqual(server.replayed_count, 1)
+
+    def test_identical_submission_after_revoke_is_applied(self):
+        """Test re-issuing a revoked badge with the same operations is not replayed."""
+        issue = HeroAPIClient().plan_rank_sync("a@example.com", "Captain")
+        revoke = [dict(issue[0], op="revoke")]
+        with HeroStubServer() as server:
+            client = HeroAPIClient(api_url=server.url)
+            client.submit_badge_operations(issue)
+            client.submit_badge_operations(revoke)
+            summary = client.submit_badge_operations(issue)
+            client.close()
+
+            self.assertEqual(summary["succeeded"], 1)
+            self.assertEqual(server.replayed_count, 0)
+            self.assertEqual([b["badge_id"] for b in server.get_badges("a@example.com")], ["token_craft_captain"])
+
+    def test_replay_cache_expires(self):
+        """Test a stored response is not replayed after the TTL."""
+        with HeroStubServer(idempotency_ttl=0) as server:
+            op = {"op": "issue", "user_email": "a@example.com", "badge_id": "token_craft_pilot"}
+            server.apply_bulk([op], "key")
+            server.apply_bulk([op], "key")
+            self.assertEqual(server.replayed_count, 0)
+
+    def test_mock_client_bulk_in_memory(self):
+        """Test MockHeroClient applies bulk operations without HTTP."""
+        client = MockHeroClient()
+        summary = client.sync_team_badges(self.team[:3])
+        self.assertEqual(summary["succeeded"], 6)
+        self.assertEqual(len(client.get_user_badges("user1@example.com")), 1)
+
+
+class TestAsyncHeroSync(unittest.TestCase):
+    """Test asyncio badge sync pipeline."""
+
+    def test_sync_many_overlaps_latency(self):
+        """Test 30 users x 3 requests at 50ms each finish well under the serial sum."""
+        team = [
+            {"user_email": f"user{i}@example.com", "current_rank": "Captain", "previous_rank": "Pilot"}
+            for i in range(30)
+        ]
+        with HeroStubServer(latency=0.05) as server:
+            for user in team:
+                server.apply_operation({"op": "issue", "user_email": user["user_email"], "badge_id": "token_craft_pilot"})
+
+            summary = sync_many(team, api_url=server.url, concurrency=30, rate_limit=1000)
+
+            self.assertEqual(summary["badges_issued"], 30)
+            self.assertEqual(summary["badges_revoked"], 30)
+            self.assertLess(summary["elapsed_sec"], 90 * 0.05 / 3)
+            badges = server.get_badges("user7@example.com")
+            self.assertEqual([b["badge_id"] for b in badges], ["token_craft_captain"])
+
+    def test_existing_badge_not_reissued(self):
+        """Test a badge the user already holds is not issued again."""
+        with HeroStubServer() as server:
+            server.apply_operation({"op": "issue", "user_email": "a@example.com", "badge_id": "token_craft_captain"})
+            summary = sync_many(
+                [{"user_email": "a@example.com", "current_rank": "Captain"}],
+                api_url=server.url
+            )
+            self.assertEqual(summary["badges_issued"], 0)
+            self.assertEqual(server.request_count, 1)
+
+    def test_failed_badge_read_is_reported(self):
+        """Test a user whose badges cannot be read is an error, not an empty sync."""
+        summary = sync_many(
+            [{"user_email": "a@example.com", "current_rank": "Captain", "previous_rank": "Pilot"}],
+            api_url="http://127.0.0.1:1/api", max_retries=0
+        )
+        self.assertEqual(summary["results"], [])
+        self.assertEqual([e["user_email"] for e in summary["errors"]], ["a@example.com"])
+
+    def test_previous_rank_revoked_when_not_listed(self):
+        """Test the previous rank badge is revoked even if the read omits it."""
+        with HeroStubServer() as server:
+            summary = sync_many(
+                [{"user_email": "a@example.com", "current_rank": "Captain", "previous_rank": "Pilot"}],
+                api_url=server.url
+            )
+            self.assertEqual(summary["results"][0]["badges_revoked"], ["token_craft_pilot"])
+
+    def test_retries_take_rate_limit_permits(self):
+        """Test every retry attempt acquires its own token-bucket permit."""
+        permits = []
+
+        async def run(client):
+            acquire = client.rate_limiter.acquire
+
+            async def counted():
+                permits.append(1)
+                await acquire()
+
+            client.rate_limiter.acquire = counted
+            return await client.issue_badge("a@example.com", "token_craft_captain", {})
+
+        with HeroStubServer(fail_first=2) as server:
+            client = AsyncHeroAPIClient(api_url=server.url, backoff_base=0.01)
+            try:
+                response = asyncio.run(run(client))
+            finally:
+                client.close()
+
+            self.assertTrue(response["success"])
+            self.assertEqual(server.failed_count, 2)
+            self.assertEqual(len(permits), 3)
+
+    def test_client_reused_across_event_loops(self):
+        """Test one client syncs in two asyncio.run() calls (the limiter and slots contended in both)."""
+        team = [{"user_email": f"user{i}@example.com", "current_rank": "Captain"} for i in range(4)]
+        with HeroStubServer(latency=0.01) as server:
+            client = AsyncHeroAPIClient(api_url=server.url, concurrency=1, rate_limit=200, burst=1)
+            try:
+                first = asyncio.run(client.sync_many(team[:2]))
+                second = asyncio.run(client.sync_many(team[2:]))
+            finally:
+                client.close()
+
+            self.assertEqual((first["errors"], second["errors"]), ([], []))
+            self.assertEqual(first["badges_issued"] + second["badges_issued"], 4)
+
+    def test_token_bucket_limits_rate(self):
+        """Test token bucket spaces requests beyond the burst."""
+        async def take(bucket, n):
+            for _ in range(n):
+                await bucket.acquire()
+
+        bucket = TokenBucket(rate=100, capacity=1)
+        started = time.perf_counter()
+        asyncio.run(take(bucket, 11))
+        self.assertGreaterEqual(time.perf_counter() - started, 0.09)
+
+
+class TestBadgeOutbox(unittest.TestCase):
+    """Test durable badge operation queue."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.outbox = BadgeOutbox(Path(self.tmp.name) / "outbox.db")
+        self.client = HeroAPIClient()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_issue_then_revoke_cancels(self):
+        """Test an issue/revoke pair for the same badge collapses to nothing."""
+        issue = self.client.plan_rank_sync("a@example.com", "Captain")[0]
+        revoke = dict(issue, op="revoke")
+        self.assertEqual(self.outbox.enqueue(issue), "queued")
+        self.assertEqual(self.outbox.enqueue(revoke), "cancelled")
+        self.assertEqual(self.outbox.pending_count(), 0)
+
+    def test_duplicate_operations_deduplicated(self):
+        """Test repeated runs queue the same badge once."""
+        for _ in range(3):
+            self.outbox.enqueue_many(self.client.plan_rank_sync("a@example.com", "Captain", "Pilot"))
+        self.assertEqual(self.outbox.pending_count(), 2)
+
+    def test_flush_drains_in_batches(self):
+        """Test flushing sends the backlog through the bulk endpoint."""
+        for i in range(50):
+            self.outbox.enqueue_many(self.client.plan_rank_sync(f"u{i}@example.com", "Captain", "Pilot"))
+
+        with HeroStubServer() as server:
+            client = HeroAPIClient(api_url=server.url, max_workers=2)
+            result = self.outbox.flush(client, batch_size=25)
+            client.close()
+
+            self.assertEqual(result["succeeded"], 100)
+            self.assertEqual(result["remaining"], 0)
+            self.assertEqual(server.request_count, 4)
+
+    def test_failed_flush_keeps_operations(self):
+        """Test operations survive an unavailable endpoint."""
+        self.outbox.enqueue_many(self.client.plan_rank_sync("a@example.com", "Captain"))
+
+        with HeroStubServer(fail_first=100) as server:
+            client = HeroAPIClient(api_url=server.url, max_retries=0)
+            result = self.outbox.flush(client)
+            client.close()
+
+        self.assertEqual(result["failed"], 1)
+        self.assertEqual(result["remaining"], 1)
+        # Failed op is unclaimed again, so it can still be cancelled
+        revoke = dict(self.outbox.peek()[0], op="revoke")
+        self.assertEqual(self.outbox.enqueue(revoke), "cancelled")
+
+    def test_flusher_stop_drains_before_exit(self):
+        """Test stop(flush=True) sends what is queued even if stopped at once."""
+        self.outbox.enqueue_many(self.client.plan_rank_sync("a@example.com", "Captain", "Pilot"))
+        client = MockHeroClient()
+        flusher = BackgroundFlusher(self.outbox, client, interval=3600).start()
+        self.assertTrue(flusher.stop(timeout=5, flush=True))
+        self.assertEqual(self.outbox.pending_count(), 0)
+        self.assertEqual(len(client.get_user_badges("a@example.com")), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
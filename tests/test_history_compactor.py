@@ -0,0 +1,95 @@
+"""
+Unit tests for the compacted history and its incremental sync.
+"""
+
+import json
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.categories import PRACTICE_KEYWORDS, category_mask, work_type_mask
+from token_craft.history_compactor import HistoryCompactor, compact_entry, expand_entry, history_reader
+from token_craft.history_segments import SegmentedHistory
+from token_craft.records import Message, TextDigest
+
+LONG_PROMPT = ("First, let's think step by step: FIX the failing pytest in the parser module "
+               "because the JSON endpoint returns <task>errors</task> after the refactor.")
+
+
+def _entry(i: int, text: str = LONG_PROMPT) -> str:
+    return json.dumps({
+        "display": text,
+        "message": text,
+        "timestamp": 1760000000000 + i * 60000,
+        "project": "/work/parser",
+        "sessionId": f"session{i // 4}",
+        "pastedContents": {"1": {"content": "x" * 2000}},
+    }) + "\n"
+
+
+class TestHistoryCompactor(unittest.TestCase):
+    """Test digest answers, compact round trips and offset tracking."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "history.jsonl"
+        self.path.write_text("".join(_entry(i) for i in range(8)), encoding="utf-8")
+        self.compactor = HistoryCompactor(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_digest_answers_like_text(self):
+        """Lengths, category masks and practice keywords match the original text."""
+        digest = TextDigest.from_text(LONG_PROMPT)
+        self.assertEqual(len(digest), len(LONG_PROMPT))
+        self.assertEqual(category_mask(digest), category_mask(LONG_PROMPT))
+        self.assertEqual(work_type_mask(digest), work_type_mask(LONG_PROMPT))
+        for keywords in PRACTICE_KEYWORDS.values():
+            for keyword in keywords:
+                self.assertEqual(keyword in digest, keyword in LONG_PROMPT, keyword)
+                self.assertEqual(keyword in digest.lower(), keyword in LONG_PROMPT.lower(), keyword)
+        with self.assertRaises(KeyError):
+            "not a keyword" in digest
+
+    def test_round_trip_keeps_tool_summaries(self):
+        """Tool uses keep name, path and command; short text stays text."""
+        message = Message.from_entry({
+            "sessionId": "s1", "role": "assistant", "tokens": 120, "display": "ok",
+            "content": [{"type": "tool_use", "name": "Edit", "input": {"file_path": "a.py", "old_string": "x" * 500}},
+                        {"type": "text", "text": "done"}],
+        })
+        restored = expand_entry(json.loads(json.dumps(compact_entry(message))))
+        self.assertEqual((restored.session_id, restored.tokens, restored.display), ("s1", 120, "ok"))
+        self.assertEqual([(t.name, t.get("input")) for t in restored.content], [("Edit", {"file_path": "a.py"})])
+
+    def test_sync_tracks_source_offset(self):
+        """Only appended complete lines are compacted; rotation rebuilds."""
+        self.assertEqual(self.compactor.sync(), 8)
+        self.assertIs(type(history_reader(self.path)), HistoryCompactor)
+        self.assertLess(self.compactor.compact_path.stat().st_size, self.path.stat().st_size / 4)
+
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(_entry(8) + _entry(9)[:-20])
+        self.assertEqual(self.compactor.sync(), 1)
+        self.assertEqual(self.compactor.sync(), 0)
+
+        # Lines left behind by an interrupted sync are dropped
+        with open(self.compactor.compact_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"s": "stray"}) + "\n")
+        sessions = [m.session_id for m in self.compactor.messages()]
+        self.assertEqual(sessions, [m.session_id for m in SegmentedHistory(self.path).messages()])
+        self.assertNotIn("stray", sessions)
+
+        # Rotation: history.jsonl moved aside, new live file
+        self.path.rename(self.path.with_name("history.jsonl.1"))
+        self.path.write_text(_entry(20), encoding="utf-8")
+        self.assertEqual(self.compactor.sync(), 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Unit tests for reading rotated and compressed history segments.
+"""
+
+import gzip
+import json
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.history_segments import SegmentedHistory, find_segments
+from token_craft.rollup_cube import RollupCube
+
+DAY_MS = 86400000
+START_MS = 1760000000000
+
+
+def _lines(day: int, count: int = 3) -> str:
+    return "".join(json.dumps({
+        "display": f"refactor the parser step {i}",
+        "timestamp": START_MS + day * DAY_MS + i * 60000,
+        "project": "/work/parser",
+        "sessionId": f"day{day}",
+    }) + "\n" for i in range(count))
+
+
+class TestSegmentedHistory(unittest.TestCase):
+    """Test segment order, streaming decompression and range skipping."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        self.path = self.dir / "history.jsonl"
+        # Oldest rotation has the highest number
+        with gzip.open(self.dir / "history.jsonl.2.gz", "wt", encoding="utf-8") as f:
+            f.write(_lines(0))
+        (self.dir / "history.jsonl.1").write_text(_lines(10), encoding="utf-8")
+        self.path.write_text(_lines(20), encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_one_stream_oldest_first(self):
+        """Segments read in rotation order, live file last."""
+        names = [segment.path.name for segment in find_segments(self.path)]
+        self.assertEqual(names, ["history.jsonl.2.gz", "history.jsonl.1", "history.jsonl"])
+
+        sessions = [message.session_id for message in SegmentedHistory(self.path).messages()]
+        self.assertEqual(sessions, ["day0"] * 3 + ["day10"] * 3 + ["day20"] * 3)
+
+    def test_date_filter_skips_cached_segments(self):
+        """Segments outside the range are not opened once their metadata is cached."""
+        list(SegmentedHistory(self.path).messages())  # First read records metadata
+
+        history = SegmentedHistory(self.path)
+        self.assertEqual(history.segments[0].meta["lines"], 3)
+        with mock.patch("gzip.open", side_effect=AssertionError("decompressed")):
+            sessions = {m.session_id for m in history.messages(ts_from=START_MS + 15 * DAY_MS)}
+        self.assertEqual(sessions, {"day20"})
+        self.assertEqual(history.segments_skipped, 2)
+
+    def test_rollup_rebuild_counts_archives(self):
+        """A rebuilt cube includes rotated segments."""
+        cube = RollupCube(self.dir / "token-craft" / "rollup.json")
+        self.assertEqual(cube.update(self.path), 9)
+        self.assertEqual(cube.update(self.path), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
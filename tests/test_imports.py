@@ -0,0 +1,49 @@
+"""
+Unit tests for lazy package imports.
+"""
+
+import subprocess
+import unittest
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+
+# Add parent directory to path
+sys.path.insert(0, str(REPO_ROOT))
+
+import token_craft
+
+
+def _loaded_modules(code: str) -> set:
+    """Run code in a fresh interpreter and return the token_craft modules it loaded."""
+    probe = code + "\nimport sys; print('\\n'.join(m for m in sys.modules if m.startswith('token_craft')))"
+    out = subprocess.run([sys.executable, "-c", probe], cwd=str(REPO_ROOT),
+                         capture_output=True, text=True, check=True).stdout
+    return set(out.split())
+
+
+class TestLazyImports(unittest.TestCase):
+    """Test package attributes are resolved on first use."""
+
+    def test_package_import_loads_no_submodules(self):
+        """Test importing the package alone loads nothing else."""
+        self.assertEqual(_loaded_modules("import token_craft"), {"token_craft"})
+
+    def test_scoring_does_not_load_hero_client(self):
+        """Test the quick-analysis path skips the hero client and menu."""
+        loaded = _loaded_modules("import skill_handler")
+        self.assertIn("token_craft.scoring_engine", loaded)
+        self.assertNotIn("token_craft.hero_api_client", loaded)
+        self.assertNotIn("token_craft.interactive_menu", loaded)
+
+    def test_public_names_resolve(self):
+        """Test every name in __all__ is importable from the package."""
+        for name in token_craft.__all__:
+            self.assertTrue(callable(getattr(token_craft, name)), name)
+        with self.assertRaises(AttributeError):
+            token_craft.NoSuchThing
+
+
+if __name__ == "__main__":
+    unittest.main()
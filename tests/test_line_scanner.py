@@ -0,0 +1,68 @@
+"""
+Unit tests for the memory-mapped history line scanner.
+"""
+
+import json
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.line_scanner import PROMPT_KEYS, line_timestamp, scan_buffer, scan_lines
+from token_craft.history_segments import SegmentedHistory
+
+START_MS = 1760000000000
+
+
+class TestLineScanner(unittest.TestCase):
+    """Test line splitting and byte-level prefilters."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "history.jsonl"
+        lines = []
+        for i in range(20):
+            lines.append(json.dumps({"display": f"prompt {i}", "timestamp": START_MS + i * 1000,
+                                     "project": "/work/app", "sessionId": f"s{i // 5}"}))
+            lines.append(json.dumps({"role": "assistant", "timestamp": START_MS + i * 1000 + 500,
+                                     "sessionId": f"s{i // 5}", "tokens": 100}))
+        lines.append("")
+        lines.append(json.dumps({"display": "string time", "timestamp": "2025-10-09T08:53:20Z", "sessionId": "s9"}))
+        self.path.write_text("\n".join(lines), encoding="utf-8")  # No trailing newline
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_lines_match_text_iteration(self):
+        """Unfiltered scan yields every non-blank line, the last one included."""
+        expected = [line.encode() for line in self.path.read_text(encoding="utf-8").splitlines() if line]
+        self.assertEqual(list(scan_lines(self.path)), expected)
+
+        empty = Path(self.tmp.name) / "empty.jsonl"
+        empty.write_bytes(b"")
+        self.assertEqual(list(scan_lines(empty)), [])
+
+    def test_prefilter_keeps_what_callers_keep(self):
+        """Range and key checks drop exactly the out-of-range and non-prompt lines."""
+        ts_from, ts_to = START_MS + 5000, START_MS + 9000
+        kept = [json.loads(line) for line in scan_lines(self.path, ts_from, ts_to, PROMPT_KEYS)]
+        self.assertEqual([entry["display"] for entry in kept],
+                         [f"prompt {i}" for i in range(5, 10)] + ["string time"])
+
+        history = SegmentedHistory(self.path, cache=False)
+        filtered = [m.display for m in history.messages(ts_from, ts_to, require=PROMPT_KEYS)]
+        self.assertEqual(filtered, [entry["display"] for entry in kept])
+
+    def test_ambiguous_timestamps_are_kept(self):
+        """Nested or non-numeric timestamps never cause a drop."""
+        nested = b'{"timestamp": 1, "sessionId": "a", "display": "x", "meta": {"timestamp": 2}}'
+        self.assertIsNone(line_timestamp(nested, 0, len(nested)))
+        self.assertEqual(line_timestamp(b'{"timestamp":12.5}', 0, 18), 12.5)
+        self.assertEqual(list(scan_buffer(nested, ts_from=10)), [nested])
+
+
+if __name__ == "__main__":
+    unittest.main()
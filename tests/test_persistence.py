@@ -0,0 +1,111 @@
+"""
+Unit tests for atomic, lock-protected persistence.
+"""
+
+import json
+import multiprocessing
+import shutil
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.persistence import (
+    FileLock, LockTimeout, atomic_write_json, create_unique, update_json
+)
+from token_craft.user_profile import UserProfile
+
+
+def _increment(path: str, times: int):
+    def bump(data):
+        data["count"] = data.get("count", 0) + 1
+    for _ in range(times):
+        update_json(Path(path), bump)
+
+
+class TestPersistence(unittest.TestCase):
+    """Test atomic replacement, locking and unique creation."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.path = self.temp_dir / "state" / "profile.json"
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_atomic_write_keeps_old_file_on_failure(self):
+        """Unserializable data leaves the previous contents and no temp files."""
+        atomic_write_json(self.path, {"score": 1}, fsync=True)
+        with self.assertRaises(TypeError):
+            atomic_write_json(self.path, {"score": object()})
+
+        self.assertEqual(json.loads(self.path.read_text()), {"score": 1})
+        self.assertEqual(sorted(p.name for p in self.path.parent.iterdir()), ["profile.json", "profile.json.lock"])
+
+    def test_concurrent_updates_are_not_lost(self):
+        """Read-modify-write from several processes keeps every update."""
+        workers = [multiprocessing.Process(target=_increment, args=(str(self.path), 25)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        self.assertEqual(json.loads(self.path.read_text()), {"count": 100})
+
+    def test_lock_timeout(self):
+        """A held lock makes other writers time out instead of interleaving."""
+        with FileLock(self.path):
+            with self.assertRaises(LockTimeout):
+                FileLock(self.path, timeout=0.1).acquire()
+
+    def test_profile_save_keeps_concurrent_changes(self):
+        """A profile save merges over changes written since it was loaded."""
+        profile_dir = self.temp_dir / "token-craft"
+        first = UserProfile("a@example.com", profile_dir)
+        first.save()
+        second = UserProfile("a@example.com", profile_dir)
+
+        update_json(first.profile_path, lambda data: data.update(deployment_method="bedrock"))
+        second.add_achievement("first_flight", "First Flight", "Ran an analysis")
+        first.add_achievement("streak_3", "On a Roll", "Three days in a row")
+        first.save()
+        second.data["current_score"] = 420
+        self.assertTrue(second.save())
+
+        saved = json.loads(first.profile_path.read_text())
+        self.assertEqual(saved["deployment_method"], "bedrock")
+        self.assertEqual(saved["current_score"], 420)
+        self.assertEqual([a["id"] for a in saved["achievements"]], ["streak_3", "first_flight"])
+        self.assertEqual(second.data, saved)
+
+    def test_profile_save_keeps_repeated_history_entries(self):
+        """Equal-looking history events (e.g. the same promotion twice) are all kept."""
+        profile_dir = self.temp_dir / "token-craft"
+        profile = UserProfile("a@example.com", profile_dir)
+        event = {"event": "rank_change", "old_rank": "Cadet", "new_rank": "Pilot", "score": 300}
+        profile.data["history"].append(dict(event, timestamp="2026-01-01T10:00:00"))
+        profile.save()
+        other = UserProfile("a@example.com", profile_dir)
+
+        profile.data["history"].append(dict(event, timestamp="2026-01-02T10:00:00"))
+        profile.save()
+        other.data["history"].append(dict(event, timestamp="2026-01-03T10:00:00"))
+        other.save()
+
+        saved = json.loads(profile.profile_path.read_text())
+        self.assertEqual([h["timestamp"][:10] for h in saved["history"]],
+                         ["2026-01-01", "2026-01-02", "2026-01-03"])
+
+    def test_create_unique(self):
+        """Same-name files get numbered instead of overwritten."""
+        first = create_unique(self.temp_dir / "snapshot_20260101_120000.json", "a")
+        second = create_unique(self.temp_dir / "snapshot_20260101_120000.json", "b")
+        self.assertEqual(second.name, "snapshot_20260101_120000_1.json")
+        self.assertEqual((first.read_text(), second.read_text()), ("a", "b"))
+        self.assertLess(first.name, second.name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the stage profiler.
+"""
+
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft import profiler
+
+
+class TestProfiler(unittest.TestCase):
+    """Test stage recording and --profile flag handling."""
+
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+
+    def test_disabled_records_nothing(self):
+        """Stages are no-ops while profiling is off."""
+        with profiler.stage("load.history") as s:
+            s.count("lines_parsed", 10)
+            profiler.count("sessions_built")
+
+        self.assertEqual(profiler.get_stats(), {})
+
+    def test_nested_stages_and_counters(self):
+        """Nested stages record depth, calls and counters."""
+        profiler.enable()
+        for _ in range(2):
+            with profiler.stage("score"):
+                with profiler.stage("score.token_efficiency") as s:
+                    s.count("sessions", 3)
+                    profiler.count("sessions")
+
+        stats = profiler.get_stats()
+        self.assertEqual(list(stats), ["score", "score.token_efficiency"])
+        self.assertEqual(stats["score"]["calls"], 2)
+        self.assertEqual(stats["score"]["depth"], 0)
+        self.assertEqual(stats["score.token_efficiency"]["depth"], 1)
+        self.assertEqual(stats["score.token_efficiency"]["counters"], {"sessions": 8})
+        self.assertIn("score.token_efficiency", profiler.format_report())
+
+    def test_memory_mode_records_peak_and_sites(self):
+        """Memory mode records per-stage peaks and the allocating line."""
+        profiler.enable_memory()
+        with profiler.stage("load.history"):
+            data = [bytearray(1024) for _ in range(200)]
+            with profiler.stage("parse.sessions"):
+                pass
+
+        stats = profiler.get_stats()
+        history = stats["load.history"]
+        self.assertGreaterEqual(history["mem_net_kb"], 200)
+        self.assertGreaterEqual(history["mem_peak_kb"], history["mem_rise_kb"])
+        self.assertTrue(any(site.endswith("test_profiler.py:" + str(self._data_line()))
+                            for site, _ in history["sites"]))
+        self.assertEqual(stats["parse.sessions"]["sites"], [])
+        self.assertIn("RISE KB", profiler.format_memory_report())
+        del data
+
+    @staticmethod
+    def _data_line() -> int:
+        source = Path(__file__).read_text(encoding="utf-8").splitlines()
+        return next(i for i, line in enumerate(source, 1) if "bytearray(1024)" in line)
+
+    def test_configure_strips_flags(self):
+        """Profiling flags are removed from argv; others are kept."""
+        argv = ["skill_handler.py", "quick"]
+        profiler.configure_from_argv(argv)
+
+        self.assertEqual(argv, ["skill_handler.py", "quick"])
+        self.assertFalse(profiler.is_enabled())
+
+    def test_unknown_memprofile_value_rejected(self):
+        """A misspelled --memprofile value is an error, not a positional argument."""
+        argv = ["skill_handler.py", "--memprofile=al", "quick"]
+        with self.assertRaises(SystemExit) as raised:
+            profiler.configure_from_argv(argv)
+
+        self.assertIn("--memprofile=all", str(raised.exception))
+        self.assertFalse(profiler.is_enabled())
+
+
+if __name__ == "__main__":
+    unittest.main()
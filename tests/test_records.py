@@ -0,0 +1,123 @@
+"""
+Unit tests for compact history records.
+"""
+
+import json
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.records import (
+    Codebook, Message, ProjectCodebook, Session, group_sessions, parse_history_lines
+)
+
+
+class TestRecords(unittest.TestCase):
+    """Test record conversion, dict compatibility and grouping."""
+
+    def setUp(self):
+        self.user_entry = {
+            "display": "fix the login bug",
+            "pastedContents": {"1": {"content": "x" * 500}},
+            "timestamp": 1736152906000,
+            "project": "/home/dev/app",
+            "sessionId": "s1",
+        }
+        self.assistant_entry = {
+            "type": "assistant",
+            "role": "assistant",
+            "timestamp": 1736152907000,
+            "project": "/home/dev/app",
+            "sessionId": "s1",
+            "model": "claude-sonnet-4-5",
+            "content": [
+                {"type": "text", "text": "Done."},
+                {"type": "tool_use", "id": "toolu_1", "name": "Read", "input": {"file_path": "app.py"}},
+            ],
+            "tokens": 3886,
+        }
+
+    def test_from_entry_keeps_used_fields(self):
+        """Unused keys are dropped; used ones read back by JSON key."""
+        message = Message.from_entry(self.user_entry)
+
+        self.assertEqual(message.display, "fix the login bug")
+        self.assertEqual(message.get("sessionId"), "s1")
+        self.assertEqual(message["project"], "/home/dev/app")
+        self.assertIsNone(message.get("pastedContents"))
+        self.assertEqual(message.get("tokens", 0), 0)
+        self.assertEqual(message.get("messages", []), [])
+        with self.assertRaises(KeyError):
+            message["role"]
+
+    def test_assistant_content_keeps_tool_uses(self):
+        """Only tool_use blocks survive, with the inputs scoring reads."""
+        message = Message.from_entry(self.assistant_entry)
+
+        self.assertEqual(len(message.content), 1)
+        tool_use = message.content[0]
+        self.assertEqual(tool_use.get("type"), "tool_use")
+        self.assertEqual(tool_use.get("name"), "Read")
+        self.assertEqual(tool_use.get("input", {}).get("file_path", ""), "app.py")
+        self.assertEqual(message.tokens, 3886)
+
+    def test_ids_are_interned(self):
+        """Repeated session IDs and projects share one string object."""
+        lines = [json.dumps(self.user_entry), json.dumps(self.assistant_entry)]
+        first, second = parse_history_lines(lines)
+
+        self.assertIs(first.session_id, second.session_id)
+        self.assertIs(first.project, second.project)
+
+    def test_parse_skips_bad_lines(self):
+        """Blank, malformed and non-object lines are skipped."""
+        lines = ["", "not json", "[1, 2]", json.dumps(self.user_entry) + "\n"]
+        self.assertEqual(len(list(parse_history_lines(lines))), 1)
+
+    def test_group_sessions_accepts_dicts_and_records(self):
+        """Sessions keep first-seen order and the first message's project."""
+        entries = [
+            self.user_entry,
+            {"sessionId": "s2", "project": "/home/dev/api", "display": "hi"},
+            Message.from_entry(self.assistant_entry),
+            {"display": "no session"},
+        ]
+        sessions = group_sessions(entries)
+
+        self.assertEqual([s.session_id for s in sessions], ["s1", "s2", "unknown"])
+        self.assertIsInstance(sessions[0], Session)
+        self.assertEqual(len(sessions[0]["messages"]), 2)
+        self.assertEqual(sessions[1].get("project"), "/home/dev/api")
+        self.assertEqual(sessions[2].project, "unknown")
+
+
+class TestCodebooks(unittest.TestCase):
+    """Test dictionary encoding of session IDs and project paths."""
+
+    def test_codebook_assigns_dense_codes(self):
+        """Codes are 0..n-1 in first-seen order and round-trip."""
+        codes = Codebook()
+        self.assertEqual([codes.encode(v) for v in ["b", "a", "b", "c"]], [0, 1, 0, 2])
+        self.assertEqual(codes.decode(1), "a")
+        self.assertIsNone(codes.code_of("missing"))
+        self.assertEqual(len(codes), 3)
+
+    def test_project_names_shared_across_paths(self):
+        """Paths with the same last component share one display-name code."""
+        projects = ProjectCodebook()
+        first = projects.encode("/home/dev/api")
+        second = projects.encode("/tmp/checkout/api")
+        unknown = projects.encode("Unknown")
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(projects.name_codes[first], projects.name_codes[second])
+        self.assertEqual(projects.name(second), "api")
+        self.assertEqual(projects.name(unknown), "Unknown")
+        self.assertEqual(projects.names.values, ["api", "Unknown"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Unit tests for the daily rollup cube.
+"""
+
+import json
+import shutil
+import tempfile
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.rollup_cube import RollupCube
+
+
+def entry(session_id: str, day: str, hour: int, display: str, project: str = "/work/api") -> dict:
+    timestamp = int(datetime.strptime(f"{day} {hour:02d}", "%Y-%m-%d %H").timestamp() * 1000)
+    return {"display": display, "timestamp": timestamp, "project": project, "sessionId": session_id}
+
+
+class TestRollupCube(unittest.TestCase):
+    """Test window queries, incremental updates and persistence."""
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.history_path = self.temp_dir / "history.jsonl"
+        self.entries = [
+            entry("a", "2026-01-05", 9, "fix the failing test"),
+            entry("a", "2026-01-05", 10, "now commit it"),
+            entry("b", "2026-01-06", 9, "hello", project="/work/web"),
+            entry("a", "2026-01-12", 9, "explain the parser"),
+            {"type": "assistant", "sessionId": "a", "timestamp": 0},  # not a prompt
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, entries, mode="w"):
+        with open(self.history_path, mode, encoding="utf-8") as f:
+            for e in entries:
+                f.write(json.dumps(e) + "\n")
+
+    def test_window_groupings(self):
+        """Windows sum buckets; multi-category session-days count once per category."""
+        cube = RollupCube(self.temp_dir / "cube.json")
+        cube.add_messages(self.entries)
+
+        self.assertEqual(cube.totals(), {"session_days": 3, "messages": 4, "chars": 56})
+        self.assertEqual(cube.totals("2026-01-05", "2026-01-06")["messages"], 3)
+        self.assertEqual(list(cube.rollup(by="week")), ["2026-W02", "2026-W03"])
+        self.assertEqual(cube.rollup(projects=["web"], by="project"),
+                         {"web": {"session_days": 1, "messages": 1, "chars": 5}})
+
+        categories = cube.rollup(date_to="2026-01-05", by="category")
+        self.assertEqual(categories["Git Operations"]["session_days"], 1)
+        self.assertEqual(categories["Testing"]["messages"], 2)
+        self.assertNotIn("Other", categories)
+
+        with self.assertRaises(ValueError):
+            cube.rollup(by="month")
+
+    def test_incremental_update_matches_rebuild(self):
+        """Appending to history and updating equals a full rebuild."""
+        cube_path = self.temp_dir / "cube.json"
+        self.write(self.entries[:1])
+        cube = RollupCube(cube_path)
+        self.assertEqual(cube.update(self.history_path), 1)
+        cube.save()
+
+        # A running session widens its categories after the first update
+        self.write(self.entries[1:], mode="a")
+        resumed = RollupCube.load(cube_path)
+        self.assertEqual(resumed.update(self.history_path), 3)
+        self.assertEqual(resumed.update(self.history_path), 0)
+
+        rebuilt = RollupCube()
+        rebuilt.update(self.history_path)
+        self.assertEqual(resumed.cells, rebuilt.cells)
+
+    def test_changed_keyword_tables_discard_saved_cube(self):
+        """A cube saved with other keyword tables (same names) is not reused."""
+        cube = RollupCube()
+        cube.add_messages(self.entries)
+        saved = json.loads(json.dumps(cube.to_dict()))
+        self.assertEqual(RollupCube.from_dict(saved).cells, cube.cells)
+
+        saved["tables"] = "0" * 16
+        self.assertEqual(saved["categories"], cube.to_dict()["categories"])
+        self.assertEqual(RollupCube.from_dict(saved).cells, {})
+
+    def test_truncated_history_rebuilds(self):
+        """A replaced (shorter) history resets the cube."""
+        self.write(self.entries)
+        cube = RollupCube()
+        cube.update(self.history_path)
+
+        self.write(self.entries[2:3])
+        cube.update(self.history_path)
+        self.assertEqual(cube.totals()["session_days"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+"""
+Unit tests for streaming mean/variance.
+"""
+
+import json
+import random
+import statistics
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.running_stats import RunningStats
+
+
+class TestRunningStats(unittest.TestCase):
+    """Test Welford accumulation and persistence."""
+
+    def setUp(self):
+        rng = random.Random(11)
+        self.values = [rng.randint(0, 4000) for _ in range(1500)]
+
+    def test_matches_statistics_module(self):
+        """Streaming mean/stdev agree with statistics.mean/stdev."""
+        stats = RunningStats(self.values)
+
+        self.assertEqual(stats.count, len(self.values))
+        self.assertAlmostEqual(stats.mean, statistics.mean(self.values), places=9)
+        self.assertAlmostEqual(stats.stdev(), statistics.stdev(self.values), places=9)
+        self.assertEqual((stats.minimum, stats.maximum), (min(self.values), max(self.values)))
+
+    def test_state_round_trip(self):
+        """State survives JSON and keeps accumulating."""
+        stats = RunningStats(self.values[:700])
+        restored = RunningStats.from_state(json.loads(json.dumps(stats.state())))
+        restored.extend(self.values[700:])
+
+        self.assertAlmostEqual(restored.stdev(), statistics.stdev(self.values), places=9)
+
+    def test_degenerate(self):
+        """Empty and single-value streams reduce to zero."""
+        self.assertEqual(RunningStats().stdev(), 0.0)
+        self.assertEqual(RunningStats([5]).variance(), 0.0)
+        self.assertEqual(RunningStats([0, 0]).cv(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
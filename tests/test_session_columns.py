@@ -0,0 +1,60 @@
+"""
+Unit tests for session columns (NumPy and pure-Python backends).
+"""
+
+import random
+import statistics
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.session_columns import HAS_NUMPY, NUMPY_MIN_ROWS, Column, preload_numpy
+
+
+class TestColumn(unittest.TestCase):
+    """Test column reductions against the statistics module."""
+
+    def setUp(self):
+        rng = random.Random(7)
+        self.values = [rng.randint(0, 5000) for _ in range(997)] + [0, 0, 0]
+
+    def check_backend(self, use_numpy: bool):
+        column = Column(self.values, use_numpy=use_numpy)
+
+        self.assertEqual(column.total(), sum(self.values))
+        self.assertEqual(column.mean(), statistics.mean(self.values))
+        self.assertEqual(column.sorted().head(10).tolist(), sorted(self.values)[:10])
+        self.assertEqual(column.positive().tail(5).tolist(), [v for v in self.values if v > 0][-5:])
+        self.assertEqual(column.tail(0).tolist(), [])
+        self.assertEqual(column.count_between(5, 15), sum(1 for v in self.values if 5 <= v <= 15))
+
+    def test_python_backend(self):
+        """Pure-Python backend matches statistics.mean."""
+        self.check_backend(use_numpy=False)
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_numpy_backend_identical(self):
+        """NumPy backend returns exactly the pure-Python results."""
+        self.check_backend(use_numpy=True)
+        python, vectorized = Column(self.values, False), Column(self.values, True)
+        self.assertEqual(python.total(), vectorized.total())
+        self.assertEqual(python.positive().head(100).mean(), vectorized.positive().head(100).mean())
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_default_backend_once_numpy_loaded(self):
+        """With NumPy imported, columns vectorize from NUMPY_MIN_ROWS values."""
+        self.assertTrue(preload_numpy())
+        self.assertTrue(Column(range(NUMPY_MIN_ROWS)).is_numpy)
+        self.assertFalse(Column(range(NUMPY_MIN_ROWS - 1)).is_numpy)
+
+    def test_empty_and_single(self):
+        """Degenerate columns reduce to zero instead of raising."""
+        self.assertEqual(Column([]).mean(), 0.0)
+        self.assertEqual(Column([]).total(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
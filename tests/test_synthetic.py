@@ -0,0 +1,72 @@
+"""
+Unit tests for the synthetic benchmark data generator.
+"""
+
+import json
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from benchmarks.synthetic import write_claude_dir, write_team_dir
+
+
+class TestSyntheticData(unittest.TestCase):
+    """Test generated data is deterministic and self-consistent."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_same_seed_same_bytes(self):
+        """Test a seed reproduces identical files and a new seed does not."""
+        write_claude_dir(self.root / "a", sessions=30, seed=7)
+        write_claude_dir(self.root / "b", sessions=30, seed=7)
+        write_claude_dir(self.root / "c", sessions=30, seed=8)
+
+        a = (self.root / "a" / "history.jsonl").read_bytes()
+        self.assertEqual(a, (self.root / "b" / "history.jsonl").read_bytes())
+        self.assertNotEqual(a, (self.root / "c" / "history.jsonl").read_bytes())
+
+    def test_stats_match_history(self):
+        """Test stats-cache totals agree with the generated history."""
+        result = write_claude_dir(self.root, sessions=25, seed=1)
+
+        entries = [json.loads(line) for line in open(result["history_path"], encoding="utf-8")]
+        stats = json.loads(Path(result["stats_path"]).read_text(encoding="utf-8"))
+
+        prompts = [e for e in entries if "display" in e]
+        assistant = [e for e in entries if e.get("role") == "assistant"]
+        self.assertEqual(len({e["sessionId"] for e in prompts}), 25)
+        self.assertEqual(stats["totalMessages"], len(prompts))
+        self.assertEqual(
+            sum(sum(day["tokensByModel"].values()) for day in stats["dailyModelTokens"]),
+            sum(e["tokens"] for e in assistant)
+        )
+        self.assertEqual(
+            sum(day["toolCallCount"] for day in stats["dailyActivity"]),
+            sum(1 for e in assistant for c in e["content"] if c["type"] == "tool_use")
+        )
+
+    def test_team_exports_match_aggregator_format(self):
+        """Test team exports use the export_personal_stats layout."""
+        write_team_dir(self.root, members=3, sessions=5)
+
+        files = sorted(self.root.glob("*_at_*.json"))
+        self.assertEqual(len(files), 3)
+        export = json.loads(files[0].read_text(encoding="utf-8"))
+        self.assertEqual(export["user"]["email"], "member00000@example.com")
+        self.assertEqual(
+            export["summary"]["total_sessions"],
+            sum(p["sessions"] for p in export["by_project"].values())
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Unit tests for per-session token attribution.
+"""
+
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.baseline_estimator import StreamingBaseline
+from token_craft.records import group_sessions
+from token_craft.scoring_engine import TokenCraftScorer
+from token_craft.token_attribution import TokenAttribution, daily_token_totals
+
+
+def ms(day: str, hour: int) -> int:
+    """Local-time epoch milliseconds."""
+    return int(datetime.strptime(f"{day} {hour:02d}", "%Y-%m-%d %H").timestamp() * 1000)
+
+
+class TestTokenAttribution(unittest.TestCase):
+    """Test joining dailyModelTokens with session timestamps."""
+
+    def setUp(self):
+        self.stats = {
+            "dailyModelTokens": [
+                {"date": "2026-01-05", "tokensByModel": {"sonnet": 1000, "haiku": 1}},
+                {"date": "2026-01-06", "tokensByModel": {"sonnet": 500}},
+                {"date": "2026-01-07", "tokensByModel": {"sonnet": 700}},
+            ]
+        }
+        history = [
+            {"sessionId": "a", "timestamp": ms("2026-01-05", 9)},
+            {"sessionId": "a", "timestamp": ms("2026-01-05", 10)},
+            {"sessionId": "b", "timestamp": ms("2026-01-05", 11)},
+            {"sessionId": "b", "timestamp": ms("2026-01-06", 9)},
+            {"sessionId": "c", "timestamp": ms("2026-01-09", 9)},  # no token data that day
+        ]
+        self.sessions = group_sessions(history)
+
+    def test_daily_totals_sum_models(self):
+        """Each day's tokens add up across models."""
+        self.assertEqual(daily_token_totals(self.stats)["2026-01-05"], 1001)
+        self.assertEqual(daily_token_totals({}), {})
+
+    def test_split_by_daily_message_share(self):
+        """Day tokens split by that day's messages, in whole tokens."""
+        attribution = TokenAttribution(self.sessions, self.stats)
+
+        # 1001 on day 1 split 2:1 (667 + 334), all 500 of day 2 to "b"
+        self.assertEqual(attribution.session_tokens, [667, 834, None])
+        self.assertEqual(attribution.covered_tokens(), [667, 834])
+        self.assertEqual(attribution.attributed_tokens, 1501)
+        self.assertEqual(attribution.unattributed_tokens, 700)
+        self.assertEqual(attribution.days_matched, 2)
+
+    def test_no_daily_data(self):
+        """Without dailyModelTokens no session is covered."""
+        attribution = TokenAttribution(self.sessions, {"modelUsage": {}})
+        self.assertEqual(attribution.covered_tokens(), [])
+
+
+class TestPartialCoverageBaseline(unittest.TestCase):
+    """Test the dynamic baseline when only some sessions have token data."""
+
+    def test_floor_uses_covered_sessions_only(self):
+        """Uncovered sessions do not dilute the 50%-of-average sanity floor."""
+        history, daily = [], []
+        for i in range(24):
+            day = f"2026-02-{i + 1:02d}"
+            history.append({"sessionId": f"s{i}", "timestamp": ms(day, 9), "display": "fix the build"})
+            if i < 12:  # Second half: no dailyModelTokens
+                daily.append({"date": day, "tokensByModel": {"sonnet": 16000 if i < 3 else 40000}})
+
+        scorer = TokenCraftScorer(history, {"dailyModelTokens": daily}, rank=1)
+        covered = scorer.attribution.covered_tokens()
+        fixed = scorer.baseline["tokens_per_session"]
+
+        self.assertEqual(len(covered), 12)
+        self.assertEqual(scorer.baseline_estimator.sessions, 12)
+        self.assertEqual(scorer.dynamic_baseline, StreamingBaseline.from_counts(covered, fixed).baseline())
+        # The estimate (MIN_BASELINE, above 0.9 * 16000) is under half the
+        # covered mean (34000), so it is rejected; counting the 12 uncovered
+        # sessions as 0 would halve the floor and let a low estimate through
+        self.assertEqual(scorer.dynamic_baseline, fixed)
+        self.assertNotEqual(StreamingBaseline.from_counts(covered + [0] * 12, fixed).baseline(), fixed)
+
+
+if __name__ == "__main__":
+    unittest.main()
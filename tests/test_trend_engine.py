@@ -0,0 +1,100 @@
+"""
+Unit tests for the rolling trend engine.
+"""
+
+import json
+import unittest
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.trend_engine import RollingSeries, TrendEngine
+
+
+class TestRollingSeries(unittest.TestCase):
+    """Test windowed averages, slopes, EWMA and persistence."""
+
+    def setUp(self):
+        self.start = datetime(2026, 1, 1, 12)
+        self.series = RollingSeries()
+        # One value per day for 100 days: 0, 2, 4, ...
+        for day in range(100):
+            self.series.update(self.start + timedelta(days=day), 2.0 * day)
+
+    def test_windows_only_keep_their_days(self):
+        """Each window averages only its last N days and stays bounded."""
+        self.assertAlmostEqual(self.series.moving_average(7), 2.0 * 96)   # days 93..99
+        self.assertAlmostEqual(self.series.moving_average(90), 2.0 * 54.5)  # days 10..99
+        self.assertEqual(len(self.series.windows[90].buckets), 90)
+
+    def test_slope_and_ewma(self):
+        """A linear series has its exact slope; EWMA lags behind the last value."""
+        for days in (7, 30, 90):
+            self.assertAlmostEqual(self.series.slope(days), 2.0)
+        self.assertLess(self.series.ewma, self.series.last_value)
+        self.assertGreater(self.series.ewma, self.series.moving_average(30))
+
+    def test_same_day_values_share_a_bucket(self):
+        """Several analyses on one day average together."""
+        series = RollingSeries()
+        series.update(self.start, 10)
+        series.update(self.start + timedelta(hours=2), 20)
+        self.assertEqual(len(series.windows[7].buckets), 1)
+        self.assertEqual(series.moving_average(7), 15)
+        self.assertIsNone(series.slope(7))
+
+    def test_gap_without_updates_expires_on_read(self):
+        """Windows end at the read date, not the last update, after a gap."""
+        later = self.start + timedelta(days=99 + 21)  # Three weeks without updates
+        summary = self.series.summary(later)
+        self.assertIsNone(summary["ma_7d"])
+        self.assertAlmostEqual(summary["ma_30d"], 2.0 * 95)  # days 91..99
+        self.assertEqual(summary["last"], 198.0)
+
+        restored = RollingSeries.from_state(json.loads(json.dumps(RollingSeries().state())), later)
+        self.assertIsNone(restored.moving_average(7))
+        restored = RollingSeries.from_state(json.loads(json.dumps(self.series.state())), later)
+        self.assertEqual(len(restored.windows[7].buckets), 0)
+        self.assertEqual(len(restored.windows[90].buckets), 69)
+
+    def test_state_round_trip(self):
+        """Restored series continue exactly where they left off."""
+        restored = RollingSeries.from_state(json.loads(json.dumps(self.series.state())))
+        when = self.start + timedelta(days=100)
+        restored.update(when, 200.0)
+        self.series.update(when, 200.0)
+
+        self.assertAlmostEqual(restored.moving_average(30), self.series.moving_average(30))
+        self.assertAlmostEqual(restored.slope(90), self.series.slope(90))
+        self.assertEqual(restored.recent, self.series.recent)
+
+
+class TestTrendEngine(unittest.TestCase):
+    """Test metric extraction from score results."""
+
+    def test_update_from_score(self):
+        """Total, category and tokens/session metrics are tracked."""
+        score_data = {
+            "total_score": 900.0,
+            "calculated_at": "2026-01-05T10:00:00",
+            "breakdown": {
+                "token_efficiency": {"score": 120.0, "details": {"avg_tokens_per_session": 42000}},
+                "session_focus": {"score": 60},
+            },
+        }
+        engine = TrendEngine()
+        engine.update_from_score(score_data)
+        engine.update_from_score(dict(score_data, total_score=800.0, calculated_at="2026-01-06T10:00:00"))
+
+        self.assertEqual(engine.recent("total_score"), [900.0, 800.0])
+        self.assertEqual(engine.get("avg_tokens_per_session").last_value, 42000)
+        self.assertEqual(engine.summary()["total_score"]["slope_7d"], -100.0)
+        self.assertEqual(engine.recent("missing"), [])
+        self.assertEqual(TrendEngine.from_state(engine.state()).summary(), engine.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
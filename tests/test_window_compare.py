@@ -0,0 +1,68 @@
+"""
+Unit tests for one-pass multi-window comparison.
+"""
+
+import unittest
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from token_craft.window_compare import DateWindow, compare_windows
+
+
+def entry(session_id: str, day: str, display: str = "fix it", project: str = "/work/api") -> dict:
+    timestamp = int(datetime.strptime(f"{day} 12", "%Y-%m-%d %H").timestamp() * 1000)
+    return {"display": display, "timestamp": timestamp, "project": project, "sessionId": session_id}
+
+
+class TestWindowCompare(unittest.TestCase):
+    """Test window routing, overlap and deltas."""
+
+    def setUp(self):
+        self.entries = [
+            entry("a", "2026-01-05"),
+            entry("a", "2026-01-05"),
+            entry("b", "2026-01-20", project="/work/web"),
+            entry("c", "2026-02-02"),
+            entry("d", "2026-02-03", display="x" * 14),
+            {"sessionId": "e", "timestamp": 0},  # no display: not a prompt
+        ]
+        self.stats = {"dailyModelTokens": [
+            {"date": "2026-01-05", "tokensByModel": {"sonnet": 1000}},
+            {"date": "2026-02-02", "tokensByModel": {"sonnet": 3000}},
+        ]}
+
+    def test_windows_and_deltas(self):
+        """Each prompt counts in every window containing its day."""
+        windows = [
+            DateWindow.parse("jan=2026-01-01:2026-01-31"),
+            DateWindow.parse("feb=2026-02-01:2026-02-28"),
+            DateWindow("all", "2026-01-01", "2026-02-28"),
+        ]
+        report = compare_windows(iter(self.entries), windows, self.stats)
+        jan, feb, overall = report["windows"]
+
+        self.assertEqual((jan["sessions"], jan["messages"], jan["tokens"]), (2, 3, 1000))
+        self.assertEqual(jan["by_project"], {"api": {"sessions": 1, "messages": 2},
+                                             "web": {"sessions": 1, "messages": 1}})
+        self.assertEqual((feb["sessions"], feb["avg_prompt_chars"], feb["tokens_per_session"]), (2, 10.0, 1500))
+        self.assertEqual((overall["sessions"], overall["messages"]), (4, 5))
+        self.assertEqual(report["messages_scanned"], 6)
+
+        feb_delta = report["deltas"][0]
+        self.assertEqual((feb_delta["name"], feb_delta["vs"]), ("feb", "jan"))
+        self.assertEqual(feb_delta["tokens"], 200.0)
+        self.assertEqual(feb_delta["messages"], -33.3)
+
+    def test_invalid_windows(self):
+        """Malformed specs and reversed ranges are rejected."""
+        for spec in ["jan", "jan=2026-01-01", "=2026-01-01:2026-01-02", "jan=2026-02-01:2026-01-01"]:
+            with self.assertRaises(ValueError):
+                DateWindow.parse(spec)
+
+
+if __name__ == "__main__":
+    unittest.main()
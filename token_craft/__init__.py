@@ -2,38 +2,51 @@
 Token-Craft: Master LLM efficiency through space exploration ranks.
 
 A gamified token optimization system inspired by retro computing constraints.
+
+Public classes are imported lazily on first attribute access (PEP 562),
+so `import token_craft.scoring_engine` does not pull in the hero client,
+interactive menu or pricing modules.
 """
 
+import importlib
+
 __version__ = "1.1.0"
 __author__ = "Dmitriy Zhorov"
 
-from .scoring_engine import TokenCraftScorer
-from .rank_system import SpaceRankSystem
-from .user_profile import UserProfile
-from .snapshot_manager import SnapshotManager
-from .delta_calculator import DeltaCalculator
-from .report_generator import ReportGenerator
-from .progress_visualizer import ProgressVisualizer
-from .leaderboard_generator import LeaderboardGenerator
-from .hero_api_client import HeroAPIClient, MockHeroClient
-from .team_exporter import TeamExporter
-from .recommendation_engine import RecommendationEngine
-from .interactive_menu import InteractiveMenu
-from .pricing_calculator import PricingCalculator
-
-__all__ = [
-    "TokenCraftScorer",
-    "SpaceRankSystem",
-    "UserProfile",
-    "SnapshotManager",
-    "DeltaCalculator",
-    "ReportGenerator",
-    "ProgressVisualizer",
-    "LeaderboardGenerator",
-    "HeroAPIClient",
-    "MockHeroClient",
-    "TeamExporter",
-    "RecommendationEngine",
-    "InteractiveMenu",
-    "PricingCalculator",
-]
+# Public name -> submodule that defines it
+_LAZY_ATTRS = {
+    "TokenCraftScorer": "scoring_engine",
+    "SpaceRankSystem": "rank_system",
+    "UserProfile": "user_profile",
+    "SnapshotManager": "snapshot_manager",
+    "DeltaCalculator": "delta_calculator",
+    "ReportGenerator": "report_generator",
+    "ProgressVisualizer": "progress_visualizer",
+    "LeaderboardGenerator": "leaderboard_generator",
+    "HeroAPIClient": "hero_api_client",
+    "MockHeroClient": "hero_api_client",
+    "AsyncHeroAPIClient": "hero_async_client",
+    "BadgeOutbox": "badge_outbox",
+    "TeamExporter": "team_exporter",
+    "RecommendationEngine": "recommendation_engine",
+    "InteractiveMenu": "interactive_menu",
+    "PricingCalculator": "pricing_calculator",
+    "Message": "records",
+    "Session": "records",
+}
+
+__all__ = list(_LAZY_ATTRS)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value  # Cache so __getattr__ is not hit again
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,300 @@
+"""
+Badge Operation Outbox
+
+Durable on-disk queue for rank-driven badge changes.
+
+Analysis runs enqueue badge operations locally instead of calling the
+hero API directly, so they never block on (or lose changes to) a slow
+or unavailable endpoint. A flusher drains the queue in bulk batches.
+
+Queue rules (per user + badge):
+- Same operation queued twice: kept once (latest payload wins)
+- Issue followed by revoke, or revoke followed by issue: both dropped
+- Operations already claimed by a running flush are never merged
+- Failed sends stay queued and are retried on the next flush
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+class BadgeOutbox:
+    """SQLite-backed outbox of pending badge operations."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS operations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_email TEXT NOT NULL,
+            badge_id TEXT NOT NULL,
+            op TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            last_error TEXT,
+            claimed_at REAL
+        );
+        CREATE INDEX IF NOT EXISTS idx_operations_key ON operations (user_email, badge_id)
+    """
+
+    OPPOSITE = {"issue": "revoke", "revoke": "issue"}
+
+    # Claims older than this are assumed abandoned (crashed flusher)
+    CLAIM_TIMEOUT_SEC = 600
+
+    def __init__(self, db_path: Optional[Path] = None):
+        """
+        Initialize outbox.
+
+        Args:
+            db_path: SQLite file (default: ~/.claude/token-craft/badge_outbox.db)
+        """
+        if db_path:
+            self.db_path = Path(db_path)
+        else:
+            self.db_path = Path.home() / ".claude" / "token-craft" / "badge_outbox.db"
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(self.SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        """Open a connection, commit on success and always close it."""
+        conn = sqlite3.connect(str(self.db_path), timeout=10)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, operation: Dict) -> str:
+        """
+        Queue one badge operation.
+
+        Args:
+            operation: {"op": "issue"|"revoke", "user_email", "badge_id", ...}
+
+        Returns:
+            "queued", "replaced" (same op already pending) or
+            "cancelled" (opposite op was pending; both dropped)
+        """
+        op = operation["op"]
+        if op not in self.OPPOSITE:
+            raise ValueError(f"Unsupported badge operation: {op}")
+
+        user_email = operation["user_email"]
+        badge_id = operation["badge_id"]
+        payload = json.dumps(operation)
+
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id, op FROM operations "
+                "WHERE user_email = ? AND badge_id = ? AND claimed_at IS NULL",
+                (user_email, badge_id)
+            ).fetchone()
+
+            if row is None:
+                conn.execute(
+                    "INSERT INTO operations (user_email, badge_id, op, payload, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (user_email, badge_id, op, payload, datetime.now().isoformat())
+                )
+                return "queued"
+
+            if row[1] == self.OPPOSITE[op]:
+                conn.execute("DELETE FROM operations WHERE id = ?", (row[0],))
+                return "cancelled"
+
+            conn.execute("UPDATE operations SET payload = ? WHERE id = ?", (payload, row[0]))
+            return "replaced"
+
+    def enqueue_many(self, operations: List[Dict]) -> Dict:
+        """Queue several operations; returns counts per enqueue outcome."""
+        counts = {"queued": 0, "replaced": 0, "cancelled": 0}
+        for operation in operations:
+            counts[self.enqueue(operation)] += 1
+        return counts
+
+    def pending_count(self) -> int:
+        """Number of operations waiting to be sent."""
+        with self._connect() as conn:
+            return conn.execute("SELECT COUNT(*) FROM operations").fetchone()[0]
+
+    def peek(self, limit: int = 100) -> List[Dict]:
+        """Oldest pending operations, without claiming them."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT payload FROM operations ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        return [json.loads(payload) for (payload,) in rows]
+
+    def _claim(self, limit: int) -> List[tuple]:
+        """Mark the oldest unclaimed operations as in flight and return them."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            rows = conn.execute(
+                "SELECT id, payload FROM operations "
+                "WHERE claimed_at IS NULL OR claimed_at < ? ORDER BY id LIMIT ?",
+                (now - self.CLAIM_TIMEOUT_SEC, limit)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE operations SET claimed_at = ? WHERE id = ?",
+                [(now, row_id) for row_id, _ in rows]
+            )
+        return [(row_id, json.loads(payload)) for row_id, payload in rows]
+
+    def flush(self, client, batch_size: int = 100, max_operations: Optional[int] = None) -> Dict:
+        """
+        Send pending operations through a hero client's bulk endpoint.
+
+        Successful operations are removed; failed ones stay queued with
+        their attempt count and last error recorded.
+
+        Args:
+            client: HeroAPIClient (or subclass) with submit_badge_operations()
+            batch_size: Operations per bulk request
+            max_operations: Stop after this many operations (default: all)
+
+        Returns:
+            Dict with sent/succeeded/failed/remaining counts
+        """
+        summary = {"sent": 0, "succeeded": 0, "failed": 0}
+
+        while max_operations is None or summary["sent"] < max_operations:
+            limit = batch_size * client.max_workers
+            if max_operations is not None:
+                limit = min(limit, max_operations - summary["sent"])
+
+            rows = self._claim(limit)
+            if not rows:
+                break
+
+            result = client.submit_badge_operations([op for _, op in rows], batch_size=batch_size)
+            op_results = result.get("results", [])
+
+            done = []
+            failed = []
+            for index, (row_id, _) in enumerate(rows):
+                if index < len(op_results) and op_results[index].get("success"):
+                    done.append((row_id,))
+                else:
+                    failed.append((row_id,))
+
+            last_error = "; ".join(result.get("errors", [])) or "operation rejected"
+            with self._connect() as conn:
+                conn.executemany("DELETE FROM operations WHERE id = ?", done)
+                conn.executemany(
+                    "UPDATE operations SET attempts = attempts + 1, last_error = ?, claimed_at = NULL "
+                    "WHERE id = ?",
+                    [(last_error, row_id) for (row_id,) in failed]
+                )
+
+            summary["sent"] += len(rows)
+            summary["succeeded"] += len(done)
+            summary["failed"] += len(failed)
+
+            if failed:
+                # Endpoint is struggling - leave the rest for the next flush
+                break
+
+        summary["remaining"] = self.pending_count()
+        return summary
+
+
+class BackgroundFlusher:
+    """Daemon thread that periodically drains a BadgeOutbox."""
+
+    def __init__(self, outbox: BadgeOutbox, client, interval: float = 30.0, batch_size: int = 100):
+        """
+        Initialize flusher (not started yet).
+
+        Args:
+            outbox: Outbox to drain
+            client: Hero client used to send batches
+            interval: Seconds between flush attempts
+            batch_size: Operations per bulk request
+        """
+        self.outbox = outbox
+        self.client = client
+        self.interval = interval
+        self.batch_size = batch_size
+        self.last_result = None
+        self._stop = threading.Event()
+        self._final_flush = False
+        self._thread = threading.Thread(target=self._run, name="badge-outbox-flusher", daemon=True)
+
+    def start(self) -> "BackgroundFlusher":
+        """Start flushing in the background (the first flush runs at once)."""
+        self._thread.start()
+        return self
+
+    def _flush_once(self):
+        try:
+            if self.outbox.pending_count():
+                self.last_result = self.outbox.flush(self.client, batch_size=self.batch_size)
+        except Exception as e:
+            self.last_result = {"error": str(e)}
+
+    def _run(self):
+        while True:
+            self._flush_once()
+            if self._stop.wait(self.interval):
+                break
+        if self._final_flush:
+            self._flush_once()
+
+    def stop(self, timeout: Optional[float] = None, flush: bool = False) -> bool:
+        """
+        Stop after the current flush finishes.
+
+        The thread is a daemon, so a short-lived process should call this
+        before exiting; otherwise a flush can be cut off mid-batch and its
+        claimed operations wait CLAIM_TIMEOUT_SEC before being resent.
+
+        Args:
+            timeout: Max seconds to wait for the thread (None: no limit)
+            flush: Flush once more before stopping
+
+        Returns:
+            True if the thread finished within timeout
+        """
+        self._final_flush = flush
+        self._stop.set()
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+
+def main():
+    """Command-line entry point to inspect or drain the outbox."""
+    import argparse
+    from .hero_api_client import HeroAPIClient
+
+    parser = argparse.ArgumentParser(description="Inspect or flush the badge outbox")
+    parser.add_argument("command", choices=["status", "flush"])
+    parser.add_argument("--db", help="Outbox database path")
+    parser.add_argument("--api-url", help="Hero API base URL")
+    parser.add_argument("--api-key", help="Hero API key")
+    parser.add_argument("--batch-size", type=int, default=100, help="Operations per bulk request")
+    args = parser.parse_args()
+
+    outbox = BadgeOutbox(args.db)
+
+    if args.command == "status":
+        print(f"Pending badge operations: {outbox.pending_count()}")
+        for op in outbox.peek(10):
+            print(f"  {op['op']:<7} {op['badge_id']:<24} {op['user_email']}")
+    else:
+        client = HeroAPIClient(api_url=args.api_url, api_key=args.api_key)
+        result = outbox.flush(client, batch_size=args.batch_size)
+        client.close()
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+"""
+Streaming Dynamic Baseline
+
+The dynamic baseline is 90% of the mean tokens of the user's best
+(lowest) quarter of sessions. Session sizes are either attributed
+tokens (see token_attribution) or, without per-session data, message
+counts that total tokens are spread over in proportion. Either way the
+estimator keeps a histogram of session sizes instead of every session:
+
+- sizes below EXACT_LIMIT (message counts) get one bucket per integer;
+  larger sizes (token totals, nearly all distinct) share log-spaced
+  buckets BUCKET_GROWTH apart, so the bucket count d stays in the low
+  thousands however many sessions are scored
+- each bucket holds its session count and exact size sum
+- add/update/remove a session in O(1)
+- P25 selection walks the buckets in order (counting selection),
+  O(d log d), never a sort of all sessions; memory is O(d)
+
+Totals are exact. The quartile sum is exact for message counts; for
+token sizes only the bucket the quartile boundary falls in is
+approximated (by its mean), so the quartile sum is off by less than
+BUCKET_GROWTH (1%) relative.
+"""
+
+import math
+from typing import Dict, Iterable, Optional, Tuple
+
+MIN_SESSIONS = 10           # Fewer sessions: use the fixed baseline
+IMPROVEMENT_TARGET = 0.90   # Baseline is 90% of the best quartile
+MIN_BASELINE = 15000        # Tokens; never set an impossibly low target
+
+EXACT_LIMIT = 1024          # Sizes below this get their own bucket
+BUCKET_GROWTH = 0.01        # Relative width of the log buckets above it
+_LOG_GROWTH = math.log1p(BUCKET_GROWTH)
+
+
+def bucket_key(size: float) -> int:
+    """Histogram bucket of a session size (monotonic in size)."""
+    if size < EXACT_LIMIT:
+        return int(size)
+    return EXACT_LIMIT + int(math.log(size / EXACT_LIMIT) / _LOG_GROWTH)
+
+
+class StreamingBaseline:
+    """Incrementally maintained dynamic baseline estimator."""
+
+    def __init__(self, fixed_tokens_per_session: float):
+        """
+        Initialize an empty estimator.
+
+        Args:
+            fixed_tokens_per_session: Fallback (and ceiling) baseline
+        """
+        self.fixed_tokens_per_session = fixed_tokens_per_session
+        self.sessions = 0
+        self.total = 0
+        self._buckets = {}  # bucket key -> [sessions, size sum]
+
+    @classmethod
+    def from_counts(cls, session_sizes: Iterable[float], fixed_tokens_per_session: float) -> "StreamingBaseline":
+        """
+        Build from per-session sizes in one pass.
+
+        Args:
+            session_sizes: Messages or tokens per session
+            fixed_tokens_per_session: Fallback (and ceiling) baseline
+
+        Returns:
+            Populated estimator
+        """
+        estimator = cls(fixed_tokens_per_session)
+        for size in session_sizes:
+            estimator.add_session(size)
+        return estimator
+
+    def add_session(self, size: float):
+        """Record a new session of the given size."""
+        key = bucket_key(size)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            self._buckets[key] = [1, size]
+        else:
+            bucket[0] += 1
+            bucket[1] += size
+        self.sessions += 1
+        self.total += size
+
+    def remove_session(self, size: float):
+        """Forget a session (e.g. one that aged out of the window)."""
+        key = bucket_key(size)
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            raise ValueError(f"No session of size {size} to remove")
+        if bucket[0] == 1:
+            del self._buckets[key]
+        else:
+            bucket[0] -= 1
+            bucket[1] -= size
+        self.sessions -= 1
+        self.total -= size
+
+    def update_session(self, old_size: float, new_size: float):
+        """Move a session that grew (or shrank) from old_size to new_size."""
+        if old_size != new_size:
+            self.remove_session(old_size)
+            self.add_session(new_size)
+
+    def lowest_quartile(self) -> Tuple[int, float]:
+        """
+        Select the best (smallest) 25% of sessions.
+
+        Returns:
+            Tuple of (sessions selected, their total size); at least one
+            session is selected when any exist
+        """
+        wanted = max(1, self.sessions // 4) if self.sessions else 0
+        selected = 0
+        size = 0
+        for key in sorted(self._buckets):
+            if selected >= wanted:
+                break
+            count, bucket_size = self._buckets[key]
+            take = min(count, wanted - selected)
+            selected += take
+            if take == count:
+                size += bucket_size
+            else:
+                # Boundary bucket: its mean (exact when all sizes are equal)
+                part = take * bucket_size
+                size += part // count if part % count == 0 else part / count
+        return selected, size
+
+    def baseline(self, total_tokens: Optional[int] = None) -> float:
+        """
+        Current dynamic baseline in tokens per session.
+
+        Args:
+            total_tokens: Tokens to spread over sessions in proportion to
+                their sizes (message counts); None when sizes are tokens
+
+        Returns:
+            Dynamic baseline, or the fixed one when data is insufficient
+        """
+        fixed = self.fixed_tokens_per_session
+
+        # Need enough sessions (and a nonzero total to distribute tokens over)
+        if self.sessions < MIN_SESSIONS or self.total == 0:
+            return fixed
+
+        selected, selected_size = self.lowest_quartile()
+
+        # Mean tokens of the best sessions, from exact integer sums
+        if total_tokens is None:
+            total_tokens = self.total
+            best_avg = selected_size / selected
+        else:
+            best_avg = selected_size * total_tokens / (selected * self.total)
+
+        # Set baseline as 90% of best quartile (10% improvement target)
+        dynamic_baseline = max(MIN_BASELINE, best_avg * IMPROVEMENT_TARGET)
+
+        # If dynamic baseline is unreasonably low compared to user average
+        # (over the sessions added here), it means our estimation failed -
+        # use fixed baseline instead
+        if dynamic_baseline < (total_tokens / self.sessions) * 0.5:
+            return fixed
+
+        # Don't set higher than fixed baseline (defeats purpose)
+        return round(min(dynamic_baseline, fixed), 0)
+
+    def state(self) -> Dict:
+        """JSON-serializable state (buckets only, not sessions)."""
+        return {
+            "fixed_tokens_per_session": self.fixed_tokens_per_session,
+            "buckets": {str(key): bucket for key, bucket in sorted(self._buckets.items())},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "StreamingBaseline":
+        """Restore an estimator saved with state()."""
+        estimator = cls(state["fixed_tokens_per_session"])
+        for key, (count, size) in state.get("buckets", {}).items():
+            estimator._buckets[int(key)] = [count, size]
+            estimator.sessions += count
+            estimator.total += size
+        # Older states: exact size -> sessions of that size
+        for size, count in state.get("histogram", {}).items():
+            for _ in range(count):
+                estimator.add_session(int(size))
+        return estimator
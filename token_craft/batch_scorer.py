@@ -0,0 +1,209 @@
+"""
+Team Batch Scoring
+
+Scores many users' raw Claude Code data in one run: a directory holds one
+sub-directory per user with that user's history.jsonl and (optionally)
+stats-cache.json, user.json ({"name", "email", "department"}) and
+user_profile.json (for rank-based difficulty scaling):
+
+    histories/
+        alice@company.com/history.jsonl (+ rotated history.jsonl.N[.gz]), stats-cache.json
+        bob/history.jsonl, stats-cache.json, user.json
+
+Users are scored in a process pool. Workers receive paths, not data, and
+return one small result row, so a worker holds a single user's history
+at a time; workers are replaced after MAX_TASKS_PER_CHILD users to hand
+memory back to the OS. The rows are written as one compact table
+(column names once, one list per user) that LeaderboardGenerator loads
+alongside per-user exports.
+"""
+
+import copy
+import json
+import multiprocessing
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .history_segments import SegmentedHistory
+from .persistence import create_unique
+from .rank_system import SpaceRankSystem
+from .records import project_display_name
+from .scoring_engine import TokenCraftScorer
+
+TABLE_VERSION = 1
+TABLE_GLOB = "batch_scores_*.json"
+MAX_TASKS_PER_CHILD = 20
+
+# Result table columns, in row order (keys match per-user exports)
+COLUMNS = (
+    "user_email",
+    "name",
+    "department",
+    "current_score",
+    "current_rank",
+    "total_sessions",
+    "total_messages",
+    "total_tokens",
+    "avg_tokens_per_session",
+    "scores",      # Category -> score
+    "projects",    # Project name -> {"sessions", "messages"}
+    "error",       # None, or why the user could not be scored
+)
+
+
+def discover_users(root: Path) -> List[Dict]:
+    """
+    Find per-user data directories.
+
+    Args:
+        root: Directory with one sub-directory per user
+
+    Returns:
+        Jobs (user id and file paths as strings), sorted by user id
+    """
+    jobs = []
+    for user_dir in sorted(Path(root).iterdir()):
+        history_path = user_dir / "history.jsonl"
+        if not user_dir.is_dir() or not history_path.is_file():
+            continue
+        jobs.append({
+            "user": user_dir.name,
+            "history": str(history_path),
+            "stats": str(user_dir / "stats-cache.json"),
+            "identity": str(user_dir / "user.json"),
+            "profile": str(user_dir / "user_profile.json"),
+        })
+    return jobs
+
+
+def _load_json(path: str) -> Dict:
+    if not os.path.isfile(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return data if isinstance(data, dict) else {}
+
+
+def score_user(job: Dict) -> List:
+    """
+    Score one user (runs in a worker process).
+
+    Args:
+        job: Entry from discover_users()
+
+    Returns:
+        Result row in COLUMNS order
+    """
+    user = job["user"]
+    row = dict.fromkeys(COLUMNS)
+    row.update({"user_email": user, "name": user.split("@")[0], "department": "Unknown"})
+    try:
+        identity = _load_json(job["identity"])
+        row["user_email"] = identity.get("email", row["user_email"])
+        row["name"] = identity.get("name", row["name"])
+        row["department"] = identity.get("department", row["department"])
+
+        # Rotated segments included; the shared tree is left without cache files
+        history_data = list(SegmentedHistory(job["history"], cache=False).messages())
+        stats_data = _load_json(job["stats"])
+        profile = _load_json(job["profile"])
+        rank = SpaceRankSystem.get_rank(profile.get("current_score", 0)).get("rank", 1)
+
+        scorer = TokenCraftScorer(history_data, stats_data, rank=rank, user_profile=copy.deepcopy(profile))
+        score_data = scorer.calculate_total_score()
+
+        projects = {}
+        for session in scorer.sessions:
+            pstats = projects.setdefault(project_display_name(session.project), {"sessions": 0, "messages": 0})
+            pstats["sessions"] += 1
+            pstats["messages"] += len(session.messages)
+
+        details = score_data["breakdown"].get("token_efficiency", {}).get("details", {})
+        row.update({
+            "current_score": score_data["total_score"],
+            "current_rank": SpaceRankSystem.get_rank(score_data["total_score"])["name"],
+            "total_sessions": details.get("total_sessions", len(scorer.sessions)),
+            # Prompts only, like exports (PROMPT_KEYS: sessionId and display)
+            "total_messages": sum(
+                1 for message in history_data if message.session_id is not None and message.display is not None
+            ),
+            "total_tokens": details.get("total_tokens", 0),
+            "avg_tokens_per_session": details.get("avg_tokens_per_session", 0),
+            "scores": {name: category.get("score", 0) for name, category in score_data["breakdown"].items()},
+            "projects": projects,
+        })
+    except Exception as e:
+        row["error"] = f"{type(e).__name__}: {e}"
+    return [row[column] for column in COLUMNS]
+
+
+def score_users(jobs: List[Dict], workers: Optional[int] = None,
+                max_tasks_per_child: int = MAX_TASKS_PER_CHILD) -> List[List]:
+    """
+    Score users across a process pool.
+
+    Args:
+        jobs: Entries from discover_users()
+        workers: Worker processes (default: CPU count; 1 scores in-process)
+        max_tasks_per_child: Users a worker scores before it is replaced
+
+    Returns:
+        Result rows in job order
+    """
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        return [score_user(job) for job in jobs]
+
+    with multiprocessing.Pool(workers, maxtasksperchild=max_tasks_per_child) as pool:
+        # chunksize 1: histories vary a lot in size, so hand out one user at a time
+        return pool.map(score_user, jobs, chunksize=1)
+
+
+def build_table(rows: List[List]) -> Dict:
+    """Wrap result rows as a results table."""
+    return {
+        "version": TABLE_VERSION,
+        "generated_at": datetime.now().isoformat(),
+        "columns": list(COLUMNS),
+        "rows": rows,
+    }
+
+
+def is_results_table(data) -> bool:
+    """True if data is a table written by write_table()."""
+    return isinstance(data, dict) and isinstance(data.get("columns"), list) and isinstance(data.get("rows"), list)
+
+
+def table_records(table: Dict, include_errors: bool = False) -> Iterable[Dict]:
+    """
+    Expand a results table into one dict per user.
+
+    Args:
+        table: Results table
+        include_errors: Also yield users that could not be scored
+
+    Yields:
+        Dicts keyed like per-user exports (user_email, current_score, ...)
+    """
+    columns = table["columns"]
+    for values in table["rows"]:
+        record = dict(zip(columns, values))
+        if include_errors or not record.get("error"):
+            yield record
+
+
+def write_table(rows: List[List], output_dir: Path) -> Path:
+    """
+    Write a results table atomically.
+
+    Args:
+        rows: Result rows from score_users()
+        output_dir: Directory (e.g. LeaderboardGenerator's stats_dir)
+
+    Returns:
+        Path of the written table
+    """
+    path = Path(output_dir) / TABLE_GLOB.replace("*", datetime.now().strftime("%Y%m%d_%H%M%S"))
+    return create_unique(path, json.dumps(build_table(rows), separators=(",", ":")))
@@ -0,0 +1,104 @@
+"""
+Prompt Categories
+
+Keyword tables that classify prompts by task category and work type,
+shared by the analyzer (analyze_tokens_v2.py) and the rollup cube, and
+the prompt-practice keywords the scorer checks.
+
+A text can match several categories. Besides the name lists, matches are
+available as bitmasks over the table order (bit i = i-th name), so sets
+of categories can be stored, unioned and compared as single ints.
+"""
+
+from typing import List
+
+# Category definitions with keywords
+CATEGORIES = {
+    'Git Operations': ['git', 'commit', 'push', 'pull', 'merge', 'branch', 'clone', 'rebase', 'checkout'],
+    'File Operations': ['read', 'write', 'edit', 'file', 'directory', 'folder', 'create file', 'delete file'],
+    'Code Writing': ['implement', 'add feature', 'create function', 'write code', 'develop', 'build'],
+    'Debugging/Fixing': ['fix', 'bug', 'error', 'issue', 'debug', 'problem', 'not working', 'failing'],
+    'Web Scraping/API': ['scrape', 'api', 'fetch', 'request', 'endpoint', 'curl', 'http'],
+    'Search/Exploration': ['search', 'find', 'look for', 'explore', 'show me', 'list', 'where is'],
+    'Refactoring': ['refactor', 'clean up', 'reorganize', 'restructure', 'optimize', 'improve code'],
+    'Documentation': ['document', 'readme', 'comment', 'explain', 'describe'],
+    'Configuration': ['config', 'setup', 'install', 'configure', 'settings'],
+    'Data Processing': ['analyze', 'parse', 'process data', 'calculate', 'statistics', 'csv', 'json', 'transform'],
+    'Testing': ['test', 'pytest', 'unit test', 'integration test'],
+}
+
+WORK_TYPES = {
+    'Coding': ['implement', 'write code', 'function', 'class', 'develop', 'build', 'create'],
+    'Data Processing': ['parse', 'transform', 'csv', 'json', 'data', 'process', 'analyze data'],
+    'DevOps': ['deploy', 'docker', 'kubernetes', 'ci/cd', 'pipeline', 'build'],
+    'Research': ['explore', 'investigate', 'understand', 'how does', 'what is', 'explain'],
+    'Maintenance': ['fix', 'bug', 'refactor', 'clean up', 'update', 'upgrade'],
+}
+
+# Prompt-practice keywords the scorer looks for in message text
+# (scoring_engine; 'xml' is matched case-sensitively, the rest lowercased)
+PRACTICE_KEYWORDS = {
+    'documentation': ['readme', 'documentation', 'comment', 'docstring', 'docs'],
+    'defer': ['defer', 'later', 'skip', 'wait', 'after'],
+    'simple_commands': ['git log', 'git status', 'cat ', 'ls ', 'grep ', 'show me'],
+    'xml': ['<document>', '<task>', '<context>', '<example>', '<input>', '<output>', '</'],
+    'chain_of_thought': ["let's think", 'step by step', 'reasoning:', 'because', 'first', 'then', 'therefore', 'analyze'],
+    'examples': ['for example', 'e.g.', 'such as', 'like this:', "here's an example", 'example:'],
+}
+
+# Every keyword matched against prompt text, in a fixed order (compacted
+# history stores a text's matches as a bitmask over this list)
+KEYWORDS = sorted({
+    keyword
+    for table in (CATEGORIES, WORK_TYPES, PRACTICE_KEYWORDS)
+    for keywords in table.values()
+    for keyword in keywords
+})
+
+# Reported when nothing matches
+NO_CATEGORY = 'Other'
+NO_WORK_TYPE = 'General'
+
+CATEGORY_NAMES = list(CATEGORIES)
+WORK_TYPE_NAMES = list(WORK_TYPES)
+
+_CATEGORY_KEYWORDS = list(CATEGORIES.values())
+_WORK_TYPE_KEYWORDS = list(WORK_TYPES.values())
+
+
+def _mask(text_lower: str, keyword_lists) -> int:
+    mask = 0
+    for bit, keywords in enumerate(keyword_lists):
+        if any(keyword in text_lower for keyword in keywords):
+            mask |= 1 << bit
+    return mask
+
+
+def category_mask(message_text: str) -> int:
+    """Bitmask of matching categories (0 = none matched)."""
+    return _mask(message_text.lower(), _CATEGORY_KEYWORDS)
+
+
+def work_type_mask(message_text: str) -> int:
+    """Bitmask of matching work types (0 = none matched)."""
+    return _mask(message_text.lower(), _WORK_TYPE_KEYWORDS)
+
+
+def category_names(mask: int) -> List[str]:
+    """Category names of a bitmask, in table order."""
+    return [name for bit, name in enumerate(CATEGORY_NAMES) if mask >> bit & 1] or [NO_CATEGORY]
+
+
+def work_type_names(mask: int) -> List[str]:
+    """Work type names of a bitmask, in table order."""
+    return [name for bit, name in enumerate(WORK_TYPE_NAMES) if mask >> bit & 1] or [NO_WORK_TYPE]
+
+
+def categorize_message(message_text):
+    """Categorize a message based on keywords."""
+    return category_names(category_mask(message_text))
+
+
+def categorize_work_type(message_text):
+    """Determine work type from message."""
+    return work_type_names(work_type_mask(message_text))
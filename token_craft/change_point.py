@@ -0,0 +1,230 @@
+"""
+Streaming Change-Point Detection
+
+Page-Hinkley test over per-session token usage: values are fed one at a
+time as sessions complete and the detector flags the observation at
+which usage shifted upward (an efficiency regression), instead of
+comparing a short list of recent scores against fixed thresholds.
+
+The test runs on log tokens standardized against the current regime's
+running mean and deviation (a Welford accumulator), so one threshold
+works for light and heavy users and a single outlier session cannot
+raise an alarm on its own. State is constant-size: the regime
+statistics, the cumulative sum and its minimum. After an alarm the
+regime restarts from the flagged session; the change stays active while
+the new regime's level is still above the level before the change.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .running_stats import RunningStats
+
+DELTA = 0.5            # Tolerated drift, in standard deviations per session
+THRESHOLD = 8.0        # Alarm when the cumulative excess exceeds this
+MIN_SAMPLES = 10       # Sessions in a regime before it can raise an alarm
+CLIP = 3.0             # Cap on one session's standardized deviation
+MIN_STDEV = 0.05       # Floor for near-constant regimes (log scale)
+
+
+class PageHinkley:
+    """Online Page-Hinkley detector for upward shifts in a positive series."""
+
+    __slots__ = ("delta", "threshold", "min_samples", "observations",
+                 "reference", "cumulative", "minimum", "changes", "last_change",
+                 "previous_mean")
+
+    def __init__(self, delta: float = DELTA, threshold: float = THRESHOLD,
+                 min_samples: int = MIN_SAMPLES):
+        """
+        Initialize detector.
+
+        Args:
+            delta: Drift tolerated before deviations accumulate
+            threshold: Cumulative excess that raises an alarm
+            min_samples: Values needed in a regime before alarms
+        """
+        self.delta = delta
+        self.threshold = threshold
+        self.min_samples = min_samples
+        self.observations = 0
+        self.reference = RunningStats()  # Log values of the current regime
+        self.cumulative = 0.0
+        self.minimum = 0.0
+        self.changes = 0
+        self.last_change = None  # Observation index of the latest alarm
+        self.previous_mean = None  # Log mean of the regime before that alarm
+
+    @property
+    def statistic(self) -> float:
+        """Current Page-Hinkley statistic (alarm above threshold)."""
+        return self.cumulative - self.minimum
+
+    def update(self, value: float) -> bool:
+        """
+        Add one observation (O(1)).
+
+        Args:
+            value: Tokens of one session (non-positive values are ignored)
+
+        Returns:
+            True if this observation is a change point
+        """
+        if value is None or value <= 0:
+            return False
+
+        x = math.log(value)
+        reference = self.reference
+        alarm = False
+
+        if reference.count >= self.min_samples:
+            deviation = (x - reference.mean) / max(reference.stdev(), MIN_STDEV)
+            self.cumulative += min(CLIP, max(-CLIP, deviation)) - self.delta
+            self.minimum = min(self.minimum, self.cumulative)
+            if self.cumulative - self.minimum > self.threshold:
+                alarm = True
+                self.changes += 1
+                self.last_change = self.observations
+                self.previous_mean = reference.mean
+                self.reference = reference = RunningStats()
+                self.cumulative = self.minimum = 0.0
+
+        reference.add(x)
+        self.observations += 1
+        return alarm
+
+    def shift(self) -> Optional[float]:
+        """Current level relative to the level before the latest change (0.5 = 50% higher)."""
+        if self.previous_mean is None or not self.reference.count:
+            return None
+        return math.exp(self.reference.mean - self.previous_mean) - 1
+
+    def summary(self) -> Dict:
+        """Change count, latest change and whether usage is still above the old level."""
+        shift = self.shift()
+        return {
+            "observations": self.observations,
+            "changes": self.changes,
+            "last_change": self.last_change,
+            "sessions_since_change": (
+                self.observations - 1 - self.last_change if self.last_change is not None else None
+            ),
+            "shift_pct": round(shift * 100, 1) if shift is not None else None,
+            "active": shift is not None and shift > 0,
+            "statistic": round(self.statistic, 2),
+            "threshold": self.threshold,
+        }
+
+    def state(self) -> Dict:
+        """JSON-serializable state."""
+        return {
+            "delta": self.delta,
+            "threshold": self.threshold,
+            "min_samples": self.min_samples,
+            "observations": self.observations,
+            "reference": self.reference.state(),
+            "cumulative": self.cumulative,
+            "minimum": self.minimum,
+            "changes": self.changes,
+            "last_change": self.last_change,
+            "previous_mean": self.previous_mean,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "PageHinkley":
+        """Restore a detector saved with state()."""
+        detector = cls(state.get("delta", DELTA), state.get("threshold", THRESHOLD),
+                       state.get("min_samples", MIN_SAMPLES))
+        detector.observations = state.get("observations", 0)
+        detector.reference = RunningStats.from_state(state.get("reference") or {})
+        detector.cumulative = state.get("cumulative", 0.0)
+        detector.minimum = state.get("minimum", 0.0)
+        detector.changes = state.get("changes", 0)
+        detector.last_change = state.get("last_change")
+        detector.previous_mean = state.get("previous_mean")
+        return detector
+
+
+def scan(values: Iterable[float], detector: Optional[PageHinkley] = None, **params) -> Dict:
+    """
+    Run a detector over a series in one pass.
+
+    Args:
+        values: Positive values, oldest first
+        detector: Detector to continue (default: a fresh one)
+        **params: PageHinkley parameters for a fresh detector
+
+    Returns:
+        PageHinkley.summary() plus "change_points" (observation indices
+        flagged during this scan)
+    """
+    if detector is None:
+        detector = PageHinkley(**params)
+    change_points = []
+    for value in values:
+        index = detector.observations
+        if detector.update(value):
+            change_points.append(index)
+    result = detector.summary()
+    result["change_points"] = change_points
+    return result
+
+
+def member_daily_series(export: Dict) -> List[Tuple[str, float]]:
+    """
+    Tokens per session by day from a team_aggregator.py export.
+
+    Args:
+        export: Parsed export with daily_activity and daily_model_tokens
+
+    Returns:
+        (date, tokens per session) for days with both, oldest first
+    """
+    sessions = {}
+    for day in export.get("daily_activity") or []:
+        if day.get("date") and day.get("sessionCount"):
+            sessions[day["date"]] = day["sessionCount"]
+
+    series = []
+    for day in export.get("daily_model_tokens") or []:
+        date = day.get("date")
+        if date in sessions:
+            tokens = sum((day.get("tokensByModel") or {}).values())
+            if tokens > 0:
+                series.append((date, tokens / sessions[date]))
+    series.sort()
+    return series
+
+
+def team_change_points(exports: Iterable[Dict], **params) -> List[Dict]:
+    """
+    Detect per-member change points across team exports in one pass.
+
+    Each export's daily tokens/session series is streamed through its
+    own detector; members sharing an email (several exports) share one
+    detector, fed in date order.
+
+    Args:
+        exports: Parsed team_aggregator.py exports
+        **params: PageHinkley parameters
+
+    Returns:
+        One dict per member: user, days, change_dates and the detector
+        summary ("active" while tokens/session stay above the old level)
+    """
+    series_by_member = {}
+    users = {}
+    for export in exports:
+        user = export.get("user") or {}
+        key = user.get("email") or user.get("name") or "unknown"
+        users.setdefault(key, user)
+        series_by_member.setdefault(key, {}).update(member_daily_series(export))
+
+    results = []
+    for key, series in series_by_member.items():
+        detector = PageHinkley(**params)
+        change_dates = [date for date, value in sorted(series.items()) if detector.update(value)]
+        result = detector.summary()
+        result.update({"user": users[key], "days": len(series), "change_dates": change_dates})
+        results.append(result)
+    return results
@@ -0,0 +1,176 @@
+"""
+Compact Storage Codec
+
+Optional binary encoding for snapshots and team exports, which are
+otherwise indented JSON. A binary file is a small header followed by a
+compressed payload:
+
+    b"TKCB" | schema version (1 byte) | encoding (1 byte) | compression (1 byte) | payload
+
+- encoding: "m" MessagePack (msgpack, if installed) or "j" compact JSON
+- compression: "z" zstd (zstandard, if installed), "g" gzip or "n" none
+
+Readers (load/decode) detect the format from the content, so binary,
+gzipped JSON and plain JSON files can sit side by side and be read by
+the same code; a file is only unreadable if it needs an optional package
+that is missing here. Binary files use the ".tkc" suffix; the JSON path
+(indent=2, ".json") stays the default and is chosen per call or with
+TOKEN_CRAFT_FORMAT=binary.
+"""
+
+import gzip
+import importlib.util
+import json
+import os
+from pathlib import Path
+from typing import List, Optional
+
+# Optional dependencies - only checked here, imported on first use
+HAS_MSGPACK = importlib.util.find_spec("msgpack") is not None
+HAS_ZSTD = importlib.util.find_spec("zstandard") is not None
+
+MAGIC = b"TKCB"
+SCHEMA_VERSION = 1
+HEADER_SIZE = len(MAGIC) + 3
+GZIP_MAGIC = b"\x1f\x8b"
+
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+FORMATS = ("json", "binary")
+JSON_SUFFIX = ".json"
+BINARY_SUFFIX = ".tkc"
+
+
+def default_format() -> str:
+    """Storage format from TOKEN_CRAFT_FORMAT ("json" unless set to "binary")."""
+    fmt = os.environ.get("TOKEN_CRAFT_FORMAT", "json").strip().lower()
+    return fmt if fmt in FORMATS else "json"
+
+
+def suffix_for(fmt: str) -> str:
+    """File suffix of a storage format."""
+    return BINARY_SUFFIX if fmt == "binary" else JSON_SUFFIX
+
+
+def format_of(path: Path) -> str:
+    """Storage format implied by a file's suffix."""
+    return "binary" if Path(path).suffix == BINARY_SUFFIX else "json"
+
+
+def glob_any(directory: Path, pattern: str) -> List[Path]:
+    """
+    Glob a "*.json" pattern in both formats.
+
+    Args:
+        directory: Directory to search
+        pattern: Glob pattern ending in ".json"
+
+    Returns:
+        Matching JSON and binary files (unsorted)
+    """
+    directory = Path(directory)
+    stem = pattern[:-len(JSON_SUFFIX)] if pattern.endswith(JSON_SUFFIX) else pattern
+    return list(directory.glob(stem + JSON_SUFFIX)) + list(directory.glob(stem + BINARY_SUFFIX))
+
+
+def encode(data, compression: Optional[str] = None) -> bytes:
+    """
+    Encode JSON-compatible data in the binary format.
+
+    Args:
+        data: Dicts, lists, strings, numbers, booleans and None
+        compression: "zstd", "gzip" or "none" (default: zstd if available, else gzip)
+
+    Returns:
+        Header plus payload
+
+    Raises:
+        ValueError: Unknown compression or zstd requested but not installed
+    """
+    if HAS_MSGPACK:
+        import msgpack
+        encoding, payload = b"m", msgpack.packb(data, use_bin_type=True)
+    else:
+        encoding, payload = b"j", json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+    compression = compression or ("zstd" if HAS_ZSTD else "gzip")
+    if compression == "zstd":
+        if not HAS_ZSTD:
+            raise ValueError("zstd compression requires the zstandard package")
+        import zstandard
+        flag, payload = b"z", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(payload)
+    elif compression == "gzip":
+        # mtime=0 keeps the output deterministic
+        flag, payload = b"g", gzip.compress(payload, compresslevel=GZIP_LEVEL, mtime=0)
+    elif compression == "none":
+        flag = b"n"
+    else:
+        raise ValueError(f"Unknown compression {compression!r}; expected zstd, gzip or none")
+
+    return MAGIC + bytes([SCHEMA_VERSION]) + encoding + flag + payload
+
+
+def decode(blob: bytes):
+    """
+    Decode binary, gzipped JSON or plain JSON content.
+
+    Raises:
+        ValueError: Unsupported schema version, unknown flags, a missing
+            optional package, or invalid JSON
+    """
+    if not blob.startswith(MAGIC):
+        if blob.startswith(GZIP_MAGIC):
+            blob = gzip.decompress(blob)
+        return json.loads(blob.decode("utf-8-sig"))
+
+    if len(blob) < HEADER_SIZE:
+        raise ValueError("Truncated header")
+    version = blob[len(MAGIC)]
+    encoding = blob[len(MAGIC) + 1:len(MAGIC) + 2]
+    flag = blob[len(MAGIC) + 2:HEADER_SIZE]
+    payload = blob[HEADER_SIZE:]
+
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Schema version {version} is newer than supported ({SCHEMA_VERSION})")
+
+    if flag == b"z":
+        if not HAS_ZSTD:
+            raise ValueError("File is zstd-compressed; install the zstandard package to read it")
+        import zstandard
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif flag == b"g":
+        payload = gzip.decompress(payload)
+    elif flag != b"n":
+        raise ValueError(f"Unknown compression flag {flag!r}")
+
+    if encoding == b"m":
+        if not HAS_MSGPACK:
+            raise ValueError("File is MessagePack-encoded; install the msgpack package to read it")
+        import msgpack
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    if encoding == b"j":
+        return json.loads(payload.decode("utf-8"))
+    raise ValueError(f"Unknown encoding flag {encoding!r}")
+
+
+def dumps(data, fmt: str = "json") -> bytes:
+    """
+    Serialize data for a file of the given format.
+
+    Args:
+        data: JSON-compatible data
+        fmt: "json" (indented, human-readable) or "binary"
+
+    Returns:
+        File contents
+    """
+    if fmt == "binary":
+        return encode(data)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def load(path: Path):
+    """Read a JSON or binary file (format detected from content)."""
+    with open(path, "rb") as f:
+        return decode(f.read())
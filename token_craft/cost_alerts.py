@@ -9,6 +9,8 @@ from datetime import datetime, date
 from pathlib import Path
 import json
 
+from . import codec
+
 
 class CostAlerts:
     """Manage cost tracking and budget alerts."""
@@ -100,16 +102,15 @@ class CostAlerts:
         session_count = 0
 
         if snapshot_dir.exists():
-            for snapshot_file in snapshot_dir.glob(f"snapshot_{today_str}_*.json"):
+            for snapshot_file in codec.glob_any(snapshot_dir, f"snapshot_{today_str}_*.json"):
                 try:
-                    with open(snapshot_file, 'r', encoding='utf-8') as f:
-                        snapshot = json.load(f)
-                        profile = snapshot.get("profile", {})
-                        tokens = profile.get("total_tokens", 0)
-                        cost_info = self.calculate_session_cost(tokens)
-                        daily_cost = cost_info["cost"]
-                        session_count = profile.get("total_sessions", 0)
-                        break  # Use latest snapshot
+                    snapshot = codec.load(snapshot_file)
+                    profile = snapshot.get("profile", {})
+                    tokens = profile.get("total_tokens", 0)
+                    cost_info = self.calculate_session_cost(tokens)
+                    daily_cost = cost_info["cost"]
+                    session_count = profile.get("total_sessions", 0)
+                    break  # Use latest snapshot
                 except Exception:
                     continue
 
@@ -4,34 +4,145 @@ hero.epam.com API Client
 Integrates with EPAM's hero platform for badge issuance.
 """
 
+import importlib.util
 import json
+import queue
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, List
 from datetime import datetime
+from urllib.parse import urlsplit
 
-# Optional import
-try:
-    import requests
-    HAS_REQUESTS = True
-except ImportError:
-    HAS_REQUESTS = False
+# Optional dependency - only checked here, imported on first client creation
+HAS_REQUESTS = importlib.util.find_spec("requests") is not None
+
+
+class HeroAPIError(Exception):
+    """Raised when a hero API request fails after all retries."""
+
+
+class _TransientError(Exception):
+    """One attempt failed in a way worth retrying (connection error, 429, 5xx)."""
+
+
+class _HTTPConnectionPool:
+    """Small keep-alive connection pool used when requests is unavailable."""
+
+    def __init__(self, api_url: str, pool_size: int, timeout: float):
+        import http.client  # Deferred: pulls in email/ssl parsing machinery
+
+        self._client_module = http.client
+        parts = urlsplit(api_url)
+        self.scheme = parts.scheme or "http"
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port
+        self.base_path = parts.path.rstrip("/")
+        self.timeout = timeout
+        self._idle = queue.LifoQueue(maxsize=pool_size)
+
+    def _new_connection(self):
+        if self.scheme == "https":
+            return self._client_module.HTTPSConnection(self.host, self.port, timeout=self.timeout)
+        return self._client_module.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def request(self, method: str, path: str, body: Optional[bytes], headers: Dict) -> tuple:
+        """Send a request on a pooled connection and return (status, body)."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._new_connection()
+
+        try:
+            conn.request(method, self.base_path + path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except Exception:
+            conn.close()
+            raise
+
+        if response.getheader("Connection", "").lower() == "close":
+            conn.close()
+        else:
+            try:
+                self._idle.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+        return response.status, data
+
+    def close(self):
+        """Close all idle connections."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
 
 
 class HeroAPIClient:
     """Client for hero.epam.com API."""
 
-    def __init__(self, api_url: str = None, api_key: str = None):
+    # Map ranks to badge IDs
+    RANK_BADGES = {
+        "Cadet": "token_craft_cadet",
+        "Pilot": "token_craft_pilot",
+        "Navigator": "token_craft_navigator",
+        "Commander": "token_craft_commander",
+        "Captain": "token_craft_captain",
+        "Admiral": "token_craft_admiral",
+        "Galactic Legend": "token_craft_legend"
+    }
+
+    # Bulk endpoint tuning
+    DEFAULT_BATCH_SIZE = 100
+    RETRYABLE_STATUS = {408, 425, 429, 500, 502, 503, 504}
+
+    def __init__(
+        self,
+        api_url: str = None,
+        api_key: str = None,
+        pool_size: int = 10,
+        max_workers: int = 4,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        timeout: float = 10.0,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
         """
         Initialize hero API client.
 
         Args:
             api_url: API base URL (default: https://hero.epam.com/api)
             api_key: API authentication key
+            pool_size: Max keep-alive connections kept open to the API
+            max_workers: Max bulk requests in flight at once
+            max_retries: Retries per bulk request on transient failures
+            backoff_base: First retry delay in seconds (doubles each retry)
+            timeout: Per-request timeout in seconds
+            batch_size: Badge operations sent per bulk request
         """
         self.api_url = api_url or "https://hero.epam.com/api"
         self.api_key = api_key
+        self.pool_size = max(1, pool_size)
+        self.max_workers = max(1, min(max_workers, self.pool_size))
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.batch_size = max(1, batch_size)
+        self._pool = None
 
         if HAS_REQUESTS:
+            import requests
+
             self.session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(
+                pool_connections=self.pool_size,
+                pool_maxsize=self.pool_size
+            )
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
             if self.api_key:
                 self.session.headers.update({
                     "Authorization": f"Bearer {self.api_key}",
@@ -197,28 +308,8 @@ class HeroAPIClient:
         Returns:
             Certification data
         """
-        certification_levels = {
-            "Navigator": "foundation",
-            "Commander": "foundation",
-            "Captain": "professional",
-            "Admiral": "professional",
-            "Galactic Legend": "master"
-        }
-
-        cert_level = certification_levels.get(rank, "foundation")
-
-        certification = {
-            "user_email": user_email,
-            "certification_id": f"token_craft_{cert_level}_{user_email}",
-            "level": cert_level,
-            "title": f"Token-Craft {cert_level.title()} Certification",
-            "issued_date": datetime.now().isoformat(),
-            "valid_until": self._calculate_expiry(rank),
-            "rank_achieved": rank,
-            "score": score,
-            "evidence": metrics,
-            "issuer": "EPAM Token-Craft System"
-        }
+        certification = self._build_certification(user_email, rank, score, metrics)
+        cert_level = certification["level"]
 
         try:
             if not HAS_REQUESTS or not self.session:
@@ -249,6 +340,33 @@ class HeroAPIClient:
                 "error": str(e)
             }
 
+    def _build_certification(self, user_email: str, rank: str, score: int, metrics: Dict) -> Dict:
+        """Build the certification payload for a rank."""
+        certification_levels = {
+            "Navigator": "foundation",
+            "Commander": "foundation",
+            "Captain": "professional",
+            "Admiral": "professional",
+            "Galactic Legend": "master"
+        }
+
+        cert_level = certification_levels.get(rank, "foundation")
+
+        certification = {
+            "user_email": user_email,
+            "certification_id": f"token_craft_{cert_level}_{user_email}",
+            "level": cert_level,
+            "title": f"Token-Craft {cert_level.title()} Certification",
+            "issued_date": datetime.now().isoformat(),
+            "valid_until": self._calculate_expiry(rank),
+            "rank_achieved": rank,
+            "score": score,
+            "evidence": metrics,
+            "issuer": "EPAM Token-Craft System"
+        }
+
+        return certification
+
     def _calculate_expiry(self, rank: str) -> str:
         """Calculate certification expiry date based on rank."""
         from datetime import timedelta
@@ -271,6 +389,41 @@ class HeroAPIClient:
         expiry_date = datetime.now() + timedelta(days=months * 30)
         return expiry_date.isoformat()
 
+    def plan_rank_sync(self, user_email: str, current_rank: str, previous_rank: str = None) -> List[Dict]:
+        """
+        Build the badge operations needed to reflect a rank change.
+
+        Args:
+            user_email: User's email
+            current_rank: Current rank
+            previous_rank: Previous rank (if changed)
+
+        Returns:
+            List of operations ({"op": "issue"|"revoke", ...})
+        """
+        operations = []
+
+        current_badge = self.RANK_BADGES.get(current_rank)
+        if current_badge:
+            operations.append({
+                "op": "issue",
+                "user_email": user_email,
+                "badge_id": current_badge,
+                "evidence": {"rank": current_rank, "timestamp": datetime.now().isoformat()}
+            })
+
+        if previous_rank and previous_rank != current_rank:
+            previous_badge = self.RANK_BADGES.get(previous_rank)
+            if previous_badge:
+                operations.append({
+                    "op": "revoke",
+                    "user_email": user_email,
+                    "badge_id": previous_badge,
+                    "reason": f"Rank changed from {previous_rank} to {current_rank}"
+                })
+
+        return operations
+
     def sync_badges_with_rank(self, user_email: str, current_rank: str, previous_rank: str = None) -> Dict:
         """
         Sync badges based on rank changes.
@@ -289,42 +442,198 @@ class HeroAPIClient:
             "certifications_updated": []
         }
 
-        # Map ranks to badge IDs
-        rank_badges = {
-            "Cadet": "token_craft_cadet",
-            "Pilot": "token_craft_pilot",
-            "Navigator": "token_craft_navigator",
-            "Commander": "token_craft_commander",
-            "Captain": "token_craft_captain",
-            "Admiral": "token_craft_admiral",
-            "Galactic Legend": "token_craft_legend"
+        for operation in self.plan_rank_sync(user_email, current_rank, previous_rank):
+            if operation["op"] == "issue":
+                issue_result = self.issue_badge(user_email, operation["badge_id"], operation["evidence"])
+                if issue_result.get("success"):
+                    result["badges_issued"].append(operation["badge_id"])
+            else:
+                revoke_result = self.revoke_badge(user_email, operation["badge_id"], operation["reason"])
+                if revoke_result.get("success"):
+                    result["badges_revoked"].append(operation["badge_id"])
+
+        return result
+
+    def sync_team_badges(self, users: List[Dict]) -> Dict:
+        """
+        Sync badges for many users through the bulk endpoint.
+
+        Args:
+            users: List of {"user_email", "current_rank", "previous_rank"} dicts
+
+        Returns:
+            Bulk submission summary (see submit_badge_operations)
+        """
+        operations = []
+        for user in users:
+            operations.extend(self.plan_rank_sync(
+                user["user_email"],
+                user["current_rank"],
+                user.get("previous_rank")
+            ))
+
+        return self.submit_badge_operations(operations)
+
+    def submit_badge_operations(self, operations: List[Dict], batch_size: Optional[int] = None) -> Dict:
+        """
+        Send badge operations to the bulk endpoint in batches.
+
+        Batches are sent concurrently (bounded by max_workers). Each batch
+        gets a fresh random idempotency key that its retries reuse, so a
+        retried batch is applied at most once by the server, while a later
+        submission of the same operations is applied again.
+
+        Args:
+            operations: Badge operations from plan_rank_sync() or similar
+            batch_size: Operations per request (default: self.batch_size)
+
+        Returns:
+            Dict with submitted/succeeded/failed counts and per-op results
+        """
+        batch_size = max(1, batch_size or self.batch_size)
+        batches = [operations[i:i + batch_size] for i in range(0, len(operations), batch_size)]
+
+        summary = {
+            "submitted": len(operations),
+            "succeeded": 0,
+            "failed": 0,
+            "batches": len(batches),
+            "results": [],
+            "errors": []
         }
 
-        current_badge = rank_badges.get(current_rank)
+        if not batches:
+            return summary
 
-        # Issue new badge
-        if current_badge:
-            issue_result = self.issue_badge(
-                user_email,
-                current_badge,
-                {"rank": current_rank, "timestamp": datetime.now().isoformat()}
-            )
-            if issue_result.get("success"):
-                result["badges_issued"].append(current_badge)
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as executor:
+            outcomes = list(executor.map(self._send_batch_safely, batches))
 
-        # Revoke old badge if rank changed
-        if previous_rank and previous_rank != current_rank:
-            previous_badge = rank_badges.get(previous_rank)
-            if previous_badge:
-                revoke_result = self.revoke_badge(
-                    user_email,
-                    previous_badge,
-                    f"Rank changed from {previous_rank} to {current_rank}"
+        for batch, outcome in zip(batches, outcomes):
+            if "error" in outcome:
+                summary["failed"] += len(batch)
+                summary["errors"].append(outcome["error"])
+                summary["results"].extend(
+                    {"success": False, "badge_id": op.get("badge_id"), "user_email": op.get("user_email")}
+                    for op in batch
                 )
-                if revoke_result.get("success"):
-                    result["badges_revoked"].append(previous_badge)
+                continue
 
-        return result
+            for op_result in outcome.get("results", []):
+                summary["results"].append(op_result)
+                if op_result.get("success"):
+                    summary["succeeded"] += 1
+                else:
+                    summary["failed"] += 1
+
+        return summary
+
+    def _send_batch_safely(self, batch: List[Dict]) -> Dict:
+        """Send one batch, converting failures into an error entry."""
+        try:
+            return self._send_batch(batch)
+        except Exception as e:
+            return {"error": str(e)}
+
+    def _send_batch(self, batch: List[Dict]) -> Dict:
+        """POST one batch of operations to the bulk endpoint."""
+        return self._request_with_retry(
+            "POST",
+            "/badges/bulk",
+            {"operations": batch},
+            idempotency_key=self.new_idempotency_key()
+        )
+
+    @staticmethod
+    def new_idempotency_key() -> str:
+        """Random key for one logical submission (shared by its retries only)."""
+        return uuid.uuid4().hex
+
+    def _request_with_retry(
+        self,
+        method: str,
+        path: str,
+        payload: Optional[Dict] = None,
+        idempotency_key: Optional[str] = None
+    ) -> Dict:
+        """
+        Send a JSON request, retrying transient failures with exponential backoff.
+
+        Every attempt carries the same idempotency_key, so the server can
+        tell a retry from a new submission.
+
+        Raises:
+            HeroAPIError: If the request still fails after max_retries
+        """
+        body, headers = self._prepare(payload, idempotency_key)
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay(attempt))
+            try:
+                return self._attempt(method, path, body, headers)
+            except _TransientError as e:
+                last_error = str(e)
+
+        raise HeroAPIError(f"{method} {path} failed after {self.max_retries + 1} attempts ({last_error})")
+
+    def _prepare(self, payload: Optional[Dict], idempotency_key: Optional[str] = None) -> tuple:
+        """Encode a request body and build its headers."""
+        headers = {"Content-Type": "application/json", "Accept": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        if idempotency_key:
+            headers["Idempotency-Key"] = idempotency_key
+
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        return body, headers
+
+    def retry_delay(self, attempt: int) -> float:
+        """Backoff before retry number attempt (1-based), with jitter."""
+        delay = self.backoff_base * (2 ** (attempt - 1))
+        return delay + random.uniform(0, delay / 2)
+
+    def _attempt(self, method: str, path: str, body: Optional[bytes], headers: Dict) -> Dict:
+        """
+        Send one attempt of a request.
+
+        Raises:
+            _TransientError: On a connection error or retryable status
+            HeroAPIError: On any other error status
+        """
+        import http.client
+
+        try:
+            status, data = self._http(method, path, body, headers)
+        except (OSError, http.client.HTTPException) as e:
+            raise _TransientError(f"{type(e).__name__}: {e}") from e
+
+        if status in self.RETRYABLE_STATUS:
+            raise _TransientError(f"HTTP {status}")
+        if status >= 400:
+            raise HeroAPIError(f"HTTP {status}: {data[:200].decode('utf-8', 'replace')}")
+
+        return json.loads(data) if data else {}
+
+    def _http(self, method: str, path: str, body: Optional[bytes], headers: Dict) -> tuple:
+        """Perform one HTTP round trip and return (status, body bytes)."""
+        if self.session:
+            response = self.session.request(
+                method, self.api_url.rstrip("/") + path,
+                data=body, headers=headers, timeout=self.timeout
+            )
+            return response.status_code, response.content
+
+        if self._pool is None:
+            self._pool = _HTTPConnectionPool(self.api_url, self.pool_size, self.timeout)
+        return self._pool.request(method, path, body, headers)
+
+    def close(self):
+        """Release pooled connections."""
+        if self.session:
+            self.session.close()
+        if self._pool:
+            self._pool.close()
 
 
 class MockHeroClient(HeroAPIClient):
@@ -360,3 +669,21 @@ class MockHeroClient(HeroAPIClient):
     def get_user_badges(self, user_email: str) -> List[Dict]:
         """Get mock badges."""
         return self.badges.get(user_email, [])
+
+    def _send_batch(self, batch: List[Dict]) -> Dict:
+        """Apply a bulk batch in memory instead of calling the API."""
+        results = []
+        for operation in batch:
+            user_email = operation["user_email"]
+            badge_id = operation["badge_id"]
+
+            if operation["op"] == "issue":
+                self.issue_badge(user_email, badge_id, operation.get("evidence", {}))
+            elif operation["op"] == "revoke":
+                self.badges[user_email] = [
+                    b for b in self.badges.get(user_email, []) if b["badge_id"] != badge_id
+                ]
+
+            results.append({"success": True, "op": operation["op"], "badge_id": badge_id, "user_email": user_email})
+
+        return {"results": results}
@@ -0,0 +1,318 @@
+"""
+Async hero.epam.com API Client
+
+Asyncio variant of HeroAPIClient for team-wide badge syncs. Reads of a
+user's current badges overlap with issue/revoke writes for other users,
+bounded by a concurrency limit and a token-bucket rate limiter, so a
+team sync takes time proportional to the rate limit rather than the sum
+of request latencies.
+
+HTTP round trips reuse HeroAPIClient's pooled transport on executor
+threads, so no async HTTP dependency is required. Retries are driven
+here rather than in the transport, so each attempt takes a rate-limiter
+permit. A user whose badges cannot be read is reported as an error by
+sync_many() instead of being synced as holding none.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional
+from urllib.parse import quote
+
+from .hero_api_client import HeroAPIClient, HeroAPIError, _TransientError
+
+
+class TokenBucket:
+    """Async token-bucket rate limiter."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        """
+        Initialize rate limiter.
+
+        Args:
+            rate: Tokens added per second (requests per second)
+            capacity: Max burst size (default: one second of tokens)
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = None
+        self._loop = None  # Event loop _lock belongs to
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    async def acquire(self):
+        """Wait until a token is available and take it."""
+        # asyncio primitives bind to one loop; each asyncio.run() gets a new one
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock, self._loop = asyncio.Lock(), loop
+
+        async with self._lock:
+            self._refill()
+            while self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= 1
+
+
+class AsyncHeroAPIClient:
+    """Asyncio client for hero.epam.com API with the same surface as HeroAPIClient."""
+
+    RANK_BADGES = HeroAPIClient.RANK_BADGES
+
+    def __init__(
+        self,
+        api_url: str = None,
+        api_key: str = None,
+        concurrency: int = 10,
+        rate_limit: float = 50.0,
+        burst: Optional[float] = None,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        timeout: float = 10.0,
+    ):
+        """
+        Initialize async hero API client.
+
+        Args:
+            api_url: API base URL (default: https://hero.epam.com/api)
+            api_key: API authentication key
+            concurrency: Max requests in flight at once
+            rate_limit: Max requests per second
+            burst: Max burst above the steady rate (default: rate_limit)
+            max_retries: Retries per request on transient failures
+            backoff_base: First retry delay in seconds (doubles each retry)
+            timeout: Per-request timeout in seconds
+        """
+        self.concurrency = max(1, concurrency)
+        self.transport = HeroAPIClient(
+            api_url=api_url,
+            api_key=api_key,
+            pool_size=self.concurrency,
+            max_workers=self.concurrency,
+            max_retries=max_retries,
+            backoff_base=backoff_base,
+            timeout=timeout,
+        )
+        self.api_url = self.transport.api_url
+        self.rate_limiter = TokenBucket(rate_limit, burst)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency)
+        self._semaphore = None
+        self._loop = None  # Event loop _semaphore belongs to
+
+    async def _request(self, method: str, path: str, payload: Optional[Dict] = None) -> Dict:
+        """
+        Send one request, retrying transient failures with backoff.
+
+        Every attempt, retries included, takes its own rate-limiter permit
+        and concurrency slot, so retries against a struggling server stay
+        within rate_limit.
+
+        Raises:
+            HeroAPIError: If the request still fails after max_retries
+        """
+        # Per loop, so a client can be reused across asyncio.run() calls
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphore, self._loop = asyncio.Semaphore(self.concurrency), loop
+
+        transport = self.transport
+        body, headers = transport._prepare(payload)
+        last_error = None
+
+        for attempt in range(transport.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(transport.retry_delay(attempt))
+
+            await self.rate_limiter.acquire()
+            async with self._semaphore:
+                try:
+                    return await loop.run_in_executor(
+                        self._executor, transport._attempt, method, path, body, headers
+                    )
+                except _TransientError as e:
+                    last_error = str(e)
+
+        raise HeroAPIError(f"{method} {path} failed after {transport.max_retries + 1} attempts ({last_error})")
+
+    async def issue_badge(self, user_email: str, badge_id: str, evidence: Dict) -> Dict:
+        """Issue badge to user (see HeroAPIClient.issue_badge)."""
+        payload = {
+            "user_email": user_email,
+            "badge_id": badge_id,
+            "issued_date": datetime.now().isoformat(),
+            "evidence": evidence,
+            "issuer": "token-craft-system",
+            "auto_issued": True
+        }
+
+        try:
+            return await self._request("POST", "/badges/issue", payload)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def revoke_badge(self, user_email: str, badge_id: str, reason: str = None) -> Dict:
+        """Revoke badge from user (see HeroAPIClient.revoke_badge)."""
+        payload = {
+            "user_email": user_email,
+            "badge_id": badge_id,
+            "revoked_date": datetime.now().isoformat(),
+            "reason": reason or "Rank dropped below threshold",
+            "revoked_by": "token-craft-system"
+        }
+
+        try:
+            return await self._request("POST", "/badges/revoke", payload)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+    async def get_user_badges(self, user_email: str) -> List[Dict]:
+        """
+        Get all badges for a user.
+
+        Raises:
+            HeroAPIError: If the badges cannot be read
+        """
+        response = await self._request("GET", f"/users/{quote(user_email, safe='')}/badges")
+
+        if isinstance(response, list):
+            return response
+        return response.get("badges", [])
+
+    async def create_certification(self, user_email: str, rank: str, score: int, metrics: Dict) -> Dict:
+        """Create certification for user (see HeroAPIClient.create_certification)."""
+        certification = self.transport._build_certification(user_email, rank, score, metrics)
+
+        try:
+            response = await self._request("POST", "/certifications/issue", certification)
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+
+        response.setdefault("certification", certification)
+        return response
+
+    async def sync_badges_with_rank(self, user_email: str, current_rank: str, previous_rank: str = None) -> Dict:
+        """
+        Sync one user's badges with their rank.
+
+        Reads the user's active badges first, then issues the current rank
+        badge if missing and revokes any other rank badge still held. The
+        previous rank's badge is revoked even when the read does not list
+        it, as in HeroAPIClient.plan_rank_sync(). Writes for the same user
+        run concurrently.
+
+        Args:
+            user_email: User's email
+            current_rank: Current rank
+            previous_rank: Previous rank (if changed)
+
+        Returns:
+            Sync result; writes that failed are listed under "errors"
+
+        Raises:
+            HeroAPIError: If the user's badges cannot be read
+        """
+        result = {
+            "user_email": user_email,
+            "badges_issued": [],
+            "badges_revoked": [],
+            "certifications_updated": [],
+            "errors": []
+        }
+
+        held = {
+            b.get("badge_id")
+            for b in await self.get_user_badges(user_email)
+            if b.get("status", "active") == "active"
+        }
+        rank_badge_ids = set(self.RANK_BADGES.values())
+        current_badge = self.RANK_BADGES.get(current_rank)
+
+        writes = []
+        if current_badge and current_badge not in held:
+            writes.append(("issue", current_badge, self.issue_badge(
+                user_email,
+                current_badge,
+                {"rank": current_rank, "timestamp": datetime.now().isoformat()}
+            )))
+
+        stale = held & rank_badge_ids
+        reason = None
+        if previous_rank and previous_rank != current_rank:
+            reason = f"Rank changed from {previous_rank} to {current_rank}"
+            if self.RANK_BADGES.get(previous_rank):
+                stale.add(self.RANK_BADGES[previous_rank])
+
+        for badge_id in sorted(stale - {current_badge}):
+            writes.append(("revoke", badge_id, self.revoke_badge(user_email, badge_id, reason)))
+
+        responses = await asyncio.gather(*(coro for _, _, coro in writes))
+
+        for (op, badge_id, _), response in zip(writes, responses):
+            if response.get("success"):
+                key = "badges_issued" if op == "issue" else "badges_revoked"
+                result[key].append(badge_id)
+            else:
+                result["errors"].append({"op": op, "badge_id": badge_id, "error": response.get("error")})
+
+        return result
+
+    async def sync_many(self, users: List[Dict]) -> Dict:
+        """
+        Sync badges for many users concurrently.
+
+        Args:
+            users: List of {"user_email", "current_rank", "previous_rank"} dicts
+
+        Returns:
+            Dict with per-user results, errors (failed badge reads and
+            failed writes) and elapsed time
+        """
+        started = time.perf_counter()
+
+        outcomes = await asyncio.gather(
+            *(
+                self.sync_badges_with_rank(u["user_email"], u["current_rank"], u.get("previous_rank"))
+                for u in users
+            ),
+            return_exceptions=True
+        )
+
+        results = []
+        errors = []
+        for user, outcome in zip(users, outcomes):
+            if isinstance(outcome, Exception):
+                errors.append({"user_email": user["user_email"], "error": str(outcome)})
+            else:
+                results.append(outcome)
+                errors.extend(dict(error, user_email=user["user_email"]) for error in outcome["errors"])
+
+        return {
+            "users": len(users),
+            "results": results,
+            "errors": errors,
+            "badges_issued": sum(len(r["badges_issued"]) for r in results),
+            "badges_revoked": sum(len(r["badges_revoked"]) for r in results),
+            "elapsed_sec": round(time.perf_counter() - started, 3),
+        }
+
+    def close(self):
+        """Release worker threads and pooled connections."""
+        self._executor.shutdown(wait=True)
+        self.transport.close()
+
+
+def sync_many(users: List[Dict], **client_kwargs) -> Dict:
+    """Run AsyncHeroAPIClient.sync_many() from synchronous code."""
+    client = AsyncHeroAPIClient(**client_kwargs)
+    try:
+        return asyncio.run(client.sync_many(users))
+    finally:
+        client.close()
@@ -0,0 +1,270 @@
+"""
+Local hero API Stand-in Server
+
+Minimal in-process HTTP server that speaks the hero.epam.com badge API,
+used by tests and benchmarks to exercise HeroAPIClient end to end offline.
+
+Endpoints:
+- POST /api/badges/bulk            Apply a batch of issue/revoke operations
+- POST /api/badges/issue           Issue a single badge
+- POST /api/badges/revoke          Revoke a single badge
+- POST /api/certifications/issue   Record a certification
+- GET  /api/users/<email>/badges   List a user's active badges
+
+Usage:
+    python -m token_craft.hero_stub_server --users 1000
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import unquote
+
+# How long a bulk response is replayed for a repeated Idempotency-Key
+IDEMPOTENCY_TTL_SEC = 24 * 3600
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    """Request handler backed by the owning HeroStubServer state."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        """Silence per-request logging."""
+
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length)) if length else {}
+
+    def do_GET(self):
+        stub = self.server.stub
+        stub._before_request()
+
+        parts = self.path.strip("/").split("/")
+        if len(parts) == 4 and parts[0] == "api" and parts[1] == "users" and parts[3] == "badges":
+            self._send_json(200, {"badges": stub.get_badges(unquote(parts[2]))})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        stub = self.server.stub
+        payload = self._read_json()
+
+        if stub._should_fail():
+            self._send_json(503, {"error": "temporarily unavailable"})
+            return
+        stub._before_request()
+
+        if self.path == "/api/badges/bulk":
+            key = self.headers.get("Idempotency-Key")
+            self._send_json(200, stub.apply_bulk(payload.get("operations", []), key))
+        elif self.path == "/api/badges/issue":
+            self._send_json(200, stub.apply_operation(dict(payload, op="issue")))
+        elif self.path == "/api/badges/revoke":
+            self._send_json(200, stub.apply_operation(dict(payload, op="revoke")))
+        elif self.path == "/api/certifications/issue":
+            self._send_json(200, stub.add_certification(payload))
+        else:
+            self._send_json(404, {"error": "not found"})
+
+
+class HeroStubServer:
+    """In-memory stand-in for the hero badge API."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, fail_first: int = 0,
+                 idempotency_ttl: float = IDEMPOTENCY_TTL_SEC):
+        """
+        Initialize stand-in server (not started yet).
+
+        Args:
+            host: Interface to bind
+            port: Port to bind (0 = pick a free port)
+            latency: Artificial delay per request in seconds
+            fail_first: Number of initial POSTs answered with HTTP 503
+            idempotency_ttl: Seconds a bulk response is replayed for its key
+        """
+        self.idempotency_ttl = idempotency_ttl
+        self.latency = latency
+        self.badges = {}  # user_email -> {badge_id: badge}
+        self.certifications = {}  # user_email -> [certs]
+        self.request_count = 0
+        self.failed_count = 0
+        self.replayed_count = 0
+        self._fail_remaining = fail_first
+        self._idempotency_cache = {}  # key -> (expires_at, response)
+        self._lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer((host, port), _StubRequestHandler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """Base API URL to pass to HeroAPIClient."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api"
+
+    def start(self) -> "HeroStubServer":
+        """Serve requests on a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Shut the server down."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            if self._fail_remaining > 0:
+                self._fail_remaining -= 1
+                self.failed_count += 1
+                return True
+        return False
+
+    def _before_request(self):
+        with self._lock:
+            self.request_count += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def apply_operation(self, operation: Dict) -> Dict:
+        """Apply one issue/revoke operation to the in-memory store."""
+        user_email = operation.get("user_email")
+        badge_id = operation.get("badge_id")
+
+        if not user_email or not badge_id or operation.get("op") not in ("issue", "revoke"):
+            return {"success": False, "error": "invalid operation", "badge_id": badge_id, "user_email": user_email}
+
+        with self._lock:
+            user_badges = self.badges.setdefault(user_email, {})
+            if operation["op"] == "issue":
+                user_badges[badge_id] = {
+                    "badge_id": badge_id,
+                    "issued_date": operation.get("issued_date"),
+                    "status": "active"
+                }
+            else:
+                user_badges.pop(badge_id, None)
+
+        return {"success": True, "op": operation["op"], "badge_id": badge_id, "user_email": user_email}
+
+    def apply_bulk(self, operations: List[Dict], idempotency_key: Optional[str] = None) -> Dict:
+        """Apply a batch, replaying the stored response for a key repeated within the TTL."""
+        if idempotency_key:
+            now = time.monotonic()
+            with self._lock:
+                expired = [key for key, (expires_at, _) in self._idempotency_cache.items() if expires_at <= now]
+                for key in expired:
+                    del self._idempotency_cache[key]
+                cached = self._idempotency_cache.get(idempotency_key)
+                if cached is not None:
+                    self.replayed_count += 1
+                    return cached[1]
+
+        response = {"results": [self.apply_operation(op) for op in operations]}
+
+        if idempotency_key:
+            with self._lock:
+                self._idempotency_cache[idempotency_key] = (time.monotonic() + self.idempotency_ttl, response)
+
+        return response
+
+    def add_certification(self, certification: Dict) -> Dict:
+        """Record a certification for a user."""
+        user_email = certification.get("user_email")
+        if not user_email:
+            return {"success": False, "error": "missing user_email"}
+
+        with self._lock:
+            self.certifications.setdefault(user_email, []).append(certification)
+
+        return {"success": True, "certification": certification}
+
+    def get_badges(self, user_email: str) -> List[Dict]:
+        """List a user's active badges."""
+        with self._lock:
+            return list(self.badges.get(user_email, {}).values())
+
+
+def run_benchmark(users: int = 1000, batch_size: int = 100, workers: int = 4, latency: float = 0.005) -> Dict:
+    """
+    Benchmark a team-wide badge sync against the stand-in server.
+
+    Args:
+        users: Number of users to sync (each gets an issue + revoke)
+        batch_size: Operations per bulk request
+        workers: Concurrent bulk requests
+        latency: Simulated server latency per request in seconds
+
+    Returns:
+        Benchmark summary dict
+    """
+    from .hero_api_client import HeroAPIClient
+
+    ranks = list(HeroAPIClient.RANK_BADGES.keys())
+    team = [
+        {
+            "user_email": f"user{i:05d}@example.com",
+            "current_rank": ranks[(i + 1) % len(ranks)],
+            "previous_rank": ranks[i % len(ranks)],
+        }
+        for i in range(users)
+    ]
+
+    with HeroStubServer(latency=latency) as server:
+        client = HeroAPIClient(api_url=server.url, pool_size=workers, max_workers=workers, batch_size=batch_size)
+        started = time.perf_counter()
+        summary = client.sync_team_badges(team)
+        elapsed = time.perf_counter() - started
+        client.close()
+        round_trips = server.request_count
+
+    return {
+        "users": users,
+        "operations": summary["submitted"],
+        "succeeded": summary["succeeded"],
+        "failed": summary["failed"],
+        "round_trips": round_trips,
+        "elapsed_sec": round(elapsed, 3),
+        "ops_per_sec": round(summary["submitted"] / elapsed, 1) if elapsed > 0 else 0,
+    }
+
+
+def main():
+    """Command-line entry point for the offline badge sync benchmark."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark bulk badge sync against a local stand-in server")
+    parser.add_argument("--users", type=int, default=1000, help="Number of users to sync")
+    parser.add_argument("--batch-size", type=int, default=100, help="Operations per bulk request")
+    parser.add_argument("--workers", type=int, default=4, help="Concurrent bulk requests")
+    parser.add_argument("--latency", type=float, default=0.005, help="Simulated latency per request (seconds)")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.users, args.batch_size, args.workers, args.latency)
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
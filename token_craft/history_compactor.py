@@ -0,0 +1,295 @@
+"""
+History Compactor
+
+Derives a slimmed copy of history.jsonl that holds only what scoring and
+analysis read, so repeated runs parse a fraction of the bytes:
+
+- sessionId, project, timestamp, role and tokens are kept as they are
+- display, message and text content longer than KEEP_TEXT_CHARS become a
+  records.TextDigest (length, keyword bitmasks over categories.KEYWORDS,
+  short hash), which answers the len() and keyword checks analysis makes
+- tool-use content becomes [name, file_path, command] summaries
+
+Lines are JSON objects with one-letter keys (see compact_entry). The
+compact file covers the whole logical history, rotated segments first
+(see history_segments). A state file records how far into the live
+history.jsonl it has read (byte offset plus file identity), so sync()
+compacts only appended lines; a replaced or truncated history (rotation)
+or a changed keyword list triggers a rebuild. The compact file's
+committed size is recorded as well, so lines left by an interrupted sync
+are dropped rather than duplicated.
+
+Compaction is opt-in: history_reader() returns the compactor once a
+compact file exists (team_aggregator.py compact), else the raw reader.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .categories import KEYWORDS
+from .history_segments import SegmentedHistory
+from .persistence import FileLock, atomic_write_json, atomic_write_text
+from .records import Message, TextDigest, ToolUse, parse_history_lines
+
+STATE_VERSION = 1
+
+# Texts up to this length are stored as they are (a digest is no smaller)
+KEEP_TEXT_CHARS = 64
+
+COMPACT_NAME = "history.compact.jsonl"
+STATE_NAME = "history.compact.state.json"
+
+# Identifies the keyword list the stored bitmasks refer to
+VOCABULARY = hashlib.blake2b("\n".join(KEYWORDS).encode("utf-8"), digest_size=8).hexdigest()
+
+
+def _compact_text(text):
+    if not isinstance(text, str):
+        text = str(text)
+    if len(text) <= KEEP_TEXT_CHARS:
+        return text
+    return TextDigest.from_text(text).to_list()
+
+
+def _expand_text(value):
+    if isinstance(value, list):
+        return TextDigest.from_list(value)
+    return value
+
+
+def compact_entry(message: Message) -> Dict:
+    """
+    Compact form of a history record.
+
+    Args:
+        message: Parsed history entry
+
+    Returns:
+        Dict with keys s (sessionId), p (project), t (timestamp), r (role),
+        k (tokens), d (display), m (message), c (text content) and
+        u (tool-use summaries); absent fields are left out
+    """
+    entry = {}
+    for key, value in (("s", message.session_id), ("p", message.project), ("t", message.timestamp),
+                       ("r", message.role), ("k", message.tokens)):
+        if value is not None:
+            entry[key] = value
+    for key, text in (("d", message.display), ("m", message.message)):
+        if text is not None:
+            entry[key] = _compact_text(text)
+
+    content = message.content
+    if isinstance(content, list):
+        summaries = []
+        for tool in content:
+            summary = [tool.name, tool.file_path, tool.command]
+            while summary and summary[-1] is None:
+                summary.pop()
+            summaries.append(summary)
+        entry["u"] = summaries
+    elif content is not None:
+        entry["c"] = _compact_text(content)
+    return entry
+
+
+def expand_entry(entry: Dict) -> Message:
+    """Message from a compact_entry() dict (long texts as TextDigest)."""
+    get = entry.get
+    tools = get("u")
+    if tools is not None:
+        content = [ToolUse(*summary) for summary in tools]
+    else:
+        content = _expand_text(get("c"))
+    return Message(get("s"), get("p"), get("t"), _expand_text(get("d")), _expand_text(get("m")),
+                   get("r"), content, get("k"))
+
+
+class HistoryCompactor:
+    """Compact copy of history.jsonl, kept in sync by byte offset."""
+
+    # Same interface as SegmentedHistory for history_reader() callers
+    segments_skipped = 0
+
+    def __init__(self, history_path: Path, compact_dir: Optional[Path] = None):
+        """
+        Initialize compactor (nothing is read or written yet).
+
+        Args:
+            history_path: Live history.jsonl path
+            compact_dir: Where the compact and state files live (default:
+                token-craft/ next to the history file)
+        """
+        self.history_path = Path(history_path)
+        self.compact_dir = Path(compact_dir) if compact_dir else self.history_path.parent / "token-craft"
+        self.compact_path = self.compact_dir / COMPACT_NAME
+        self.state_path = self.compact_dir / STATE_NAME
+
+    def _load_state(self) -> Optional[Dict]:
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+            return None
+        return state
+
+    def exists(self) -> bool:
+        """True once a compact file has been written."""
+        return self.compact_path.is_file() and self._load_state() is not None
+
+    def _save_state(self, file_id: List[int], offset: int, compact_size: int, messages: int):
+        atomic_write_json(self.state_path, {
+            "version": STATE_VERSION,
+            "vocabulary": VOCABULARY,
+            "file_id": file_id,
+            "offset": offset,
+            "compact_size": compact_size,
+            "messages": messages,
+        }, lock=False)
+
+    @staticmethod
+    def _encode(messages) -> List[str]:
+        dumps = json.dumps
+        return [dumps(compact_entry(message), separators=(",", ":")) + "\n" for message in messages]
+
+    def _read_live(self, offset: int):
+        """Complete lines of the live history from offset, and the bytes consumed."""
+        with open(self.history_path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        end = data.rfind(b"\n") + 1
+        return data[:end].splitlines(), end
+
+    def sync(self, rebuild: bool = False) -> int:
+        """
+        Compact history appended since the last sync.
+
+        Args:
+            rebuild: Recompact everything (archived segments and live file)
+
+        Returns:
+            Number of messages added to the compact file
+        """
+        with FileLock(self.compact_path):
+            try:
+                st = self.history_path.stat()
+            except OSError:
+                return 0
+            file_id = [st.st_dev, st.st_ino]
+            state = self._load_state()
+
+            if (rebuild or state is None or not self.compact_path.is_file()
+                    or state.get("vocabulary") != VOCABULARY or state.get("file_id") != file_id
+                    or st.st_size < state.get("offset", 0)):
+                lines = self._encode(SegmentedHistory(self.history_path).messages(archived_only=True))
+                live_lines, offset = self._read_live(0)
+                lines += self._encode(parse_history_lines(live_lines))
+                blob = "".join(lines).encode("utf-8")
+                atomic_write_text(self.compact_path, blob, lock=False)
+                self._save_state(file_id, offset, len(blob), len(lines))
+                return len(lines)
+
+            if st.st_size == state["offset"]:
+                return 0
+
+            live_lines, consumed = self._read_live(state["offset"])
+            lines = self._encode(parse_history_lines(live_lines))
+            with open(self.compact_path, "r+b") as f:
+                # Drop anything an interrupted sync appended past the committed size
+                f.truncate(state["compact_size"])
+                f.seek(state["compact_size"])
+                f.write("".join(lines).encode("utf-8"))
+                compact_size = f.tell()
+            self._save_state(file_id, state["offset"] + consumed, compact_size, state["messages"] + len(lines))
+            return len(lines)
+
+    def messages(self, ts_from: Optional[float] = None, ts_to: Optional[float] = None,
+                 require: Iterable[bytes] = (), sync: bool = True) -> Iterator[Message]:
+        """
+        Stream compacted messages, oldest first.
+
+        ts_from, ts_to and require are accepted for SegmentedHistory
+        compatibility; the compact file is read whole, so callers filter
+        entries themselves.
+
+        Args:
+            ts_from: Ignored
+            ts_to: Ignored
+            require: Ignored
+            sync: Compact newly appended history first
+
+        Yields:
+            Message per entry; long texts are TextDigest instances
+        """
+        if sync:
+            self.sync()
+        with FileLock(self.compact_path, shared=True):
+            state = self._load_state()
+            if state is None:
+                return
+            f = open(self.compact_path, "rb")
+        with f:
+            data = f.read(state["compact_size"])
+
+        yield from self._expand_lines(data)
+
+    def tail(self, position: Optional[List[int]] = None, sync: bool = True) -> Tuple[List[Message], List[int], bool]:
+        """
+        Compacted messages appended since a previous tail() call.
+
+        The compact file only grows between rebuilds, and a rebuild
+        replaces it (new file identity), so a reader holding its position
+        can follow it incrementally.
+
+        Args:
+            position: Position returned by the previous call (None: start)
+            sync: Compact newly appended history first
+
+        Returns:
+            Tuple of (new messages, new position, whether the file was
+            read from the start because it was rebuilt or position is None)
+        """
+        if sync:
+            self.sync()
+        with FileLock(self.compact_path, shared=True):
+            state = self._load_state()
+            if state is None:
+                return [], None, True
+            f = open(self.compact_path, "rb")
+        with f:
+            st = os.fstat(f.fileno())
+            size = state["compact_size"]
+            restart = (position is None or position[:2] != [st.st_dev, st.st_ino]
+                       or position[2] > size)
+            start = 0 if restart else position[2]
+            f.seek(start)
+            data = f.read(size - start)
+        return list(self._expand_lines(data)), [st.st_dev, st.st_ino, size], restart
+
+    @staticmethod
+    def _expand_lines(data: bytes) -> Iterator[Message]:
+        loads = json.loads
+        for line in data.splitlines():
+            try:
+                entry = loads(line)
+            except ValueError:
+                continue
+            if isinstance(entry, dict):
+                yield expand_entry(entry)
+
+
+def history_reader(history_path: Path):
+    """
+    Reader for a history file: its compact copy if one was written, else
+    the raw (possibly segmented) history.
+
+    Both expose exists(), messages(ts_from, ts_to) and segments_skipped.
+    """
+    compactor = HistoryCompactor(history_path)
+    if compactor.exists():
+        return compactor
+    return SegmentedHistory(history_path)
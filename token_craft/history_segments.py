@@ -0,0 +1,265 @@
+"""
+Segmented History Reader
+
+Reads history.jsonl together with its rotated/archived segments
+(history.jsonl.1, history.jsonl.2.gz, history.jsonl.2025-06.zst, ...)
+as one logical stream, oldest segment first and the live file last.
+
+- Compressed segments are decompressed while streaming (gzip from the
+  standard library; .zst needs the optional zstandard package and is
+  skipped with a warning without it).
+- Archived segments do not change once rotated, so their metadata
+  (first/last timestamp, line and message count) is cached in
+  token-craft/history_segments.json, keyed by name and validated by size
+  and mtime. Date-filtered reads skip cached segments that lie entirely
+  outside the range without opening them. The live file is always read.
+
+Segment order: named archives (e.g. dated) in ascending name order, then
+numbered rotations from the highest number (oldest) down, then the live
+file.
+"""
+
+import gzip
+import importlib.util
+import io
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .line_scanner import scan_history
+from .persistence import atomic_write_json
+from .records import Message, parse_history_lines
+
+# Optional dependency - only checked here, imported on first .zst segment
+HAS_ZSTD = importlib.util.find_spec("zstandard") is not None
+
+CACHE_VERSION = 1
+COMPRESSED_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+_ROTATION_NUMBER = re.compile(r"^\d+$")
+
+
+class Segment:
+    """One history file: path, compression and (cached) metadata."""
+
+    __slots__ = ("path", "compression", "live", "meta")
+
+    def __init__(self, path: Path, live: bool = False):
+        self.path = Path(path)
+        self.compression = COMPRESSED_SUFFIXES.get(self.path.suffix)
+        self.live = live
+        self.meta = None  # {"size", "mtime_ns", "lines", "messages", "first_ts", "last_ts"}
+
+    def stat_key(self) -> Optional[List[int]]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return [st.st_size, st.st_mtime_ns]
+
+    def overlaps(self, ts_from: Optional[float], ts_to: Optional[float]) -> bool:
+        """False only if cached metadata proves no entry is in [ts_from, ts_to]."""
+        meta = self.meta
+        if self.live or meta is None or meta.get("first_ts") is None:
+            return True
+        if ts_from is not None and meta["last_ts"] < ts_from:
+            return False
+        if ts_to is not None and meta["first_ts"] > ts_to:
+            return False
+        return True
+
+    def open(self):
+        """Binary line stream of the decompressed contents."""
+        if self.compression == "gzip":
+            return gzip.open(self.path, "rb")
+        if self.compression == "zstd":
+            import zstandard
+            raw = open(self.path, "rb")
+            return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=True))
+        return open(self.path, "rb")
+
+    def __repr__(self):
+        return f"Segment({self.path.name!r}, live={self.live})"
+
+
+def _order_key(name: str, base: str):
+    """Sort key for an archived segment name (oldest first)."""
+    suffix = name[len(base) + 1:]
+    for compressed in COMPRESSED_SUFFIXES:
+        if suffix.endswith(compressed):
+            suffix = suffix[:-len(compressed)]
+            break
+    if _ROTATION_NUMBER.match(suffix):
+        return (1, -int(suffix), name)
+    return (0, 0, suffix)
+
+
+def find_segments(history_path: Path) -> List[Segment]:
+    """
+    List a history file's segments, oldest first.
+
+    Args:
+        history_path: Live history.jsonl path (need not exist)
+
+    Returns:
+        Archived segments followed by the live file (if present)
+    """
+    history_path = Path(history_path)
+    base = history_path.name
+    archived = []
+    if history_path.parent.is_dir():
+        for path in history_path.parent.glob(base + ".*"):
+            if path.is_file() and not path.name.endswith((".tmp", ".lock")):
+                archived.append(path)
+    archived.sort(key=lambda p: _order_key(p.name, base))
+
+    segments = [Segment(path) for path in archived]
+    if history_path.is_file():
+        segments.append(Segment(history_path, live=True))
+    return segments
+
+
+class SegmentedHistory:
+    """history.jsonl plus rotated segments, read as one stream."""
+
+    def __init__(self, history_path: Path, cache_path: Optional[Path] = None, cache: bool = True):
+        """
+        Initialize reader (segments are listed, nothing is read yet).
+
+        Args:
+            history_path: Live history.jsonl path
+            cache_path: Metadata cache (default: token-craft/history_segments.json
+                next to the history file)
+            cache: Set False to neither read nor write the metadata cache
+        """
+        self.history_path = Path(history_path)
+        self.cache_path = Path(cache_path) if cache_path else (
+            self.history_path.parent / "token-craft" / "history_segments.json"
+        )
+        self.use_cache = cache
+        self.segments = find_segments(self.history_path)
+        self.segments_skipped = 0
+        self._cache_dirty = False
+        if cache:
+            self._load_cache()
+
+    def exists(self) -> bool:
+        """True if there is any segment to read."""
+        return bool(self.segments)
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return
+        if not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION:
+            return
+        entries = cached.get("segments") or {}
+        for segment in self.segments:
+            meta = entries.get(segment.path.name)
+            if not segment.live and isinstance(meta, dict) and \
+                    [meta.get("size"), meta.get("mtime_ns")] == segment.stat_key():
+                segment.meta = meta
+
+    def _save_cache(self):
+        if not (self.use_cache and self._cache_dirty):
+            return
+        entries = {s.path.name: s.meta for s in self.segments if s.meta is not None}
+        try:
+            atomic_write_json(self.cache_path, {"version": CACHE_VERSION, "segments": entries}, indent=None)
+            self._cache_dirty = False
+        except OSError as e:
+            print(f"Warning: Could not save history segment cache: {e}")
+
+    def _read(self, segment: Segment, ts_from: Optional[float] = None, ts_to: Optional[float] = None,
+              require: Tuple[bytes, ...] = ()) -> Iterator[Message]:
+        """Stream one segment, recording its metadata if it is archived and unknown."""
+        if segment.compression == "zstd" and not HAS_ZSTD:
+            print(f"Warning: Skipping {segment.path.name}: install the zstandard package to read .zst history")
+            return
+
+        record = not segment.live and segment.meta is None
+        if not record and segment.compression is None and (ts_from is not None or ts_to is not None or require):
+            # Byte-level prefilter on the mapped file (line_scanner)
+            try:
+                yield from scan_history(segment.path, ts_from, ts_to, require)
+            except OSError as e:
+                print(f"Warning: Could not read {segment.path.name}: {e}")
+            return
+
+        stat_key = segment.stat_key() if record else None
+        lines = messages = 0
+        first_ts = last_ts = None
+        orderable = True
+
+        def counted(stream):
+            nonlocal lines
+            for line in stream:
+                lines += 1
+                yield line
+
+        try:
+            with segment.open() as stream:
+                for message in parse_history_lines(counted(stream)):
+                    messages += 1
+                    ts = message.timestamp
+                    if record and orderable:
+                        if isinstance(ts, (int, float)) and not isinstance(ts, bool):
+                            first_ts = ts if first_ts is None else min(first_ts, ts)
+                            last_ts = ts if last_ts is None else max(last_ts, ts)
+                        elif ts is not None:
+                            orderable = False  # Mixed timestamp types: never skip
+                    yield message
+        except (OSError, EOFError, ValueError) as e:
+            print(f"Warning: Could not read {segment.path.name}: {e}")
+            return
+
+        if record and stat_key is not None:
+            segment.meta = {
+                "size": stat_key[0],
+                "mtime_ns": stat_key[1],
+                "lines": lines,
+                "messages": messages,
+                "first_ts": first_ts if orderable else None,
+                "last_ts": last_ts if orderable else None,
+            }
+            self._cache_dirty = True
+
+    def messages(self, ts_from: Optional[float] = None, ts_to: Optional[float] = None,
+                 archived_only: bool = False, require: Iterable[bytes] = ()) -> Iterator[Message]:
+        """
+        Stream messages of all segments, oldest segment first.
+
+        Segments whose cached time range lies outside [ts_from, ts_to] are
+        skipped. In uncompressed segments whose metadata is known, lines
+        outside the range or missing a required key are dropped before
+        decoding (line_scanner); otherwise entries are not filtered, so
+        callers still apply their own per-entry checks.
+
+        Args:
+            ts_from: Earliest timestamp of interest (ms, like history entries)
+            ts_to: Latest timestamp of interest (ms)
+            archived_only: Leave out the live history.jsonl
+            require: Byte strings entries must contain, e.g.
+                line_scanner.PROMPT_KEYS (a hint; may not be applied)
+
+        Yields:
+            Message per valid entry
+        """
+        require = tuple(require)
+        try:
+            for segment in self.segments:
+                if archived_only and segment.live:
+                    continue
+                if not segment.overlaps(ts_from, ts_to):
+                    self.segments_skipped += 1
+                    continue
+                yield from self._read(segment, ts_from, ts_to, require)
+        finally:
+            self._save_cache()
+
+    def metadata(self) -> List[Dict]:
+        """Cached metadata per segment (None where not yet known), oldest first."""
+        return [{"name": s.path.name, "live": s.live, "compression": s.compression, **(s.meta or {})}
+                for s in self.segments]
@@ -9,6 +9,9 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from collections import defaultdict
 
+from . import codec
+from .batch_scorer import TABLE_GLOB, is_results_table, table_records
+
 
 class LeaderboardGenerator:
     """Generate leaderboards from team data."""
@@ -27,18 +30,24 @@ class LeaderboardGenerator:
         """
         Load all team member statistics.
 
+        Per-user exports and the newest batch_scorer results table are
+        both read; each table row counts as one member.
+
         Returns:
             List of team member stats
         """
         team_stats = []
 
-        # Look for exported stat files
-        stat_files = list(self.stats_dir.glob("*_2026*.json"))
+        # Look for exported stat files and the latest batch results table
+        tables = sorted(self.stats_dir.glob(TABLE_GLOB))
+        stat_files = [f for f in codec.glob_any(self.stats_dir, "*_2026*.json") if f not in tables] + tables[-1:]
 
         for stat_file in stat_files:
             try:
-                with open(stat_file, "r", encoding="utf-8") as f:
-                    data = json.load(f)
+                data = codec.load(stat_file)
+                if is_results_table(data):
+                    team_stats.extend(table_records(data))
+                else:
                     team_stats.append(data)
             except Exception as e:
                 print(f"Warning: Could not load {stat_file.name}: {e}")
@@ -0,0 +1,147 @@
+"""
+Memory-Mapped Line Scanner
+
+Finds history.jsonl line boundaries on an mmap of the file instead of
+iterating it as text, and rejects lines with cheap byte checks before
+anything is copied or decoded:
+
+- require: byte strings every kept line must contain, e.g. PROMPT_KEYS
+  for the prompt entries exports count (sessionId and display keys)
+- ts_from/ts_to: the "timestamp" value is read from the bytes and lines
+  outside the range are dropped
+
+The checks only ever drop lines the caller would drop after decoding:
+a line keeps the benefit of the doubt when its timestamp is missing,
+not a plain number or ambiguous (more than one "timestamp" key, e.g. a
+nested object). Nothing is allocated for rejected lines; surviving
+lines are sliced out as bytes (json.loads does not take memoryview, and
+views would pin the map open). scan_history() decodes survivors to str
+before json.loads, which is faster than passing bytes, whose encoding
+json.loads detects per call.
+
+Use it where a prefilter applies: for a full, unfiltered read, the
+per-line Python loop costs more than text iteration saves, so those
+readers keep iterating the file.
+"""
+
+import mmap
+import re
+from typing import Iterable, Iterator, Optional
+
+from .records import Message, parse_history_lines
+
+# Keys of the prompt entries export, compare and the analyzer count
+PROMPT_KEYS = (b'"sessionId"', b'"display"')
+
+_TS_KEY = b'"timestamp"'
+_TS_VALUE = re.compile(rb'\s*:\s*(-?\d+(?:\.\d+)?)(?=[\s,}])')
+_TS_WINDOW = 48  # Bytes after the key holding ": <number>,"
+
+
+def line_timestamp(buf, start: int, end: int) -> Optional[float]:
+    """
+    Numeric "timestamp" of the JSON line buf[start:end], read without decoding.
+
+    Returns:
+        The value, or None when absent, not a number or ambiguous
+    """
+    key = buf.find(_TS_KEY, start, end)
+    if key < 0 or buf.find(_TS_KEY, key + 1, end) >= 0:
+        return None
+    value_start = key + len(_TS_KEY)
+    match = _TS_VALUE.match(buf[value_start:min(value_start + _TS_WINDOW, end)])
+    if match is None:
+        return None
+    number = match.group(1)
+    return float(number) if b"." in number else int(number)
+
+
+def scan_buffer(
+    buf,
+    ts_from: Optional[float] = None,
+    ts_to: Optional[float] = None,
+    require: Iterable[bytes] = (),
+) -> Iterator[bytes]:
+    """
+    Yield the non-blank lines of a bytes-like buffer that pass the prefilter.
+
+    Args:
+        buf: bytes, bytearray or mmap
+        ts_from: Drop lines timestamped before this
+        ts_to: Drop lines timestamped after this
+        require: Drop lines missing any of these byte strings
+
+    Yields:
+        Line contents without the newline
+    """
+    require = tuple(require)
+    check_range = ts_from is not None or ts_to is not None
+    find = buf.find
+    size = len(buf)
+    pos = 0
+    while pos < size:
+        end = find(b"\n", pos)
+        if end < 0:
+            end = size
+        if end > pos:
+            keep = all(find(needle, pos, end) >= 0 for needle in require)
+            if keep and check_range:
+                ts = line_timestamp(buf, pos, end)
+                if ts is not None and ((ts_from is not None and ts < ts_from)
+                                       or (ts_to is not None and ts > ts_to)):
+                    keep = False
+            if keep:
+                yield buf[pos:end]
+        pos = end + 1
+
+
+def scan_lines(
+    path,
+    ts_from: Optional[float] = None,
+    ts_to: Optional[float] = None,
+    require: Iterable[bytes] = (),
+) -> Iterator[bytes]:
+    """
+    Memory-map a file and yield the lines passing the prefilter.
+
+    Only the bytes present when the scan starts are read; a trailing line
+    without newline is yielded like the others.
+
+    Args:
+        path: File to scan
+        ts_from: Drop lines timestamped before this
+        ts_to: Drop lines timestamped after this
+        require: Drop lines missing any of these byte strings
+
+    Yields:
+        Line contents (bytes) for json.loads / records.parse_history_lines
+    """
+    with open(path, "rb") as f:
+        try:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # Empty file (cannot map zero bytes)
+            return
+    with buf:
+        yield from scan_buffer(buf, ts_from, ts_to, require)
+
+
+def scan_history(
+    path,
+    ts_from: Optional[float] = None,
+    ts_to: Optional[float] = None,
+    require: Iterable[bytes] = (),
+) -> Iterator[Message]:
+    """
+    Parse the history lines of a file that pass the prefilter.
+
+    Args:
+        path: history.jsonl (uncompressed)
+        ts_from: Drop entries timestamped before this
+        ts_to: Drop entries timestamped after this
+        require: Drop lines missing any of these byte strings
+
+    Yields:
+        Message per valid entry (callers still apply their own checks)
+    """
+    lines = scan_lines(path, ts_from, ts_to, require)
+    return parse_history_lines(line.decode("utf-8", errors="replace") for line in lines)
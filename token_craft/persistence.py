@@ -0,0 +1,287 @@
+"""
+Safe File Persistence
+
+Shared write path for Token-Craft state (profile, snapshots, exports,
+rollup cube) so concurrent runs - the skill, a cron job, the analysis
+server - never leave a half-written or interleaved file behind.
+
+- Writes go to a temp file in the target's directory and are renamed
+  over the target (os.replace), so readers see the old or the new file,
+  never a partial one. fsync=True also flushes the data (and, on POSIX,
+  the directory entry) to disk before returning.
+- Writers of the same file serialize on an advisory lock held on a
+  sidecar "<name>.lock" file (the data file itself is replaced on every
+  write, so it cannot carry the lock). Read-modify-write updates hold
+  the lock across the read, so concurrent updates are not lost.
+- Locks use fcntl.flock on POSIX and msvcrt.locking on Windows; where
+  neither exists, locking is a no-op and writes are still atomic.
+"""
+
+import json
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+try:
+    import msvcrt
+except ImportError:  # POSIX
+    msvcrt = None
+
+LOCK_TIMEOUT_SEC = 30.0
+LOCK_POLL_SEC = 0.05
+
+
+class LockTimeout(TimeoutError):
+    """The lock was not acquired within the timeout."""
+
+
+class FileLock:
+    """Advisory inter-process lock on a sidecar lock file."""
+
+    def __init__(self, path: Path, shared: bool = False, timeout: Optional[float] = LOCK_TIMEOUT_SEC):
+        """
+        Initialize lock (nothing is locked until acquire() / with).
+
+        Args:
+            path: File to protect; the lock lives in "<path>.lock"
+            shared: Shared (reader) lock instead of exclusive (POSIX only)
+            timeout: Seconds to wait (None waits forever)
+        """
+        self.path = Path(path)
+        self.lock_path = self.path.with_name(self.path.name + ".lock")
+        self.shared = shared
+        self.timeout = timeout
+        self._fd = None
+
+    def _try_lock(self) -> bool:
+        try:
+            if fcntl is not None:
+                mode = fcntl.LOCK_SH if self.shared else fcntl.LOCK_EX
+                fcntl.flock(self._fd, mode | fcntl.LOCK_NB)
+            elif msvcrt is not None:
+                msvcrt.locking(self._fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+
+    def acquire(self):
+        """
+        Take the lock, polling until the timeout.
+
+        Raises:
+            LockTimeout: Another process held the lock for the whole timeout
+        """
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(str(self.lock_path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while not self._try_lock():
+            if deadline is not None and time.monotonic() >= deadline:
+                os.close(self._fd)
+                self._fd = None
+                raise LockTimeout(f"Timed out after {self.timeout}s waiting for {self.lock_path}")
+            time.sleep(LOCK_POLL_SEC)
+
+    def release(self):
+        """Release the lock (closing the descriptor drops it)."""
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            elif msvcrt is not None:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+@contextmanager
+def _maybe_lock(path: Path, lock: bool):
+    if lock:
+        with FileLock(path):
+            yield
+    else:
+        yield
+
+
+def _fsync_dir(directory: Path):
+    """Persist a rename in its directory (POSIX; no-op elsewhere)."""
+    if os.name != "posix":
+        return
+    fd = os.open(str(directory), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _unlink_quietly(name: str):
+    try:
+        os.unlink(name)
+    except OSError:
+        pass
+
+
+def _write_temp(path: Path, text: Union[str, bytes], fsync: bool) -> str:
+    """Write text (or bytes) to a new temp file next to path; returns its name."""
+    fd, tmp_name = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        binary = isinstance(text, bytes)
+        with os.fdopen(fd, "wb" if binary else "w", encoding=None if binary else "utf-8") as f:
+            f.write(text)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        # mkstemp creates 0600; keep the target's mode (or the usual 0644)
+        try:
+            mode = path.stat().st_mode & 0o777
+        except OSError:
+            mode = 0o644
+        os.chmod(tmp_name, mode)
+    except BaseException:
+        _unlink_quietly(tmp_name)
+        raise
+    return tmp_name
+
+
+def _replace(path: Path, text: Union[str, bytes], fsync: bool):
+    """Write text (or bytes) to a temp file next to path and rename it over path."""
+    tmp_name = _write_temp(path, text, fsync)
+    try:
+        os.replace(tmp_name, str(path))
+    except BaseException:
+        _unlink_quietly(tmp_name)
+        raise
+    if fsync:
+        _fsync_dir(path.parent)
+
+
+def atomic_write_text(path: Path, text: Union[str, bytes], fsync: bool = False, lock: bool = True):
+    """
+    Replace a file's contents atomically.
+
+    Args:
+        path: Target file (parent directories are created)
+        text: New contents (str is written as UTF-8, bytes as is)
+        fsync: Flush data and rename to disk before returning
+        lock: Hold the file's advisory lock while writing
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with _maybe_lock(path, lock):
+        _replace(path, text, fsync)
+
+
+def atomic_write_json(path: Path, data, indent: Optional[int] = 2, separators=None,
+                      fsync: bool = False, lock: bool = True):
+    """
+    Serialize data and replace a JSON file atomically.
+
+    Serialization happens before the file is touched, so data that cannot
+    be encoded leaves the old file in place.
+
+    Args:
+        path: Target file
+        data: JSON-serializable data
+        indent: json.dumps indent (None for compact)
+        separators: json.dumps separators
+        fsync: Flush data and rename to disk before returning
+        lock: Hold the file's advisory lock while writing
+    """
+    atomic_write_text(path, json.dumps(data, indent=indent, separators=separators), fsync=fsync, lock=lock)
+
+
+def update_json(path: Path, update: Callable[[Dict], Optional[Dict]], indent: Optional[int] = 2,
+                fsync: bool = False) -> Dict:
+    """
+    Read-modify-write a JSON object under the file's lock.
+
+    Args:
+        path: Target file (missing or empty counts as {})
+        update: Called with the current object; may modify it in place
+            or return a replacement
+        indent: json.dumps indent
+        fsync: Flush data and rename to disk before returning
+
+    Returns:
+        The object that was written
+
+    Raises:
+        ValueError: The existing file is not valid JSON (it is left as is)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with FileLock(path):
+        data = {}
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            if text.strip():
+                data = json.loads(text)
+        result = update(data)
+        if result is not None:
+            data = result
+        _replace(path, json.dumps(data, indent=indent), fsync)
+    return data
+
+
+def create_unique(path: Path, text: Union[str, bytes], fsync: bool = False) -> Path:
+    """
+    Atomically create a new file, never overwriting an existing one.
+
+    If path exists (e.g. a second run in the same second), "_1", "_2", ...
+    is appended to the stem; the names still sort after the original.
+
+    Args:
+        path: Preferred file path
+        text: Contents (str is written as UTF-8, bytes as is)
+        fsync: Flush data and rename to disk before returning
+
+    Returns:
+        Path actually written
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_name = _write_temp(path, text, fsync)
+    try:
+        candidate, n = path, 0
+        while True:
+            try:
+                # A hard link appears complete and fails if the name is
+                # taken, so picking a free name and writing it is one step
+                os.link(tmp_name, str(candidate))
+                break
+            except FileExistsError:
+                n += 1
+                candidate = path.with_name(f"{path.stem}_{n}{path.suffix}")
+            except (AttributeError, NotImplementedError, PermissionError):
+                # No hard links here (some filesystems): reserve the name, then fill it
+                try:
+                    os.close(os.open(str(candidate), os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                except FileExistsError:
+                    n += 1
+                    candidate = path.with_name(f"{path.stem}_{n}{path.suffix}")
+                    continue
+                os.replace(tmp_name, str(candidate))
+                break
+    finally:
+        _unlink_quietly(tmp_name)
+    if fsync:
+        _fsync_dir(path.parent)
+    return candidate
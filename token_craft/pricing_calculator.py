@@ -9,6 +9,8 @@ import json
 from pathlib import Path
 from typing import Dict, Optional, Tuple
 
+from .persistence import update_json
+
 
 class PricingCalculator:
     """Calculate token costs across different deployment methods."""
@@ -293,23 +295,13 @@ class PricingCalculator:
         if profile_path is None:
             profile_path = Path.home() / ".claude" / "token-craft" / "user_profile.json"
 
-        try:
-            # Load existing profile
-            if profile_path.exists():
-                with open(profile_path, 'r', encoding='utf-8') as f:
-                    profile = json.load(f)
-            else:
-                profile = {}
-
-            # Update deployment settings
+        def set_deployment(profile: Dict):
             profile["deployment_method"] = deployment
             profile["default_model"] = model
 
-            # Save
-            profile_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(profile_path, 'w', encoding='utf-8') as f:
-                json.dump(profile, f, indent=2)
-
+        try:
+            # Locked read-modify-write: a concurrent profile save cannot interleave
+            update_json(profile_path, set_deployment, fsync=True)
             return True
 
         except Exception as e:
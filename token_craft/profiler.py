@@ -0,0 +1,421 @@
+"""
+Stage Profiler
+
+Lightweight instrumentation for production runs. Code marks pipeline
+stages (load, parse, score, persist, render) and counters (lines parsed,
+sessions built, files globbed); `--profile` on any entry point prints a
+stage table on exit and can also dump cProfile stats.
+
+When profiling is off, stage() returns a shared no-op context manager and
+count() returns immediately, so instrumented code pays one global lookup
+and a function call per stage.
+
+`--memprofile` additionally traces allocations with tracemalloc: each
+stage records its traced-memory peak and net growth, and top-level stages
+(or every stage with `--memprofile=all`) list the allocation sites
+(file:line) that grew the most between stage entry and exit. Site
+snapshots cost time proportional to the number of live objects, so stage
+timings are inflated in this mode.
+
+Usage in code:
+    from token_craft import profiler
+
+    with profiler.stage("load.history") as s:
+        entries = parse(lines)
+        s.count("lines_parsed", len(entries))
+
+Usage on the command line:
+    python skill_handler.py --profile
+    python team_aggregator.py --profile=aggregate.pstats aggregate --stats-dir team/
+    python skill_handler.py --memprofile
+"""
+
+import atexit
+import os
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional
+
+_enabled = False
+_memory = False
+_site_depth = 0  # Deepest stage level that gets allocation sites (None = all)
+_stages = {}  # name -> {"calls", "total", "depth", "counters"[, "mem_peak", "mem_rise", "mem_net", "sites"]}
+_stack = []  # Running _Stage objects, innermost last
+_cprofile = None
+_cprofile_path = None
+
+MEMORY_TOP_SITES = 8
+MEMORY_MIN_SITE_BYTES = 1024
+
+# tracemalloc.reset_peak() is Python 3.9+; without it per-stage peaks are
+# the process-wide traced peak so far (an upper bound)
+_HAS_RESET_PEAK = hasattr(tracemalloc, "reset_peak")
+_IGNORED_FILES = (tracemalloc.__file__, __file__)
+
+
+class _NullStage:
+    """Stage stand-in used while profiling is disabled."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def count(self, counter: str, n: int = 1):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    """Timed stage; inclusive of any stages nested inside it."""
+
+    __slots__ = ("name", "started", "mem_start", "mem_peak", "mem_sites")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started = 0.0
+        self.mem_start = 0
+        self.mem_peak = 0
+        self.mem_sites = None
+
+    def __enter__(self):
+        record = _stages.get(self.name)
+        if record is None:
+            record = _stages[self.name] = {"calls": 0, "total": 0.0, "depth": len(_stack), "counters": {}}
+            if _memory:
+                record.update(mem_peak=0, mem_rise=0, mem_net=0, sites={})
+        if _memory:
+            self._enter_memory()
+        _stack.append(self)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.started
+        _stack.pop()
+        record = _stages[self.name]
+        record["calls"] += 1
+        record["total"] += elapsed
+        if _memory and "mem_peak" in record:
+            self._exit_memory(record)
+        return False
+
+    def count(self, counter: str, n: int = 1):
+        counters = _stages[self.name]["counters"]
+        counters[counter] = counters.get(counter, 0) + n
+
+    def _enter_memory(self):
+        current, peak = tracemalloc.get_traced_memory()
+        if _stack:
+            # Fold the parent's peak so far in before restarting the peak
+            parent = _stack[-1]
+            parent.mem_peak = max(parent.mem_peak, peak)
+        if _site_depth is None or len(_stack) <= _site_depth:
+            self.mem_sites = _site_sizes()
+        self.mem_start = tracemalloc.get_traced_memory()[0]
+        self.mem_peak = self.mem_start
+        if _HAS_RESET_PEAK:
+            tracemalloc.reset_peak()
+
+    def _exit_memory(self, record: Dict):
+        current, peak = tracemalloc.get_traced_memory()
+        self.mem_peak = max(self.mem_peak, peak)
+        record["mem_peak"] = max(record["mem_peak"], self.mem_peak)
+        record["mem_rise"] = max(record["mem_rise"], self.mem_peak - self.mem_start)
+        record["mem_net"] += current - self.mem_start
+
+        if self.mem_sites is not None:
+            before = self.mem_sites
+            growth = []
+            for site, size in _site_sizes().items():
+                diff = size - before.get(site, 0)
+                if diff >= MEMORY_MIN_SITE_BYTES:
+                    growth.append((diff, site))
+            growth.sort(reverse=True)
+
+            sites = record["sites"]
+            for diff, site in growth[:MEMORY_TOP_SITES]:
+                sites[site] = sites.get(site, 0) + diff
+            self.mem_sites = None
+
+        if _stack:
+            parent = _stack[-1]
+            parent.mem_peak = max(parent.mem_peak, self.mem_peak)
+        if _HAS_RESET_PEAK:
+            tracemalloc.reset_peak()
+
+
+def _site_sizes() -> Dict[str, int]:
+    """
+    Traced bytes per allocation site ("file:line").
+
+    Only this compact summary is kept while a stage runs, not the full
+    snapshot, so nested stages are not charged for their parents' snapshots.
+    """
+    sizes = {}
+    # Grouping first and dropping ignored files afterwards is much faster
+    # than Snapshot.filter_traces(), which matches every trace in Python
+    for stat in tracemalloc.take_snapshot().statistics("lineno"):
+        frame = stat.traceback[0]
+        if frame.filename not in _IGNORED_FILES:
+            sizes[f"{frame.filename}:{frame.lineno}"] = stat.size
+    return sizes
+
+
+def enable():
+    """Start collecting stage timings."""
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    """Stop collecting (already collected data is kept)."""
+    global _enabled, _memory
+    _enabled = False
+    if _memory:
+        _memory = False
+        tracemalloc.stop()
+
+
+def enable_memory(site_depth: Optional[int] = 0):
+    """
+    Start collecting stage timings plus tracemalloc peaks and sites.
+
+    Args:
+        site_depth: Deepest stage level (0 = top level) that records
+            allocation sites; None for every stage
+    """
+    global _memory, _site_depth
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+    _site_depth = site_depth
+    _memory = True
+    enable()
+
+
+def is_enabled() -> bool:
+    """Whether stage timings are being collected."""
+    return _enabled
+
+
+def reset():
+    """Forget all collected timings and counters."""
+    _stages.clear()
+    del _stack[:]
+
+
+def stage(name: str):
+    """
+    Context manager timing one stage.
+
+    Args:
+        name: Dotted stage name, e.g. "score.token_efficiency"
+
+    Returns:
+        Stage object with count(counter, n); a no-op when disabled
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name)
+
+
+def count(counter: str, n: int = 1):
+    """Add to a counter on the innermost running stage (no-op when disabled)."""
+    if not _enabled or not _stack:
+        return
+    counters = _stages[_stack[-1].name]["counters"]
+    counters[counter] = counters.get(counter, 0) + n
+
+
+def get_stats() -> Dict[str, Dict]:
+    """
+    Collected stages in first-seen order.
+
+    Returns:
+        Dict of stage name -> calls, total_ms, depth, counters; plus
+        mem_peak_kb, mem_rise_kb, mem_net_kb and top sites when memory
+        profiling
+    """
+    stats = {}
+    for name, record in _stages.items():
+        entry = {
+            "calls": record["calls"],
+            "total_ms": round(record["total"] * 1000, 3),
+            "depth": record["depth"],
+            "counters": dict(record["counters"]),
+        }
+        if "mem_peak" in record:
+            entry["mem_peak_kb"] = round(record["mem_peak"] / 1024, 1)
+            entry["mem_rise_kb"] = round(record["mem_rise"] / 1024, 1)
+            entry["mem_net_kb"] = round(record["mem_net"] / 1024, 1)
+            top = sorted(record["sites"].items(), key=lambda item: item[1], reverse=True)
+            entry["sites"] = [(site, round(size / 1024, 1)) for site, size in top[:MEMORY_TOP_SITES]]
+        stats[name] = entry
+    return stats
+
+
+def format_report() -> str:
+    """Render collected stages as a table (nested stages indented)."""
+    stats = get_stats()
+    if not stats:
+        return "No profiled stages recorded."
+
+    top_level_ms = sum(s["total_ms"] for s in stats.values() if s["depth"] == 0) or 1.0
+
+    lines = []
+    lines.append("=" * 78)
+    lines.append(f"{'STAGE':<34} {'CALLS':>6} {'TOTAL MS':>11} {'AVG MS':>10} {'%':>6}  COUNTERS")
+    lines.append("-" * 78)
+    for name, s in stats.items():
+        label = ("  " * s["depth"] + name)[:34]
+        avg = s["total_ms"] / s["calls"] if s["calls"] else 0.0
+        counters = ", ".join(f"{k}={v:,}" for k, v in s["counters"].items())
+        lines.append(
+            f"{label:<34} {s['calls']:>6} {s['total_ms']:>11.2f} {avg:>10.2f} "
+            f"{s['total_ms'] / top_level_ms * 100:>5.1f}%  {counters}"
+        )
+    lines.append("=" * 78)
+    return "\n".join(lines)
+
+
+def _short_site(site: str) -> str:
+    path, _, lineno = site.rpartition(":")
+    try:
+        path = os.path.relpath(path)
+    except ValueError:  # Different drive on Windows
+        pass
+    return f"{path}:{lineno}"
+
+
+def format_memory_report() -> str:
+    """Render per-stage traced-memory peaks and top allocation sites."""
+    stats = {name: s for name, s in get_stats().items() if "mem_peak_kb" in s}
+    if not stats:
+        return "No memory-profiled stages recorded."
+
+    lines = []
+    lines.append("=" * 78)
+    peak_label = "PEAK KB" if _HAS_RESET_PEAK else "PEAK KB*"
+    lines.append(f"{'STAGE':<34} {'CALLS':>6} {peak_label:>12} {'RISE KB':>11} {'NET KB':>11}")
+    lines.append("-" * 78)
+    for name, s in stats.items():
+        label = ("  " * s["depth"] + name)[:34]
+        lines.append(
+            f"{label:<34} {s['calls']:>6} {s['mem_peak_kb']:>12,.1f} "
+            f"{s['mem_rise_kb']:>11,.1f} {s['mem_net_kb']:>11,.1f}"
+        )
+        indent = "  " * (s["depth"] + 2)
+        for site, size_kb in s["sites"]:
+            lines.append(f"{indent}+{size_kb:,.1f} KB  {_short_site(site)}")
+    lines.append("-" * 78)
+    lines.append("PEAK: traced memory high-water mark inside the stage (incl. nested stages)")
+    lines.append("RISE: peak above the memory already held when the stage started")
+    lines.append("NET: traced memory still held when the stage ended; sites show the largest growth")
+    if not _HAS_RESET_PEAK:
+        lines.append("* Python < 3.9: peaks are process-wide high-water marks so far")
+    lines.append("=" * 78)
+    return "\n".join(lines)
+
+
+def _report_at_exit():
+    if _cprofile is not None:
+        _cprofile.disable()
+        if _cprofile_path:
+            _cprofile.dump_stats(_cprofile_path)
+            print(f"cProfile stats written to {_cprofile_path} "
+                  f"(inspect with: python -m pstats {_cprofile_path})", file=sys.stderr)
+        else:
+            import pstats
+            pstats.Stats(_cprofile, stream=sys.stderr).sort_stats("cumulative").print_stats(25)
+
+    print(format_report(), file=sys.stderr)
+    if _memory:
+        print(format_memory_report(), file=sys.stderr)
+
+
+def start(cprofile_path: Optional[str] = None, with_cprofile: bool = False,
+          memory: bool = False, memory_site_depth: Optional[int] = 0):
+    """
+    Enable profiling for the rest of the process and report on exit.
+
+    The stage table goes to stderr so report/JSON output on stdout is
+    unaffected.
+
+    Args:
+        cprofile_path: Also run cProfile and dump pstats to this file
+        with_cprofile: Run cProfile and print its top functions instead
+        memory: Also trace allocations per stage (much slower)
+        memory_site_depth: See enable_memory()
+    """
+    global _cprofile, _cprofile_path
+
+    if memory:
+        enable_memory(memory_site_depth)
+    else:
+        enable()
+    if cprofile_path or with_cprofile:
+        import cProfile
+        _cprofile = cProfile.Profile()
+        _cprofile_path = cprofile_path
+        _cprofile.enable()
+    atexit.register(_report_at_exit)
+
+
+def configure_from_argv(argv: List[str]) -> List[str]:
+    """
+    Handle --profile flags for entry points and strip them from argv.
+
+    --profile              stage table on exit
+    --profile=cprofile     stage table plus top cProfile functions
+    --profile=FILE         stage table plus pstats dump to FILE
+    --memprofile           stage table plus per-stage memory peaks and
+                           top allocation sites of top-level stages
+    --memprofile=all       ... with allocation sites for nested stages too
+    (--memprofile can be combined with any --profile form)
+
+    Args:
+        argv: Argument list (typically sys.argv); modified in place
+
+    Returns:
+        The same list, without profiling flags
+
+    Raises:
+        SystemExit: --memprofile= with a value other than "all"
+    """
+    remaining = []
+    selected = None
+    memory = False
+    site_depth = 0
+
+    for arg in argv:
+        if arg == "--memprofile":
+            memory = True
+        elif arg.startswith("--memprofile="):
+            value = arg.split("=", 1)[1]
+            if value != "all":
+                raise SystemExit(
+                    f"error: unknown --memprofile value {value!r} (use --memprofile or --memprofile=all)"
+                )
+            memory, site_depth = True, None
+        elif arg == "--profile":
+            selected = ""
+        elif arg.startswith("--profile="):
+            selected = arg.split("=", 1)[1]
+        else:
+            remaining.append(arg)
+
+    argv[:] = remaining
+
+    if selected is not None or memory:
+        if selected == "cprofile":
+            start(with_cprofile=True, memory=memory, memory_site_depth=site_depth)
+        else:
+            start(cprofile_path=selected or None, memory=memory, memory_site_depth=site_depth)
+
+    return argv
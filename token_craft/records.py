@@ -0,0 +1,393 @@
+"""
+Compact History Records
+
+history.jsonl entries carry keys nothing here reads (pastedContents,
+model, tool call IDs, assistant text blocks, ...). Message, ToolUse and
+Session keep only the fields scoring and analysis use, in __slots__
+instances, with session IDs, project paths, roles and tool names
+interned so repeated values share one string.
+
+The records answer dict-style get()/[] with the original JSON keys, so
+code written against raw entries and session dicts keeps working.
+
+Codebook and ProjectCodebook dictionary-encode session IDs and project
+paths to small integers at load time, so grouping, scope filtering and
+per-project aggregation run on int keys, and project display names are
+derived once per distinct path.
+
+TextDigest stands in for long prompt text in compacted history (see
+history_compactor): length, keyword matches and a short hash, answering
+the len(), lower() and "keyword in text" checks analysis makes.
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from .categories import KEYWORDS
+
+_intern = sys.intern
+
+
+class ToolUse:
+    """A tool_use content block: tool name plus the inputs scoring inspects."""
+
+    __slots__ = ("name", "file_path", "command")
+
+    def __init__(self, name: str = "", file_path: Optional[str] = None, command: Optional[str] = None):
+        self.name = _intern(name) if isinstance(name, str) else name
+        self.file_path = file_path
+        self.command = command
+
+    @classmethod
+    def from_block(cls, block: Dict) -> "ToolUse":
+        """Build from a content block dict."""
+        tool_input = block.get("input")
+        if not isinstance(tool_input, dict):
+            return cls(block.get("name", ""))
+        return cls(block.get("name", ""), tool_input.get("file_path"), tool_input.get("command"))
+
+    def get(self, key: str, default=None):
+        """dict.get() compatibility with the original content block."""
+        if key == "type":
+            return "tool_use"
+        if key == "name":
+            return self.name
+        if key == "input":
+            tool_input = {}
+            if self.file_path is not None:
+                tool_input["file_path"] = self.file_path
+            if self.command is not None:
+                tool_input["command"] = self.command
+            return tool_input
+        return default
+
+    def __repr__(self):
+        return f"ToolUse(name={self.name!r})"
+
+
+def compact_content(content):
+    """
+    Reduce message content to what scoring reads.
+
+    Strings are kept; block lists keep only tool_use blocks, as ToolUse.
+    """
+    if not isinstance(content, list):
+        return content
+    return [
+        ToolUse.from_block(block)
+        for block in content
+        if isinstance(block, dict) and block.get("type") == "tool_use"
+    ]
+
+
+_KEYWORD_BITS = {keyword: bit for bit, keyword in enumerate(KEYWORDS)}
+
+# Bytes of the text's blake2b hash kept by a TextDigest
+DIGEST_SIZE = 6
+
+
+class TextDigest:
+    """
+    Length, keyword bitmasks and short hash of a text, in place of the text.
+
+    Supports what analysis does with prompt text: len(), truthiness,
+    lower() and "keyword in text" for keywords in categories.KEYWORDS
+    (case-sensitive before lower(), like str). Other keywords raise
+    KeyError rather than answer wrongly.
+    """
+
+    __slots__ = ("length", "lower_mask", "case_mask", "digest", "lowered")
+
+    def __init__(self, length: int, lower_mask: int, case_mask: int, digest: str, lowered: bool = False):
+        self.length = length
+        self.lower_mask = lower_mask  # Keywords found in the lowercased text
+        self.case_mask = case_mask    # ... of which only found after lowercasing
+        self.digest = digest
+        self.lowered = lowered
+
+    @classmethod
+    def from_text(cls, text: str) -> "TextDigest":
+        """Digest a text."""
+        lowered = text.lower()
+        lower_mask = case_mask = 0
+        for keyword, bit in _KEYWORD_BITS.items():
+            if keyword in lowered:
+                lower_mask |= 1 << bit
+                if keyword not in text:
+                    case_mask |= 1 << bit
+        digest = hashlib.blake2b(text.encode("utf-8", errors="replace"), digest_size=DIGEST_SIZE).hexdigest()
+        return cls(len(text), lower_mask, case_mask, digest)
+
+    @classmethod
+    def from_list(cls, values: List) -> "TextDigest":
+        """Restore from to_list() output."""
+        return cls(*values)
+
+    def to_list(self) -> List:
+        """[length, lower_mask, case_mask, digest] (JSON-serializable)."""
+        return [self.length, self.lower_mask, self.case_mask, self.digest]
+
+    def lower(self) -> "TextDigest":
+        """View matching keywords case-insensitively, like str.lower()."""
+        if self.lowered:
+            return self
+        return TextDigest(self.length, self.lower_mask, self.case_mask, self.digest, lowered=True)
+
+    def __contains__(self, keyword: str) -> bool:
+        bit = _KEYWORD_BITS.get(keyword)
+        if bit is None:
+            raise KeyError(f"{keyword!r} is not in categories.KEYWORDS; compacted text cannot answer it")
+        mask = self.lower_mask if self.lowered else self.lower_mask & ~self.case_mask
+        return bool(mask >> bit & 1)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TextDigest):
+            return NotImplemented
+        return (self.digest, self.length, self.lowered) == (other.digest, other.length, other.lowered)
+
+    def __hash__(self):
+        return hash((self.digest, self.length, self.lowered))
+
+    def __repr__(self):
+        return f"TextDigest(length={self.length}, digest={self.digest!r})"
+
+
+class Message:
+    """One history.jsonl entry."""
+
+    __slots__ = ("session_id", "project", "timestamp", "display", "message", "role", "content", "tokens")
+
+    # Original JSON key -> attribute
+    KEYS = {
+        "sessionId": "session_id",
+        "project": "project",
+        "timestamp": "timestamp",
+        "display": "display",
+        "message": "message",
+        "role": "role",
+        "content": "content",
+        "tokens": "tokens",
+    }
+
+    def __init__(
+        self,
+        session_id: Optional[str] = None,
+        project: Optional[str] = None,
+        timestamp=None,
+        display: Optional[str] = None,
+        message: Optional[str] = None,
+        role: Optional[str] = None,
+        content=None,
+        tokens: Optional[int] = None,
+    ):
+        self.session_id = _intern(session_id) if isinstance(session_id, str) else session_id
+        self.project = _intern(project) if isinstance(project, str) else project
+        self.timestamp = timestamp
+        self.display = display
+        self.message = message
+        self.role = _intern(role) if isinstance(role, str) else role
+        self.content = content
+        self.tokens = tokens
+
+    @classmethod
+    def from_entry(cls, entry: Dict) -> "Message":
+        """
+        Build a record from a parsed history.jsonl entry.
+
+        Args:
+            entry: Decoded JSON object
+
+        Returns:
+            Message with every other key dropped
+        """
+        get = entry.get
+        return cls(
+            get("sessionId"),
+            get("project"),
+            get("timestamp"),
+            get("display"),
+            get("message"),
+            get("role"),
+            compact_content(get("content")),
+            get("tokens"),
+        )
+
+    def get(self, key: str, default=None):
+        """dict.get() by original JSON key; absent (None) fields return default."""
+        attr = self.KEYS.get(key)
+        if attr is None:
+            return default
+        value = getattr(self, attr)
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        attr = self.KEYS.get(key)
+        value = getattr(self, attr) if attr else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def to_dict(self) -> Dict:
+        """Present fields under their original JSON keys."""
+        return {key: getattr(self, attr) for key, attr in self.KEYS.items() if getattr(self, attr) is not None}
+
+    def __repr__(self):
+        return f"Message(session_id={self.session_id!r}, timestamp={self.timestamp!r}, role={self.role!r})"
+
+
+class Session:
+    """Messages of one session, in history order."""
+
+    __slots__ = ("session_id", "project", "timestamp", "messages")
+
+    def __init__(self, session_id: str, project: str, timestamp=None, messages: Optional[List[Message]] = None):
+        self.session_id = session_id
+        self.project = project
+        self.timestamp = timestamp
+        self.messages = messages if messages is not None else []
+
+    def get(self, key: str, default=None):
+        """dict.get() compatibility with the former session dicts."""
+        if key in self.__slots__:
+            return getattr(self, key)
+        return default
+
+    def __getitem__(self, key: str):
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __repr__(self):
+        return f"Session(session_id={self.session_id!r}, project={self.project!r}, messages={len(self.messages)})"
+
+
+class Codebook:
+    """Dictionary encoding: each distinct value gets the next small integer."""
+
+    __slots__ = ("values", "_codes")
+
+    def __init__(self):
+        self.values = []
+        self._codes = {}
+
+    def encode(self, value) -> int:
+        """Code for value, assigning a new one on first sight."""
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int):
+        """Value for a code."""
+        return self.values[code]
+
+    def code_of(self, value) -> Optional[int]:
+        """Existing code for value (None if never encoded)."""
+        return self._codes.get(value)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def project_display_name(project_path: str) -> str:
+    """Short project name shown in reports (last path component)."""
+    return Path(project_path).name if project_path != 'Unknown' else 'Unknown'
+
+
+class ProjectCodebook(Codebook):
+    """
+    Project paths encoded to ints, with display names encoded once per path.
+
+    Different paths can share a display name (two checkouts of "api");
+    name_codes maps each path code to its display-name code so reports can
+    group by name on ints.
+    """
+
+    __slots__ = ("names", "name_codes")
+
+    def __init__(self):
+        super().__init__()
+        self.names = Codebook()
+        self.name_codes = []
+
+    def encode(self, value: str) -> int:
+        """Code for a project path (display name computed on first sight)."""
+        code = self._codes.get(value)
+        if code is None:
+            code = super().encode(value)
+            self.name_codes.append(self.names.encode(project_display_name(value)))
+        return code
+
+    def name(self, code: int) -> str:
+        """Display name of a project code."""
+        return self.names.values[self.name_codes[code]]
+
+
+def as_message(entry) -> Message:
+    """Return entry as a Message (records pass through, dicts are converted)."""
+    if isinstance(entry, Message):
+        return entry
+    return Message.from_entry(entry)
+
+
+def parse_history_lines(lines: Iterable) -> Iterator[Message]:
+    """
+    Parse history.jsonl lines (str or bytes) into records.
+
+    Blank and malformed lines are skipped.
+
+    Args:
+        lines: Lines of history.jsonl
+
+    Yields:
+        Message per valid JSON object
+    """
+    from_entry = Message.from_entry
+    loads = json.loads
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = loads(line)
+        except ValueError:  # JSONDecodeError and undecodable bytes
+            continue
+        if isinstance(entry, dict):
+            yield from_entry(entry)
+
+
+def group_sessions(messages: Iterable) -> List[Session]:
+    """
+    Group messages by session ID, keeping first-seen order.
+
+    Args:
+        messages: Message records or raw entry dicts
+
+    Returns:
+        Sessions; project and timestamp come from each session's first message
+    """
+    sessions = {}
+
+    for entry in messages:
+        message = as_message(entry)
+        session_id = message.session_id
+        if session_id is None:
+            session_id = "unknown"
+
+        session = sessions.get(session_id)
+        if session is None:
+            project = message.project if message.project is not None else "unknown"
+            session = sessions[session_id] = Session(session_id, project, message.timestamp)
+        session.messages.append(message)
+
+    return list(sessions.values())
@@ -8,6 +8,7 @@ Regression occurs when:
 - Token efficiency drops 5%+ from personal best
 - Session score drops 10%+ from recent trend
 - Multiple sessions in row with declining scores
+- Per-session token usage shifts upward (streaming change-point test)
 
 Consequences:
 - Streak breaks (already handled by StreakSystem)
@@ -15,9 +16,11 @@ Consequences:
 - No absolute score penalty (encourages recovery attempts)
 """
 
-from typing import Dict, Optional, List
+from typing import Dict, Iterable, Optional, List
 from datetime import datetime, timedelta
 
+from .change_point import PageHinkley, scan
+
 
 class RegressionDetector:
     """Detects performance regression and triggers appropriate responses."""
@@ -164,6 +167,46 @@ class RegressionDetector:
             ) if has_decline else f"Declining streak broken or insufficient data",
         }
 
+    @classmethod
+    def detect_change_point(cls, session_tokens: Iterable[float], state: Optional[Dict] = None) -> Dict:
+        """
+        Detect an upward shift in per-session token usage.
+
+        Runs a Page-Hinkley test over the sessions in order with constant
+        memory. Given the state saved by the previous run, the detector
+        resumes and is fed only the sessions after those it has seen, so
+        each change point is flagged once, on the run its session arrives.
+        A history shorter than the sessions seen (rewritten or replaced)
+        starts a fresh detector.
+
+        Args:
+            session_tokens: Tokens per completed session, oldest first
+            state: result["state"] of the previous run (None: scan all)
+
+        Returns:
+            Dict with change-point status (see change_point.scan);
+            "change_points" holds only newly flagged sessions, and
+            "has_change_point" is set only for a new shift that is still
+            active. "state" is to be saved for the next run.
+        """
+        session_tokens = list(session_tokens)
+        seen = 0
+        detector = PageHinkley()
+        if state and isinstance(state.get("detector"), dict) and \
+                0 <= state.get("sessions_seen", 0) <= len(session_tokens):
+            seen = state["sessions_seen"]
+            detector = PageHinkley.from_state(state["detector"])
+
+        result = scan(session_tokens[seen:], detector)
+        result["new_sessions"] = len(session_tokens) - seen
+        result["state"] = {"sessions_seen": len(session_tokens), "detector": detector.state()}
+        result["has_change_point"] = bool(result["change_points"]) and result["active"]
+        result["reason"] = (
+            f"Tokens per session shifted up {result['shift_pct']}% "
+            f"{result['sessions_since_change']} session(s) ago"
+        ) if result["has_change_point"] else "No new shift in token usage"
+        return result
+
     @classmethod
     def analyze_regression(
         cls,
@@ -171,7 +214,8 @@ class RegressionDetector:
         current_efficiency: float,
         personal_best_efficiency: float,
         recent_scores: List[float],
-        session_history: Optional[List[Dict]] = None
+        session_history: Optional[List[Dict]] = None,
+        change_point: Optional[Dict] = None
     ) -> Dict:
         """
         Comprehensive regression analysis combining multiple signals.
@@ -182,6 +226,7 @@ class RegressionDetector:
             personal_best_efficiency: Best achieved efficiency
             recent_scores: Recent session scores
             session_history: Full session history for context
+            change_point: Output of detect_change_point() (optional signal)
 
         Returns:
             Comprehensive regression analysis dict
@@ -197,6 +242,7 @@ class RegressionDetector:
             efficiency_reg.get("has_regressed", False),
             score_reg.get("has_regressed", False),
             consecutive_reg.get("has_consecutive_decline", False),
+            bool(change_point and change_point.get("has_change_point")),
         ])
 
         # Determine severity
@@ -216,6 +262,7 @@ class RegressionDetector:
             "efficiency": efficiency_reg,
             "score": score_reg,
             "consecutive": consecutive_reg,
+            "change_point": change_point,
             "recommendation": cls._get_recommendation(severity, efficiency_reg, score_reg),
             "timestamp": datetime.now().isoformat(),
         }
@@ -333,6 +380,12 @@ class RegressionDetector:
                 f"Take a step back, identify what changed, reset your approach."
             )
 
+        if (regression_analysis.get("change_point") or {}).get("has_change_point"):
+            parts.append(
+                "📉 Your tokens per session jumped to a new, higher level recently. "
+                "Check what changed in those sessions: larger context, longer tasks, new tools."
+            )
+
         if not parts:
             parts.append("No specific recovery guidance - you're doing great!")
 
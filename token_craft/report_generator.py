@@ -101,7 +101,11 @@ class ReportGenerator:
         lines.append("=" * 50)
         lines.append("")
         lines.append(f"Rank: {rank_data['name']} {rank_data['icon']}")
-        lines.append(f"Score: {score_data['total_score']:.0f}/{score_data['max_possible']}")
+        # v3.0 scores are uncapped and carry no max_possible
+        if score_data.get("max_possible"):
+            lines.append(f"Score: {score_data['total_score']:.0f}/{score_data['max_possible']}")
+        else:
+            lines.append(f"Score: {score_data['total_score']:.0f}")
 
         next_rank = SpaceRankSystem.get_next_rank(score_data["total_score"])
         if next_rank:
@@ -0,0 +1,348 @@
+"""
+Daily Rollup Cube
+
+Pre-aggregated session-day/message/character counts keyed by
+(day, project, categories, work types), persisted next to the other
+Token-Craft state and extended incrementally from history.jsonl.
+
+Window comparisons, sprint reports and week-over-week trends sum the
+buckets of the requested days instead of rescanning the history: the
+cube holds at most one cell per day, project and category combination,
+however many messages those days had.
+
+Counting rules (same prompt entries as team_aggregator.py export and
+analyze_tokens_v2.py: entries with a sessionId and display text):
+- The unit is a session-day: a session's prompts on one local calendar
+  day. A session active on several days counts once per day, so the
+  session_days measure of a multi-day window can exceed the distinct
+  sessions an export of that window reports (messages and chars match).
+- A session-day's categories and work types are the union of its
+  prompts' matches (keyword tables in categories), stored as bitmasks,
+  so per-category session-day counts are exact when summed over any
+  window. The saved cube records a hash of the keyword tables; a cube
+  built from other tables is rebuilt.
+- chars is the total prompt length (display text).
+
+New history is read from the last byte offset; session-days of the
+most recent days stay open so prompts appended to a running session
+move it to its new category cell instead of counting it twice.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .categories import (
+    CATEGORIES, CATEGORY_NAMES, WORK_TYPES, WORK_TYPE_NAMES,
+    category_mask, category_names, work_type_mask, work_type_names
+)
+from .history_segments import SegmentedHistory
+from .persistence import atomic_write_json
+from .records import Codebook, project_display_name, parse_history_lines
+from .token_attribution import LocalDayKeys
+
+CUBE_VERSION = 2
+
+# Identifies the keyword tables (names, order and keywords) the stored bitmasks refer to
+TABLES = hashlib.blake2b(
+    json.dumps([CATEGORIES, WORK_TYPES]).encode("utf-8"), digest_size=8
+).hexdigest()
+
+# Session-days this many days before the newest day are closed
+OPEN_DAYS = 2
+
+# Measures per cell, in storage order
+MEASURES = ("session_days", "messages", "chars")
+
+# Supported query groupings
+GROUP_BY = ("total", "day", "week", "project", "category", "work_type")
+
+
+def _day_string(value) -> Optional[str]:
+    """YYYY-MM-DD for a datetime/date or string (None passes through)."""
+    if value is None or isinstance(value, str):
+        return value
+    return value.strftime("%Y-%m-%d")
+
+
+def iso_week(day: str) -> str:
+    """ISO week label ("2026-W03") of a YYYY-MM-DD day."""
+    year, week, _ = datetime.strptime(day, "%Y-%m-%d").isocalendar()
+    return f"{year}-W{week:02d}"
+
+
+class RollupCube:
+    """Daily (day, project, categories, work types) rollup of history.jsonl."""
+
+    def __init__(self, path: Optional[Path] = None):
+        """
+        Initialize an empty cube (see load() to read a saved one).
+
+        Args:
+            path: Cube file (default: ~/.claude/token-craft/rollup_cube.json)
+        """
+        if path:
+            self.path = Path(path)
+        else:
+            self.path = Path.home() / ".claude" / "token-craft" / "rollup_cube.json"
+
+        self.projects = Codebook()  # Project display names
+        # (day, project code, category mask, work type mask) -> [session_days, messages, chars]
+        self.cells = {}
+        # (session_id, day) -> [project code, category mask, work type mask, messages, chars]
+        self._open = {}
+        self._offset = 0
+        self._file_id = None
+        self._day_of = LocalDayKeys()
+
+    # Building
+
+    def add_message(self, message) -> bool:
+        """
+        Count one prompt.
+
+        Args:
+            message: records.Message (or raw entry dict)
+
+        Returns:
+            True if the entry was a countable prompt
+        """
+        session_id = message.get("sessionId")
+        display = message.get("display")
+        if session_id is None or display is None:
+            return False
+        day = self._day_of(message.get("timestamp", 0))
+        if day is None:
+            return False
+
+        categories = category_mask(display)
+        work_types = work_type_mask(display)
+        chars = len(display)
+
+        key = (session_id, day)
+        slice_ = self._open.get(key)
+        if slice_ is None:
+            project = self.projects.encode(project_display_name(message.get("project", "Unknown")))
+            self._open[key] = [project, categories, work_types, 1, chars]
+            self._add_cell((day, project, categories, work_types), 1, 1, chars)
+            return True
+
+        # Known session-day: move it to the cell of its widened category sets
+        project, old_categories, old_work_types, messages, old_chars = slice_
+        new_categories = old_categories | categories
+        new_work_types = old_work_types | work_types
+        if (new_categories, new_work_types) == (old_categories, old_work_types):
+            self._add_cell((day, project, old_categories, old_work_types), 0, 1, chars)
+        else:
+            self._add_cell((day, project, old_categories, old_work_types), -1, -messages, -old_chars)
+            self._add_cell((day, project, new_categories, new_work_types), 1, messages + 1, old_chars + chars)
+        self._open[key] = [project, new_categories, new_work_types, messages + 1, old_chars + chars]
+        return True
+
+    def _add_cell(self, key, session_days: int, messages: int, chars: int):
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = [0, 0, 0]
+        cell[0] += session_days
+        cell[1] += messages
+        cell[2] += chars
+        if cell[0] == 0 and cell[1] == 0:
+            del self.cells[key]
+
+    def add_messages(self, messages: Iterable) -> int:
+        """
+        Count prompts from an iterable of records or entry dicts.
+
+        Returns:
+            Number of prompts counted
+        """
+        counted = 0
+        for message in messages:
+            if self.add_message(message):
+                counted += 1
+        self._close_old_days()
+        return counted
+
+    def _close_old_days(self):
+        """Drop session-day state older than OPEN_DAYS before the newest day."""
+        if not self._open:
+            return
+        newest = max(day for _, day in self._open)
+        cutoff = (datetime.strptime(newest, "%Y-%m-%d") - timedelta(days=OPEN_DAYS)).strftime("%Y-%m-%d")
+        self._open = {key: value for key, value in self._open.items() if key[1] >= cutoff}
+
+    def update(self, history_path: Path) -> int:
+        """
+        Count prompts appended to history.jsonl since the last update.
+
+        The cube is rebuilt from scratch if the file was replaced or
+        truncated (e.g. rotated); a rebuild first counts the archived
+        segments (history.jsonl.1, .2.gz, ...). A trailing line without
+        newline is left for next time.
+
+        Args:
+            history_path: history.jsonl path
+
+        Returns:
+            Number of prompts counted
+        """
+        history_path = Path(history_path)
+        try:
+            st = history_path.stat()
+        except OSError:
+            return 0
+
+        file_id = [st.st_dev, st.st_ino]
+        counted = 0
+        if file_id != self._file_id or st.st_size < self._offset:
+            self.reset()
+            self._file_id = file_id
+            counted = self.add_messages(SegmentedHistory(history_path).messages(archived_only=True))
+
+        if st.st_size == self._offset:
+            return counted
+
+        with open(history_path, "rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+
+        end = data.rfind(b"\n") + 1
+        self._offset += end
+        return counted + self.add_messages(parse_history_lines(data[:end].splitlines()))
+
+    def reset(self):
+        """Forget all counts and the history read position."""
+        self.projects = Codebook()
+        self.cells = {}
+        self._open = {}
+        self._offset = 0
+        self._file_id = None
+
+    # Queries
+
+    def days(self) -> List[str]:
+        """Days with any counts, ascending."""
+        return sorted({key[0] for key in self.cells})
+
+    def rollup(
+        self,
+        date_from=None,
+        date_to=None,
+        projects: Optional[Iterable[str]] = None,
+        by: str = "total",
+    ) -> Dict[str, Dict[str, int]]:
+        """
+        Sum buckets over a window.
+
+        Args:
+            date_from: First day (YYYY-MM-DD or datetime), inclusive
+            date_to: Last day (YYYY-MM-DD or datetime), inclusive
+            projects: Project display names to include (default: all)
+            by: One of GROUP_BY; "category" and "work_type" count a
+                session-day under each of its matches, like the analyzer
+
+        Returns:
+            Dict mapping group label to {"session_days", "messages", "chars"},
+            labels in ascending order ("total" for by="total")
+        """
+        if by not in GROUP_BY:
+            raise ValueError(f"Unknown grouping {by!r}; expected one of {', '.join(GROUP_BY)}")
+
+        date_from = _day_string(date_from)
+        date_to = _day_string(date_to)
+        project_codes = None
+        if projects is not None:
+            project_codes = {self.projects.code_of(name) for name in projects}
+
+        weeks = {}
+        groups = {}
+        for (day, project, categories, work_types), cell in self.cells.items():
+            if date_from and day < date_from:
+                continue
+            if date_to and day > date_to:
+                continue
+            if project_codes is not None and project not in project_codes:
+                continue
+
+            if by == "total":
+                labels = ("total",)
+            elif by == "day":
+                labels = (day,)
+            elif by == "week":
+                week = weeks.get(day)
+                if week is None:
+                    week = weeks[day] = iso_week(day)
+                labels = (week,)
+            elif by == "project":
+                labels = (self.projects.decode(project),)
+            elif by == "category":
+                labels = category_names(categories)
+            else:
+                labels = work_type_names(work_types)
+
+            for label in labels:
+                total = groups.get(label)
+                if total is None:
+                    total = groups[label] = [0, 0, 0]
+                total[0] += cell[0]
+                total[1] += cell[1]
+                total[2] += cell[2]
+
+        return {label: dict(zip(MEASURES, groups[label])) for label in sorted(groups)}
+
+    def totals(self, date_from=None, date_to=None, projects: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Session-days, messages and chars in a window (zeros if empty)."""
+        return self.rollup(date_from, date_to, projects).get("total", dict.fromkeys(MEASURES, 0))
+
+    # Persistence
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable cube state."""
+        return {
+            "version": CUBE_VERSION,
+            "categories": CATEGORY_NAMES,
+            "work_types": WORK_TYPE_NAMES,
+            "tables": TABLES,
+            "history": {"offset": self._offset, "file_id": self._file_id},
+            "projects": self.projects.values,
+            "cells": [list(key) + cell for key, cell in sorted(self.cells.items())],
+            "open": [list(key) + value for key, value in sorted(self._open.items())],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, path: Optional[Path] = None) -> "RollupCube":
+        """
+        Restore a cube saved with to_dict().
+
+        Cubes from another version or built with different keyword
+        tables (see TABLES) come back empty (and are rebuilt on the next
+        update).
+        """
+        cube = cls(path)
+        if data.get("version") != CUBE_VERSION or data.get("tables") != TABLES:
+            return cube
+
+        for name in data.get("projects", []):
+            cube.projects.encode(name)
+        cube.cells = {tuple(row[:4]): row[4:] for row in data.get("cells", [])}
+        cube._open = {tuple(row[:2]): row[2:] for row in data.get("open", [])}
+        history = data.get("history", {})
+        cube._offset = history.get("offset", 0)
+        cube._file_id = history.get("file_id")
+        return cube
+
+    @classmethod
+    def load(cls, path: Optional[Path] = None) -> "RollupCube":
+        """Load the saved cube, or an empty one if missing or unreadable."""
+        cube = cls(path)
+        try:
+            with open(cube.path, "r", encoding="utf-8") as f:
+                return cls.from_dict(json.load(f), cube.path)
+        except (OSError, ValueError):
+            return cube
+
+    def save(self):
+        """Write the cube atomically (temp file + rename, under its lock)."""
+        atomic_write_json(self.path, self.to_dict(), indent=None, separators=(",", ":"))
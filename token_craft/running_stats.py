@@ -0,0 +1,89 @@
+"""
+Running Statistics
+
+Streaming mean/variance (Welford's algorithm) in constant memory.
+state() round-trips through JSON, so an accumulator can be saved and
+extended later (change_point.PageHinkley keeps its reference regime in
+the profile this way).
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+
+class RunningStats:
+    """Count, mean, variance, min and max of a stream of numbers."""
+
+    __slots__ = ("count", "mean", "m2", "minimum", "maximum")
+
+    def __init__(self, values: Optional[Iterable[float]] = None):
+        """
+        Initialize an accumulator.
+
+        Args:
+            values: Optional initial values
+        """
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.minimum = None
+        self.maximum = None
+        if values is not None:
+            self.extend(values)
+
+    def add(self, value: float):
+        """Add one value."""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+        if self.minimum is None or value < self.minimum:
+            self.minimum = value
+        if self.maximum is None or value > self.maximum:
+            self.maximum = value
+
+    def extend(self, values: Iterable[float]):
+        """Add every value of an iterable."""
+        for value in values:
+            self.add(value)
+
+    def __len__(self):
+        return self.count
+
+    def variance(self) -> float:
+        """Sample variance (0.0 with fewer than two values)."""
+        if self.count < 2:
+            return 0.0
+        return max(0.0, self.m2 / (self.count - 1))
+
+    def stdev(self) -> float:
+        """Sample standard deviation (0.0 with fewer than two values)."""
+        return math.sqrt(self.variance())
+
+    def cv(self) -> float:
+        """Coefficient of variation, stdev / mean (0.0 when the mean is not positive)."""
+        return self.stdev() / self.mean if self.mean > 0 else 0.0
+
+    def state(self) -> Dict:
+        """JSON-serializable state."""
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "min": self.minimum,
+            "max": self.maximum,
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "RunningStats":
+        """Restore an accumulator saved with state()."""
+        stats = cls()
+        stats.count = state.get("count", 0)
+        stats.mean = state.get("mean", 0.0)
+        stats.m2 = state.get("m2", 0.0)
+        stats.minimum = state.get("min")
+        stats.maximum = state.get("max")
+        return stats
+
+    def __repr__(self):
+        return f"RunningStats(count={self.count}, mean={self.mean:.3f}, stdev={self.stdev():.3f})"
@@ -29,13 +29,19 @@ import json
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
-import statistics
 
 from .difficulty_modifier import DifficultyModifier
 from .streak_system import StreakSystem, ComboBonus
 from .achievement_engine import AchievementEngine
 from .time_based_mechanics import TimeBasedMechanics
 from .regression_detector import RegressionDetector
+from .records import Session, group_sessions
+from .baseline_estimator import MIN_SESSIONS, StreamingBaseline
+from .categories import PRACTICE_KEYWORDS
+from .token_attribution import TokenAttribution
+from .trend_engine import TrendEngine
+from .session_columns import HistoryItemColumns, SessionColumns
+from . import profiler
 
 
 class TokenCraftScorer:
@@ -89,7 +95,7 @@ class TokenCraftScorer:
         Initialize scorer with user data.
 
         Args:
-            history_data: Parsed history.jsonl data
+            history_data: Parsed history.jsonl data (records.Message or raw dicts)
             stats_data: Parsed stats-cache.json data
             baseline: Company baseline metrics (optional)
             rank: Current user rank (1-10), used for difficulty scaling
@@ -113,35 +119,40 @@ class TokenCraftScorer:
     def _prepare_data(self):
         """Parse history and stats into usable format."""
         # Calculate basic metrics
-        self.sessions = self._group_by_sessions()
+        with profiler.stage("parse.sessions") as st:
+            self.sessions = self._group_by_sessions()
+            st.count("sessions_built", len(self.sessions))
+            st.count("entries_grouped", len(self.history_data))
+
+        # Real per-day token mass (dailyModelTokens) joined to sessions
+        with profiler.stage("parse.attribution") as st:
+            self.attribution = TokenAttribution(self.sessions, self.stats_data)
+            st.count("days_matched", self.attribution.days_matched)
+
+        with profiler.stage("parse.columns"):
+            # Per-session counts/tokens/lengths, reduced by several categories
+            self.columns = SessionColumns(
+                self.sessions, attributed_tokens=self.attribution.covered_tokens()
+            )
         self.total_sessions = len(self.sessions)
-        self.total_messages = sum(len(s["messages"]) for s in self.sessions)
+        self.total_messages = self.columns.message_counts.total()
+
+        # Per-session tokens for baseline and trend metrics: recorded on
+        # history entries when present, else attributed from daily totals
+        recorded_tokens = self.columns.token_totals.positive()
+        self.session_tokens = recorded_tokens if len(recorded_tokens) else self.columns.attributed_tokens.positive()
 
         # Calculate tokens
         self.total_tokens = self._calculate_total_tokens()
         self.avg_tokens_per_session = self.total_tokens / self.total_sessions if self.total_sessions > 0 else 0
 
         # Calculate dynamic baseline
-        self.dynamic_baseline = self._calculate_dynamic_baseline()
-
-    def _group_by_sessions(self) -> List[Dict]:
-        """Group history data by session."""
-        sessions = {}
+        with profiler.stage("parse.baseline"):
+            self.dynamic_baseline = self._calculate_dynamic_baseline()
 
-        for entry in self.history_data:
-            session_id = entry.get("sessionId", "unknown")
-
-            if session_id not in sessions:
-                sessions[session_id] = {
-                    "session_id": session_id,
-                    "messages": [],
-                    "project": entry.get("project", "unknown"),
-                    "timestamp": entry.get("timestamp")
-                }
-
-            sessions[session_id]["messages"].append(entry)
-
-        return list(sessions.values())
+    def _group_by_sessions(self) -> List[Session]:
+        """Group history data by session (raw dicts become compact records)."""
+        return group_sessions(self.history_data)
 
     def _calculate_total_tokens(self) -> int:
         """Calculate total tokens from stats data."""
@@ -168,59 +179,22 @@ class TokenCraftScorer:
         Returns:
             Dynamic baseline in tokens per session
         """
-        # Need at least 10 sessions for meaningful dynamic baseline
-        if self.total_sessions < 10:
-            return self.baseline["tokens_per_session"]
-
-        # Calculate tokens per session for each session
-        # We need to distribute total tokens across sessions proportionally
-        if self.total_sessions == 0:
-            return self.baseline["tokens_per_session"]
-
-        # For now, use average as approximation
-        # TODO: Track per-session tokens in history.jsonl for more accuracy
-        session_tokens = []
-        tokens_per_session_avg = self.avg_tokens_per_session
-
-        # Simple model: assume roughly similar distribution
-        # In future, enhance history.jsonl to track per-session tokens
-        for session in self.sessions:
-            # Estimate: distribute total tokens proportionally by message count
-            if self.total_messages > 0:
-                session_msg_count = len(session["messages"])
-                estimated_tokens = (session_msg_count / self.total_messages) * self.total_tokens
-                session_tokens.append(estimated_tokens)
-
-        if not session_tokens:
-            return self.baseline["tokens_per_session"]
-
-        # Sort to find best performing sessions (lowest tokens)
-        session_tokens_sorted = sorted(session_tokens)
-
-        # Get P25 (best 25%)
-        p25_index = len(session_tokens_sorted) // 4
-        if p25_index == 0:
-            p25_index = 1
-
-        best_sessions = session_tokens_sorted[:p25_index]
-        best_avg = statistics.mean(best_sessions)
-
-        # Set baseline as 90% of best quartile (10% improvement target)
-        dynamic_baseline = best_avg * 0.90
-
-        # Don't set impossibly low baseline (min 15000 tokens - reasonable for any session)
-        dynamic_baseline = max(15000, dynamic_baseline)
-
-        # If dynamic baseline is unreasonably low compared to user average,
-        # it means our estimation failed - use fixed baseline instead
-        if dynamic_baseline < self.avg_tokens_per_session * 0.5:
-            # Estimation failed, use fixed baseline
-            return self.baseline["tokens_per_session"]
-
-        # Don't set higher than fixed baseline (defeats purpose)
-        dynamic_baseline = min(dynamic_baseline, self.baseline["tokens_per_session"])
-
-        return round(dynamic_baseline, 0)
+        fixed = self.baseline["tokens_per_session"]
+
+        # Prefer real per-session tokens (recorded or attributed). Sessions
+        # without any (no token data on their days) are left out rather
+        # than counted as 0, so the 50%-of-average sanity floor is the mean
+        # of the covered sessions, the same ones the best quartile is from
+        if len(self.session_tokens) >= MIN_SESSIONS:
+            self.baseline_estimator = StreamingBaseline.from_counts(self.session_tokens.tolist(), fixed)
+            return self.baseline_estimator.baseline()
+
+        # Otherwise estimate: total tokens split by message share, so a
+        # histogram of message counts selects the best quartile exactly
+        # without sorting every session; the estimator can also be
+        # updated incrementally as sessions arrive
+        self.baseline_estimator = StreamingBaseline.from_counts(self.columns.message_counts.tolist(), fixed)
+        return self.baseline_estimator.baseline(self.total_tokens)
 
     def calculate_token_efficiency_score(self) -> Dict:
         """
@@ -393,8 +367,8 @@ class TokenCraftScorer:
     def _check_defer_documentation(self) -> Dict:
         """Check if user defers documentation until ready to push."""
         # Heuristic: Look for documentation keywords in messages
-        doc_keywords = ["readme", "documentation", "comment", "docstring", "docs"]
-        defer_keywords = ["defer", "later", "skip", "wait", "after"]
+        doc_keywords = PRACTICE_KEYWORDS["documentation"]
+        defer_keywords = PRACTICE_KEYWORDS["defer"]
 
         doc_sessions = 0
         deferred_sessions = 0
@@ -403,8 +377,8 @@ class TokenCraftScorer:
             has_doc_request = False
             has_defer = False
 
-            for msg in session["messages"]:
-                content = msg.get("message", "").lower()
+            for msg in session.messages:
+                content = (msg.message or "").lower()
 
                 if any(kw in content for kw in doc_keywords):
                     has_doc_request = True
@@ -433,7 +407,7 @@ class TokenCraftScorer:
         # Get top 3 projects by usage
         project_counts = {}
         for session in self.sessions:
-            project = session["project"]
+            project = session.project
             project_counts[project] = project_counts.get(project, 0) + 1
 
         top_projects = sorted(project_counts.items(), key=lambda x: x[1], reverse=True)[:3]
@@ -470,9 +444,9 @@ class TokenCraftScorer:
         # Also check average message length
         if self.total_messages > 0:
             avg_msg_length = sum(
-                len(msg.get("message", ""))
+                len(msg.message or "")
                 for session in self.sessions
-                for msg in session["messages"]
+                for msg in session.messages
             ) / self.total_messages
 
             # If average message is under 200 chars, consider concise
@@ -497,10 +471,10 @@ class TokenCraftScorer:
         # Count Read/Bash tool calls (these could be done directly)
         ai_command_count = 0
         for session in self.sessions:
-            for msg in session["messages"]:
+            for msg in session.messages:
                 # Check if AI was asked to run simple commands
-                content = msg.get("message", "").lower()
-                simple_cmds = ["git log", "git status", "cat ", "ls ", "grep ", "show me"]
+                content = (msg.message or "").lower()
+                simple_cmds = PRACTICE_KEYWORDS["simple_commands"]
 
                 if any(cmd in content for cmd in simple_cmds):
                     ai_command_count += 1
@@ -556,12 +530,12 @@ class TokenCraftScorer:
         Anthropic recommends structuring prompts with XML tags like:
         <document>, <task>, <context>, <example>, etc.
         """
-        xml_keywords = ["<document>", "<task>", "<context>", "<example>", "<input>", "<output>", "</"]
+        xml_keywords = PRACTICE_KEYWORDS["xml"]
 
         xml_sessions = 0
         for session in self.sessions:
-            for msg in session["messages"]:
-                content = msg.get("message", "")
+            for msg in session.messages:
+                content = (msg.message or "")
                 if any(kw in content for kw in xml_keywords):
                     xml_sessions += 1
                     break  # Count session once
@@ -585,12 +559,12 @@ class TokenCraftScorer:
         Anthropic recommends using CoT prompts like:
         "let's think step by step", "reasoning:", "because", etc.
         """
-        cot_keywords = ["let's think", "step by step", "reasoning:", "because", "first", "then", "therefore", "analyze"]
+        cot_keywords = PRACTICE_KEYWORDS["chain_of_thought"]
 
         cot_sessions = 0
         for session in self.sessions:
-            for msg in session["messages"]:
-                content = msg.get("message", "").lower()
+            for msg in session.messages:
+                content = (msg.message or "").lower()
                 if any(kw in content for kw in cot_keywords):
                     cot_sessions += 1
                     break  # Count session once
@@ -614,12 +588,12 @@ class TokenCraftScorer:
         Anthropic recommends providing examples like:
         "for example", "e.g.", "such as", "like this:", etc.
         """
-        example_keywords = ["for example", "e.g.", "such as", "like this:", "here's an example", "example:"]
+        example_keywords = PRACTICE_KEYWORDS["examples"]
 
         example_sessions = 0
         for session in self.sessions:
-            for msg in session["messages"]:
-                content = msg.get("message", "").lower()
+            for msg in session.messages:
+                content = (msg.message or "").lower()
                 if any(kw in content for kw in example_keywords):
                     example_sessions += 1
                     break  # Count session once
@@ -693,7 +667,13 @@ class TokenCraftScorer:
                 "message": f"Session {self.total_sessions}/10 - Establishing baseline"
             }
 
-        if not previous_snapshot:
+        # Without a snapshot, the rolling trends saved in the profile hold
+        # the previous analysis (no snapshot reload needed)
+        token_trend = TrendEngine.from_state(
+            self.user_profile.get("trends"), datetime.now()
+        ).get("avg_tokens_per_session")
+
+        if not previous_snapshot and token_trend is None:
             # No previous data, give baseline score
             return {
                 "score": 50,
@@ -705,7 +685,10 @@ class TokenCraftScorer:
             }
 
         # Compare token efficiency
-        prev_avg = previous_snapshot.get("avg_tokens_per_session", self.baseline["tokens_per_session"])
+        if previous_snapshot:
+            prev_avg = previous_snapshot.get("avg_tokens_per_session", self.baseline["tokens_per_session"])
+        else:
+            prev_avg = token_trend.last_value
         current_avg = self.avg_tokens_per_session
 
         if prev_avg == 0:
@@ -733,7 +716,7 @@ class TokenCraftScorer:
             score = 0
             status = "significant_degradation"
 
-        return {
+        result = {
             "score": score,
             "max_score": self.WEIGHTS["improvement_trend"],
             "percentage": round((score / self.WEIGHTS["improvement_trend"]) * 100, 1),
@@ -743,6 +726,12 @@ class TokenCraftScorer:
             "current_avg": round(current_avg, 0)
         }
 
+        # 7/30/90-day moving averages, EWMA and slopes of tokens/session
+        if token_trend is not None:
+            result["tokens_per_session_trend"] = token_trend.summary()
+
+        return result
+
     def calculate_best_practices_score(self) -> Dict:
         """
         Calculate Best Practices score (5%, 50 points max).
@@ -1194,38 +1183,25 @@ class TokenCraftScorer:
                 "message": "No history data available"
             }
 
+        items = HistoryItemColumns(self.history_data)
         total_sessions = len(self.history_data)
         third = max(1, total_sessions // 3)
 
-        early_sessions = self.history_data[:third]
-        recent_sessions = self.history_data[-third:]
+        # Assistant tokens per history item, early (first 1/3) vs recent (last 1/3)
+        early_tokens = items.assistant_tokens.head(third).positive()
+        recent_tokens = items.assistant_tokens.tail(third).positive()
 
-        # Calculate average tokens for early vs recent
-        early_tokens = []
-        recent_tokens = []
-
-        for session in early_sessions:
-            session_tokens = sum(
-                msg.get("tokens", 0)
-                for msg in session.get("messages", [])
-                if msg.get("role") == "assistant"
-            )
-            if session_tokens > 0:
-                early_tokens.append(session_tokens)
-
-        for session in recent_sessions:
-            session_tokens = sum(
-                msg.get("tokens", 0)
-                for msg in session.get("messages", [])
-                if msg.get("role") == "assistant"
-            )
-            if session_tokens > 0:
-                recent_tokens.append(session_tokens)
+        # Plain history entries carry no per-item tokens: compare sessions'
+        # recorded or attributed tokens instead
+        if not len(early_tokens) and not len(recent_tokens) and len(self.session_tokens):
+            session_third = max(1, len(self.session_tokens) // 3)
+            early_tokens = self.session_tokens.head(session_third)
+            recent_tokens = self.session_tokens.tail(session_third)
 
         # 1. Efficiency improvement (25 pts)
-        if early_tokens and recent_tokens:
-            early_avg = statistics.mean(early_tokens)
-            recent_avg = statistics.mean(recent_tokens)
+        if len(early_tokens) and len(recent_tokens):
+            early_avg = early_tokens.mean()
+            recent_avg = recent_tokens.mean()
             improvement = ((early_avg - recent_avg) / early_avg) * 100 if early_avg > 0 else 0
 
             if improvement >= 20:  # 20%+ improvement
@@ -1243,13 +1219,11 @@ class TokenCraftScorer:
 
         # 2. Consistency (25 pts) - check if maintaining good practices
         # Count sessions with optimal message count (5-15 messages)
-        optimal_sessions = 0
-        for session in recent_sessions:
-            message_count = len(session.get("messages", []))
-            if 5 <= message_count <= 15:
-                optimal_sessions += 1
+        early_msg_counts = items.message_counts.head(third)
+        recent_msg_counts = items.message_counts.tail(third)
+        optimal_sessions = recent_msg_counts.count_between(5, 15)
 
-        consistency_pct = (optimal_sessions / len(recent_sessions)) * 100 if recent_sessions else 0
+        consistency_pct = (optimal_sessions / len(recent_msg_counts)) * 100 if len(recent_msg_counts) else 0
 
         if consistency_pct >= 70:
             consistency_score = 25
@@ -1261,12 +1235,9 @@ class TokenCraftScorer:
             consistency_score = 0
 
         # 3. Autonomy growth (25 pts) - fewer messages per session over time
-        early_msg_counts = [len(s.get("messages", [])) for s in early_sessions]
-        recent_msg_counts = [len(s.get("messages", [])) for s in recent_sessions]
-
-        if early_msg_counts and recent_msg_counts:
-            early_avg_msgs = statistics.mean(early_msg_counts)
-            recent_avg_msgs = statistics.mean(recent_msg_counts)
+        if len(early_msg_counts) and len(recent_msg_counts):
+            early_avg_msgs = early_msg_counts.mean()
+            recent_avg_msgs = recent_msg_counts.mean()
 
             # Lower message count = more autonomy (doing more yourself)
             if recent_avg_msgs < early_avg_msgs * 0.8:  # 20%+ reduction
@@ -1315,37 +1286,21 @@ class TokenCraftScorer:
         waste_signals = 0
 
         # Check for varied message lengths (indicates refinement)
-        message_lengths = []
-        for session in self.sessions:
-            for msg in session.get("messages", []):
-                content = msg.get("content", "")
-                if isinstance(content, str):
-                    message_lengths.append(len(content))
-
-        if message_lengths and len(message_lengths) > 10:
-            # Calculate coefficient of variation
-            mean_length = statistics.mean(message_lengths)
-            std_dev = statistics.stdev(message_lengths) if len(message_lengths) > 1 else 0
+        message_lengths = self.columns.content_lengths  # RunningStats, constant memory
 
+        if message_lengths.count > 10:
             # High variation (CV > 0.5) indicates attempts at varied prompt lengths
-            cv = std_dev / mean_length if mean_length > 0 else 0
-            if cv > 0.5:
+            if message_lengths.cv() > 0.5:
                 waste_signals += 1
 
         # Check for gradually decreasing tokens per session (trend toward efficiency)
-        session_tokens = []
-        for session in self.sessions:
-            session_total = 0
-            for msg in session.get("messages", []):
-                session_total += msg.get("tokens", 0)
-            if session_total > 0:
-                session_tokens.append(session_total)
+        session_tokens = self.session_tokens
 
         if len(session_tokens) >= 5:
             # Compare first 1/3 vs last 1/3
             third = len(session_tokens) // 3
-            early_avg = statistics.mean(session_tokens[:third]) if third > 0 else 0
-            late_avg = statistics.mean(session_tokens[-third:]) if third > 0 else 0
+            early_avg = session_tokens.head(third).mean()
+            late_avg = session_tokens.tail(third).mean()
 
             if early_avg > 0 and late_avg < early_avg:
                 improvement = ((early_avg - late_avg) / early_avg) * 100
@@ -1353,7 +1308,7 @@ class TokenCraftScorer:
                     waste_signals += 1
 
         # Check for project-specific optimization (multiple projects)
-        projects = {s.get("project", "unknown") for s in self.sessions}
+        projects = {s.project for s in self.sessions}
         if len(projects) >= 3:  # Using at least 3 different project contexts
             waste_signals += 1
 
@@ -1408,18 +1363,28 @@ class TokenCraftScorer:
             Complete score breakdown with bonuses
         """
         # Calculate each category (v3.0: 10 categories, no self_sufficiency)
-        token_efficiency = self.calculate_token_efficiency_score()
-        optimization_adoption = self.calculate_optimization_adoption_score()
-        improvement_trend = self.calculate_improvement_trend_score(previous_snapshot)
-        waste_awareness = self.calculate_waste_awareness_score()
-        best_practices = self.calculate_best_practices_score()
+        with profiler.stage("score.token_efficiency"):
+            token_efficiency = self.calculate_token_efficiency_score()
+        with profiler.stage("score.optimization_adoption"):
+            optimization_adoption = self.calculate_optimization_adoption_score()
+        with profiler.stage("score.improvement_trend"):
+            improvement_trend = self.calculate_improvement_trend_score(previous_snapshot)
+        with profiler.stage("score.waste_awareness"):
+            waste_awareness = self.calculate_waste_awareness_score()
+        with profiler.stage("score.best_practices"):
+            best_practices = self.calculate_best_practices_score()
 
         # New categories
-        cache_effectiveness = self.calculate_cache_effectiveness_score()
-        tool_efficiency = self.calculate_tool_efficiency_score()
-        cost_efficiency = self.calculate_cost_efficiency_score()
-        session_focus = self.calculate_session_focus_score()
-        learning_growth = self.calculate_learning_growth_score()
+        with profiler.stage("score.cache_effectiveness"):
+            cache_effectiveness = self.calculate_cache_effectiveness_score()
+        with profiler.stage("score.tool_efficiency"):
+            tool_efficiency = self.calculate_tool_efficiency_score()
+        with profiler.stage("score.cost_efficiency"):
+            cost_efficiency = self.calculate_cost_efficiency_score()
+        with profiler.stage("score.session_focus"):
+            session_focus = self.calculate_session_focus_score()
+        with profiler.stage("score.learning_growth"):
+            learning_growth = self.calculate_learning_growth_score()
 
         # Sum base scores
         base_total_score = (
@@ -1480,11 +1445,19 @@ class TokenCraftScorer:
         personal_best_efficiency = token_efficiency.get("personal_best_efficiency", current_efficiency)
         recent_scores = self.user_profile.get("recent_session_scores", [])
 
+        # Change-point detector resumes from the profile and sees only new
+        # sessions; the newest one may still be in progress, so it waits
+        change_point = self.regression_detector.detect_change_point(
+            self.session_tokens.tolist()[:-1],
+            self.user_profile.get("change_point_state"),
+        )
+
         regression_analysis = self.regression_detector.analyze_regression(
             current_score=final_score,
             current_efficiency=current_efficiency,
             personal_best_efficiency=personal_best_efficiency,
             recent_scores=recent_scores,
+            change_point=change_point,
         )
 
         # Apply time-based mechanics (recency bonus, inactivity decay)
@@ -1562,6 +1535,7 @@ class TokenCraftScorer:
                 "severity": regression_analysis.get("severity", "none"),
                 "efficiency": regression_analysis.get("efficiency", {}),
                 "score": regression_analysis.get("score", {}),
+                "change_point": regression_analysis.get("change_point", {}),
                 "recommendation": regression_analysis.get("recommendation", ""),
             },
             "calculated_at": datetime.now().isoformat(),
@@ -0,0 +1,213 @@
+"""
+Session Columns
+
+Per-session numbers the scoring categories reduce over (message counts,
+recorded and attributed token totals), built once per scorer into integer columns instead of
+being re-collected into lists by every method. Per-message prompt
+lengths only feed dispersion metrics, so they are folded into a
+RunningStats accumulator instead of being kept.
+
+With NumPy installed, large columns are int64 arrays and sums, squares,
+filters and sorts are vectorized: from NUMPY_MIN_ROWS values once NumPy
+is imported (e.g. by preload_numpy() in the analysis server), and only
+from NUMPY_COLD_MIN_ROWS when using it would mean importing it. Smaller
+columns and installs without NumPy use plain lists. Both backends reduce to exact integer
+sums, and the mean is derived from those sums by the same Python code,
+so results are identical either way. Dispersion is computed with
+RunningStats.
+"""
+
+import importlib.util
+import sys
+from typing import Iterable, List, Optional
+
+from .records import TextDigest
+from .running_stats import RunningStats
+
+# Optional dependency - only checked here, imported on first column build
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+
+# Crossovers measured with benchmarks/column_backends.py (CPython 3.11,
+# NumPy 2.4): with NumPy loaded the scorer's column work is faster from
+# 50-100 values; it saves ~0.2 ms per 1000 values, so a ~75 ms import
+# only pays off around 400k values, more sessions than real histories have
+NUMPY_MIN_ROWS = 200
+NUMPY_COLD_MIN_ROWS = 400000
+
+
+def _numpy():
+    import numpy
+    return numpy
+
+
+def numpy_min_rows() -> int:
+    """Column size from which NumPy is used by default (depends on whether it is loaded)."""
+    return NUMPY_MIN_ROWS if "numpy" in sys.modules else NUMPY_COLD_MIN_ROWS
+
+
+def preload_numpy() -> bool:
+    """
+    Import NumPy now so later columns use it from NUMPY_MIN_ROWS values.
+
+    For long-lived processes, which pay the import once.
+
+    Returns:
+        True if NumPy is available
+    """
+    if HAS_NUMPY:
+        _numpy()
+    return HAS_NUMPY
+
+
+class Column:
+    """One integer column (NumPy array or list)."""
+
+    __slots__ = ("values", "is_numpy")
+
+    def __init__(self, values: Iterable[int], use_numpy: Optional[bool] = None):
+        """
+        Build a column.
+
+        Args:
+            values: Integers (other numbers are truncated to int)
+            use_numpy: Force a backend; default is NumPy when installed
+                and there are at least numpy_min_rows() values
+        """
+        if isinstance(values, Column):
+            values = values.values
+        elif not hasattr(values, "__len__"):
+            values = list(values)
+        if use_numpy is None:
+            use_numpy = HAS_NUMPY and len(values) >= numpy_min_rows()
+        self.is_numpy = use_numpy
+        if use_numpy:
+            np = _numpy()
+            self.values = np.asarray(values, dtype=np.int64)
+        else:
+            self.values = [int(v) for v in values]
+
+    def _wrap(self, values) -> "Column":
+        column = Column.__new__(Column)
+        column.values = values
+        column.is_numpy = self.is_numpy
+        return column
+
+    def __len__(self):
+        return len(self.values)
+
+    def total(self) -> int:
+        """Exact sum."""
+        if self.is_numpy:
+            return int(self.values.sum())
+        return sum(self.values)
+
+    def mean(self) -> float:
+        """Arithmetic mean (0.0 for an empty column)."""
+        n = len(self.values)
+        return self.total() / n if n else 0.0
+
+    def head(self, count: int) -> "Column":
+        """First count values."""
+        return self._wrap(self.values[:count])
+
+    def tail(self, count: int) -> "Column":
+        """Last count values (empty for count <= 0, unlike a [-0:] slice)."""
+        if count <= 0:
+            return self._wrap(self.values[:0])
+        return self._wrap(self.values[-count:])
+
+    def positive(self) -> "Column":
+        """Values greater than zero, in order."""
+        if self.is_numpy:
+            return self._wrap(self.values[self.values > 0])
+        return self._wrap([v for v in self.values if v > 0])
+
+    def sorted(self) -> "Column":
+        """Values in ascending order."""
+        if self.is_numpy:
+            return self._wrap(_numpy().sort(self.values))
+        return self._wrap(sorted(self.values))
+
+    def count_between(self, low: int, high: int) -> int:
+        """Number of values with low <= value <= high."""
+        if self.is_numpy:
+            return int(((self.values >= low) & (self.values <= high)).sum())
+        return sum(1 for v in self.values if low <= v <= high)
+
+    def tolist(self) -> List[int]:
+        """Values as a Python list."""
+        if self.is_numpy:
+            return self.values.tolist()
+        return list(self.values)
+
+
+class SessionColumns:
+    """Columns built once from grouped sessions (records.Session)."""
+
+    def __init__(
+        self,
+        sessions: List,
+        use_numpy: Optional[bool] = None,
+        attributed_tokens: Optional[List[int]] = None,
+    ):
+        """
+        Collect per-session columns in one pass.
+
+        Args:
+            sessions: records.Session list in scorer order
+            use_numpy: Force a backend (default: see Column)
+            attributed_tokens: Tokens of sessions covered by token
+                attribution, in session order (see token_attribution)
+        """
+        message_counts = []
+        token_totals = []
+        content_lengths = RunningStats()
+        add_length = content_lengths.add
+
+        for session in sessions:
+            messages = session.messages
+            message_counts.append(len(messages))
+            tokens = 0
+            for msg in messages:
+                tokens += msg.tokens or 0
+                # Missing content counts as an empty prompt, as before;
+                # compacted history keeps long text as a TextDigest
+                content = msg.content if msg.content is not None else ""
+                if isinstance(content, (str, TextDigest)):
+                    add_length(len(content))
+            token_totals.append(tokens)
+
+        self.message_counts = Column(message_counts, use_numpy)
+        self.token_totals = Column(token_totals, use_numpy)
+        self.content_lengths = content_lengths
+        self.attributed_tokens = Column(attributed_tokens or [], use_numpy)
+
+
+class HistoryItemColumns:
+    """
+    Columns over history_data items read as sessions.
+
+    Learning growth reads each history item's "messages" (session-shaped
+    input); plain history entries contribute zeros.
+    """
+
+    def __init__(self, history_data: List, use_numpy: Optional[bool] = None):
+        """
+        Collect per-item message counts and assistant token totals.
+
+        Args:
+            history_data: Scorer history_data
+            use_numpy: Force a backend (default: see Column)
+        """
+        message_counts = []
+        assistant_tokens = []
+
+        for item in history_data:
+            messages = item.get("messages", [])
+            message_counts.append(len(messages))
+            assistant_tokens.append(sum(
+                msg.get("tokens", 0) for msg in messages if msg.get("role") == "assistant"
+            ))
+
+        self.message_counts = Column(message_counts, use_numpy)
+        self.assistant_tokens = Column(assistant_tokens, use_numpy)
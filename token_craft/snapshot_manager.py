@@ -2,23 +2,28 @@
 Snapshot Management
 
 Creates and manages historical snapshots of user progress.
+Snapshots are indented JSON or, optionally, compact binary (see codec);
+both are read transparently.
 """
 
-import json
 from pathlib import Path
 from typing import Dict, List, Optional
 from datetime import datetime
 
+from . import codec, profiler
+from .persistence import atomic_write_text, create_unique
+
 
 class SnapshotManager:
     """Manage user progress snapshots."""
 
-    def __init__(self, snapshot_dir: Optional[Path] = None):
+    def __init__(self, snapshot_dir: Optional[Path] = None, fmt: Optional[str] = None):
         """
         Initialize snapshot manager.
 
         Args:
             snapshot_dir: Custom snapshot directory (optional)
+            fmt: Format of new snapshots, "json" or "binary" (default: codec.default_format())
         """
         if snapshot_dir:
             self.snapshot_dir = Path(snapshot_dir)
@@ -26,6 +31,11 @@ class SnapshotManager:
             self.snapshot_dir = Path.home() / ".claude" / "token-craft" / "snapshots"
 
         self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt or codec.default_format()
+
+        # (filename, snapshot) of the last snapshot this instance wrote,
+        # so long-lived callers skip re-reading it from disk
+        self._latest = None
 
     def create_snapshot(self, profile_data: Dict, score_data: Dict, rank_data: Dict) -> str:
         """
@@ -40,7 +50,7 @@ class SnapshotManager:
             Filename of created snapshot
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"snapshot_{timestamp}.json"
+        filename = f"snapshot_{timestamp}{codec.suffix_for(self.fmt)}"
         filepath = self.snapshot_dir / filename
 
         snapshot = {
@@ -52,8 +62,11 @@ class SnapshotManager:
         }
 
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(snapshot, f, indent=2)
+            blob = codec.dumps(snapshot, self.fmt)
+            # A concurrent run in the same second gets its own file
+            filename = create_unique(filepath, blob).name
+            # Cache the decoded form so it matches what a disk read returns
+            self._latest = (filename, codec.decode(blob))
             return filename
         except Exception as e:
             raise Exception(f"Failed to create snapshot: {e}")
@@ -65,6 +78,8 @@ class SnapshotManager:
             return None
 
         latest = snapshots[-1]
+        if self._latest and self._latest[0] == latest:
+            return self._latest[1]
         return self.get_snapshot(latest)
 
     def get_snapshot(self, filename: str) -> Optional[Dict]:
@@ -83,8 +98,7 @@ class SnapshotManager:
             return None
 
         try:
-            with open(filepath, "r", encoding="utf-8") as f:
-                return json.load(f)
+            return codec.load(filepath)
         except Exception as e:
             print(f"Error loading snapshot {filename}: {e}")
             return None
@@ -96,7 +110,8 @@ class SnapshotManager:
         Returns:
             List of snapshot filenames
         """
-        snapshots = list(self.snapshot_dir.glob("snapshot_*.json"))
+        snapshots = codec.glob_any(self.snapshot_dir, "snapshot_*.json")
+        profiler.count("files_globbed", len(snapshots))
         snapshots.sort()
         return [s.name for s in snapshots]
 
@@ -172,8 +187,7 @@ class SnapshotManager:
             if snapshot_data:
                 export_path = export_dir / filename
                 try:
-                    with open(export_path, "w", encoding="utf-8") as f:
-                        json.dump(snapshot_data, f, indent=2)
+                    atomic_write_text(export_path, codec.dumps(snapshot_data, codec.format_of(export_path)))
                     exported += 1
                 except Exception as e:
                     print(f"Error exporting {filename}: {e}")
@@ -1,24 +1,28 @@
 """
 Team Exporter
 
-Exports user stats for team aggregation and leaderboards.
+Exports user stats for team aggregation and leaderboards, as indented
+JSON or, optionally, compact binary (see codec).
 """
 
-import json
 from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime
 
+from . import codec
+from .persistence import create_unique
+
 
 class TeamExporter:
     """Export user statistics for team analysis."""
 
-    def __init__(self, output_dir: Optional[Path] = None):
+    def __init__(self, output_dir: Optional[Path] = None, fmt: Optional[str] = None):
         """
         Initialize team exporter.
 
         Args:
             output_dir: Directory to export stats to
+            fmt: Export format, "json" or "binary" (default: codec.default_format())
         """
         if output_dir:
             self.output_dir = Path(output_dir)
@@ -26,6 +30,7 @@ class TeamExporter:
             self.output_dir = Path.home() / ".claude" / "token-craft" / "team-exports"
 
         self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt or codec.default_format()
 
     def export_user_stats(
         self,
@@ -51,7 +56,7 @@ class TeamExporter:
 
         # Sanitize email for filename
         safe_email = user_email.replace("@", "_at_").replace(".", "_")
-        filename = f"{safe_email}_{timestamp}.json"
+        filename = f"{safe_email}_{timestamp}{codec.suffix_for(self.fmt)}"
         filepath = self.output_dir / filename
 
         export_data = {
@@ -79,21 +84,18 @@ class TeamExporter:
         }
 
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                json.dump(export_data, f, indent=2)
-
-            return filename
+            return create_unique(filepath, codec.dumps(export_data, self.fmt)).name
 
         except Exception as e:
             raise Exception(f"Failed to export stats: {e}")
 
     def get_export_count(self) -> int:
         """Get number of exported files."""
-        return len(list(self.output_dir.glob("*.json")))
+        return len(codec.glob_any(self.output_dir, "*.json"))
 
     def list_exports(self) -> list:
         """List all export files."""
-        exports = list(self.output_dir.glob("*.json"))
+        exports = codec.glob_any(self.output_dir, "*.json")
         exports.sort(key=lambda x: x.stat().st_mtime, reverse=True)
         return [e.name for e in exports]
 
@@ -103,7 +105,7 @@ class TeamExporter:
         from collections import defaultdict
         user_exports = defaultdict(list)
 
-        for export_file in self.output_dir.glob("*.json"):
+        for export_file in codec.glob_any(self.output_dir, "*.json"):
             # Extract user email from filename
             filename = export_file.stem
             user_part = filename.rsplit("_", 2)[0]  # Remove timestamp
@@ -0,0 +1,120 @@
+"""
+Token Attribution
+
+history.jsonl prompts carry no token counts; stats-cache.json only has
+totals, per model (modelUsage) and per day (dailyModelTokens). Spreading
+the grand total over sessions by message count makes a two-message
+session on a heavy day look as cheap as one on a quiet day.
+
+Attribution joins the two instead: each day's token mass is split across
+the sessions active that day, by their share of that day's messages, so
+a session's tokens are the sum of its per-day shares. Shares are
+apportioned in whole tokens (largest remainder), so a day's shares add
+up exactly to its total.
+
+Days are local calendar dates, as Claude Code writes them to
+stats-cache.json.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Every UTC offset is a multiple of 15 minutes, so all timestamps within
+# one 15-minute bucket fall on the same local date
+_BUCKET_MS = 15 * 60 * 1000
+
+
+def daily_token_totals(stats_data: Dict) -> Dict[str, int]:
+    """
+    Total tokens per day from stats-cache.json.
+
+    Args:
+        stats_data: Parsed stats-cache.json data
+
+    Returns:
+        Dict mapping "YYYY-MM-DD" to tokens across all models
+    """
+    totals = {}
+    for day in stats_data.get("dailyModelTokens") or []:
+        if not isinstance(day, dict) or not day.get("date"):
+            continue
+        models = day.get("tokensByModel") or {}
+        tokens = sum(v for v in models.values() if isinstance(v, (int, float)))
+        totals[day["date"]] = totals.get(day["date"], 0) + int(tokens)
+    return totals
+
+
+class LocalDayKeys:
+    """Timestamp -> local date string, cached per 15-minute bucket."""
+
+    def __init__(self):
+        self._cache = {}
+
+    def __call__(self, timestamp) -> Optional[str]:
+        if isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool):
+            bucket = int(timestamp) // _BUCKET_MS
+            day = self._cache.get(bucket)
+            if day is None:
+                try:
+                    day = datetime.fromtimestamp(bucket * _BUCKET_MS / 1000).strftime("%Y-%m-%d")
+                except (OverflowError, OSError, ValueError):
+                    day = ""
+                self._cache[bucket] = day
+            return day or None
+        if isinstance(timestamp, str) and len(timestamp) >= 10:
+            return timestamp[:10]  # ISO 8601
+        return None
+
+
+def _apportion(total: int, weights: Dict[int, int]) -> Dict[int, int]:
+    """Split total in proportion to weights, in whole units summing to total."""
+    weight_sum = sum(weights.values())
+    shares = {}
+    remainders = []
+    for key, weight in weights.items():
+        shares[key], remainder = divmod(total * weight, weight_sum)
+        remainders.append((-remainder, key))
+    leftover = total - sum(shares.values())
+    for _, key in sorted(remainders)[:leftover]:
+        shares[key] += 1
+    return shares
+
+
+class TokenAttribution:
+    """Per-session tokens from dailyModelTokens joined with session timestamps."""
+
+    def __init__(self, sessions: List, stats_data: Dict):
+        """
+        Attribute each day's tokens to that day's sessions.
+
+        Args:
+            sessions: records.Session list
+            stats_data: Parsed stats-cache.json data
+        """
+        daily = daily_token_totals(stats_data)
+
+        # day -> {session index: messages that day}
+        activity = {}
+        if daily:
+            day_of = LocalDayKeys()
+            for index, session in enumerate(sessions):
+                for msg in session.messages:
+                    day = day_of(msg.timestamp)
+                    if day is None or day not in daily:
+                        continue
+                    counts = activity.setdefault(day, {})
+                    counts[index] = counts.get(index, 0) + 1
+
+        # None: no message of the session falls on a day with token data
+        self.session_tokens: List[Optional[int]] = [None] * len(sessions)
+        for day, counts in activity.items():
+            for index, share in _apportion(daily[day], counts).items():
+                self.session_tokens[index] = (self.session_tokens[index] or 0) + share
+
+        self.days_matched = len(activity)
+        self.attributed_tokens = sum(daily[day] for day in activity)
+        self.unattributed_tokens = sum(daily.values()) - self.attributed_tokens
+
+    def covered_tokens(self) -> List[int]:
+        """Tokens of sessions with attributed days, in session order."""
+        return [tokens for tokens in self.session_tokens if tokens is not None]
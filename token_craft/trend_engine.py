@@ -0,0 +1,302 @@
+"""
+Rolling Trend Engine
+
+Keeps 7/30/90-day moving averages, a time-decayed EWMA and least-squares
+slopes for the total score, each category score and average tokens per
+session, updated in O(1) per analysis and persisted in the user profile
+("trends"), so trend and regression features read running state instead
+of reloading historical snapshots.
+
+Each window holds at most one bucket per day (count and sum of the
+values seen that day) plus running sums over its buckets; a new value
+updates the newest bucket and evicts buckets that fell out of the
+window, so memory is bounded by the window length in days. Reads and
+restores that are given "today" evict too, so a metric that has not
+been updated for a while does not report stale averages.
+"""
+
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+WINDOWS = (7, 30, 90)        # Days
+EWMA_HALF_LIFE_DAYS = 7.0    # A value's weight halves every 7 days
+RECENT_VALUES = 10           # Raw values kept for regression checks
+
+CATEGORIES = (
+    "token_efficiency",
+    "optimization_adoption",
+    "improvement_trend",
+    "waste_awareness",
+    "cache_effectiveness",
+    "tool_efficiency",
+    "cost_efficiency",
+    "session_focus",
+    "learning_growth",
+    "best_practices",
+)
+
+
+class _Window:
+    """Daily buckets of one window with running regression sums."""
+
+    __slots__ = ("days", "buckets", "n", "sum_v", "sum_d", "sum_dd", "sum_dv")
+
+    def __init__(self, days: int):
+        self.days = days
+        self.buckets = deque()  # [day, count, sum]
+        self.n = 0
+        self.sum_v = 0.0
+        self.sum_d = 0.0
+        self.sum_dd = 0.0
+        self.sum_dv = 0.0
+
+    def _apply(self, day: int, count: int, total: float, sign: int):
+        self.n += sign * count
+        self.sum_v += sign * total
+        self.sum_d += sign * count * day
+        self.sum_dd += sign * count * day * day
+        self.sum_dv += sign * day * total
+
+    def add(self, day: int, value: float):
+        if self.buckets and self.buckets[-1][0] == day:
+            self.buckets[-1][1] += 1
+            self.buckets[-1][2] += value
+        else:
+            self.buckets.append([day, 1, value])
+        self._apply(day, 1, value, 1)
+        self.expire(day)
+
+    def expire(self, today: int):
+        """Evict buckets older than the window (relative to today)."""
+        oldest = today - self.days + 1
+        while self.buckets and self.buckets[0][0] < oldest:
+            day, count, total = self.buckets.popleft()
+            self._apply(day, count, total, -1)
+        if not self.buckets:
+            self.n = 0
+            self.sum_v = self.sum_d = self.sum_dd = self.sum_dv = 0.0
+
+    def mean(self) -> Optional[float]:
+        return self.sum_v / self.n if self.n else None
+
+    def slope(self) -> Optional[float]:
+        """Least-squares change per day (None with fewer than two days)."""
+        if len(self.buckets) < 2:
+            return None
+        denominator = self.n * self.sum_dd - self.sum_d * self.sum_d
+        if denominator <= 0:
+            return None
+        return (self.n * self.sum_dv - self.sum_d * self.sum_v) / denominator
+
+
+class RollingSeries:
+    """Moving averages, EWMA, slopes and recent values of one metric."""
+
+    def __init__(self):
+        # Day numbers are relative to the first day seen, which keeps the
+        # regression sums small
+        self.origin = None
+        self.windows = {days: _Window(days) for days in WINDOWS}
+        self.ewma = None
+        self.last_time = None  # Days since origin (fractional)
+        self.last_value = None
+        self.count = 0
+        self.recent = deque(maxlen=RECENT_VALUES)
+
+    def _time(self, when: datetime) -> float:
+        """Days since origin (fractional) of a time."""
+        seconds = when.hour * 3600 + when.minute * 60 + when.second
+        return when.toordinal() - self.origin + seconds / 86400
+
+    def update(self, when: datetime, value: float):
+        """
+        Add one observation (O(1) amortized).
+
+        Args:
+            when: Observation time; earlier than the last one is treated as the last
+            value: Metric value
+        """
+        if self.origin is None:
+            self.origin = when.toordinal()
+        time = self._time(when)
+        if self.last_time is not None and time < self.last_time:
+            time = self.last_time
+        day = int(time)
+
+        for window in self.windows.values():
+            window.add(day, value)
+
+        if self.ewma is None:
+            self.ewma = float(value)
+        else:
+            alpha = 1 - 0.5 ** ((time - self.last_time) / EWMA_HALF_LIFE_DAYS)
+            self.ewma += alpha * (value - self.ewma)
+
+        self.last_time = time
+        self.last_value = value
+        self.count += 1
+        self.recent.append(value)
+
+    def expire(self, today: datetime):
+        """Evict buckets that fell out of their window by today."""
+        if self.origin is None:
+            return
+        day = int(max(self._time(today), self.last_time or 0))
+        for window in self.windows.values():
+            window.expire(day)
+
+    def moving_average(self, days: int, today: Optional[datetime] = None) -> Optional[float]:
+        """Mean of the values of the last `days` days (up to today, default: last update)."""
+        if today is not None:
+            self.expire(today)
+        return self.windows[days].mean()
+
+    def slope(self, days: int, today: Optional[datetime] = None) -> Optional[float]:
+        """Least-squares trend per day over the last `days` days (up to today)."""
+        if today is not None:
+            self.expire(today)
+        return self.windows[days].slope()
+
+    def summary(self, today: Optional[datetime] = None) -> Dict:
+        """
+        Rounded averages, EWMA and slopes.
+
+        Args:
+            today: Date the windows end on (default: the last update)
+        """
+        if today is not None:
+            self.expire(today)
+        summary = {"last": self.last_value, "count": self.count,
+                   "ewma": round(self.ewma, 2) if self.ewma is not None else None}
+        for days in WINDOWS:
+            average = self.moving_average(days)
+            slope = self.slope(days)
+            summary[f"ma_{days}d"] = round(average, 2) if average is not None else None
+            summary[f"slope_{days}d"] = round(slope, 3) if slope is not None else None
+        return summary
+
+    def state(self) -> Dict:
+        """JSON-serializable state (running sums are rebuilt on load)."""
+        return {
+            "origin": self.origin,
+            "ewma": self.ewma,
+            "last_time": self.last_time,
+            "last_value": self.last_value,
+            "count": self.count,
+            "recent": list(self.recent),
+            "windows": {str(days): [list(b) for b in w.buckets] for days, w in self.windows.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict, today: Optional[datetime] = None) -> "RollingSeries":
+        """
+        Restore a series saved with state().
+
+        Args:
+            state: Saved state
+            today: Evict buckets out of window as of this date (default: keep all)
+        """
+        series = cls()
+        series.origin = state.get("origin")
+        series.ewma = state.get("ewma")
+        series.last_time = state.get("last_time")
+        series.last_value = state.get("last_value")
+        series.count = state.get("count", 0)
+        series.recent.extend(state.get("recent", []))
+        for days, buckets in (state.get("windows") or {}).items():
+            window = series.windows.get(int(days))
+            if window is None:
+                continue
+            for day, count, total in buckets:
+                window.buckets.append([day, count, total])
+                window._apply(day, count, total, 1)
+        if today is not None:
+            series.expire(today)
+        return series
+
+
+class TrendEngine:
+    """Rolling trends of the total score, category scores and tokens/session."""
+
+    def __init__(self):
+        self.series = {}
+
+    @staticmethod
+    def metrics_from_score(score_data: Dict) -> Dict[str, float]:
+        """
+        Extract tracked metrics from TokenCraftScorer.calculate_total_score() output.
+
+        Returns:
+            Dict of metric name to value (missing metrics are skipped)
+        """
+        metrics = {}
+        if "total_score" in score_data:
+            metrics["total_score"] = score_data["total_score"]
+
+        breakdown = score_data.get("breakdown", {})
+        for category in CATEGORIES:
+            if isinstance(breakdown.get(category), dict) and "score" in breakdown[category]:
+                metrics[category] = breakdown[category]["score"]
+
+        details = breakdown.get("token_efficiency", {}).get("details", {})
+        if "avg_tokens_per_session" in details:
+            metrics["avg_tokens_per_session"] = details["avg_tokens_per_session"]
+        return metrics
+
+    def update(self, metrics: Dict[str, float], when: Optional[datetime] = None):
+        """
+        Add one analysis result.
+
+        Args:
+            metrics: Metric name to value (see metrics_from_score)
+            when: Analysis time (default: now)
+        """
+        when = when or datetime.now()
+        for name, value in metrics.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                series = self.series.get(name)
+                if series is None:
+                    series = self.series[name] = RollingSeries()
+                series.update(when, value)
+
+    def update_from_score(self, score_data: Dict, when: Optional[datetime] = None):
+        """Add a calculate_total_score() result (timestamped by its calculated_at)."""
+        if when is None and score_data.get("calculated_at"):
+            try:
+                when = datetime.fromisoformat(score_data["calculated_at"])
+            except (TypeError, ValueError):
+                when = None
+        self.update(self.metrics_from_score(score_data), when)
+
+    def get(self, name: str) -> Optional[RollingSeries]:
+        """Series of a metric (None if never updated)."""
+        return self.series.get(name)
+
+    def recent(self, name: str) -> List[float]:
+        """Last RECENT_VALUES values of a metric, oldest first."""
+        series = self.series.get(name)
+        return list(series.recent) if series else []
+
+    def summary(self, today: Optional[datetime] = None) -> Dict[str, Dict]:
+        """Per-metric averages, EWMA and slopes (windows ending today, default: each last update)."""
+        return {name: series.summary(today) for name, series in self.series.items()}
+
+    def state(self) -> Dict:
+        """JSON-serializable state for the user profile."""
+        return {name: series.state() for name, series in self.series.items()}
+
+    @classmethod
+    def from_state(cls, state: Optional[Dict], today: Optional[datetime] = None) -> "TrendEngine":
+        """
+        Restore an engine saved with state() (empty for None).
+
+        Args:
+            state: Saved state
+            today: Evict buckets out of window as of this date (default: keep all)
+        """
+        engine = cls()
+        for name, series_state in (state or {}).items():
+            if isinstance(series_state, dict):
+                engine.series[name] = RollingSeries.from_state(series_state, today)
+        return engine
@@ -5,15 +5,26 @@ Stores and manages user token optimization progress.
 Schema v3.0: Includes streak tracking, seasonal scoring, achievements, and legacy v2.0 data.
 """
 
+import copy
 import json
 from pathlib import Path
 from typing import Dict, Optional
 from datetime import datetime
 
+from .persistence import atomic_write_json, update_json
+from .trend_engine import TrendEngine
+
 
 class UserProfile:
     """Manage user profile and state."""
 
+    # Lists other writers only append to -> fields identifying an entry;
+    # concurrent additions are merged by that key
+    APPEND_ONLY_KEYS = {
+        "history": ("timestamp", "event"),
+        "achievements": ("id",),
+    }
+
     def __init__(self, user_email: Optional[str] = None, profile_dir: Optional[Path] = None):
         """
         Initialize user profile.
@@ -33,8 +44,15 @@ class UserProfile:
         self.profile_dir.mkdir(parents=True, exist_ok=True)
         self.profile_path = self.profile_dir / "user_profile.json"
 
-        # Load or create profile
+        # Load or create profile; _base is what was read, so save() can
+        # tell this run's changes from those of concurrent writers
+        self.data = self._load_profile()
+        self._base = copy.deepcopy(self.data)
+
+    def reload(self):
+        """Re-read the profile from disk (e.g. after another process saved it)."""
         self.data = self._load_profile()
+        self._base = copy.deepcopy(self.data)
 
     def _detect_user_email(self) -> str:
         """Try to detect user email from git config."""
@@ -187,16 +205,75 @@ class UserProfile:
             # Count from history if available
             self.data["total_messages"] = self.data.get("total_sessions", 0) * 10  # Rough estimate
 
+        # Rolling trends (moving averages, EWMA, slopes) updated in place,
+        # so trend and regression checks never reload old snapshots
+        trends = self.get_trends()
+        trends.update_from_score(score_data)
+        self.data["trends"] = trends.state()
+        self.data["recent_session_scores"] = trends.recent("total_score")
+
+        # Page-Hinkley state, so the next run only feeds it new sessions
+        change_point = score_data.get("regression_analysis", {}).get("change_point") or {}
+        if change_point.get("state"):
+            self.data["change_point_state"] = change_point["state"]
+
     def save(self):
-        """Save profile to disk."""
+        """
+        Save profile to disk (locked read-merge-write, atomic and fsynced: it is the only copy).
+
+        Only top-level keys this instance changed since it was loaded (or
+        last saved) are written over the file's current contents, so
+        changes made meanwhile by another run or by
+        PricingCalculator.update_user_deployment() are kept. New entries
+        of the append-only lists (history, achievements) are appended to
+        the file's list unless an entry with the same key (see
+        APPEND_ONLY_KEYS) is already there.
+        """
+        base = self._base
+        changed = {key: value for key, value in self.data.items() if key not in base or base[key] != value}
+        removed = [key for key in base if key not in self.data]
+
+        def merge(current: Dict) -> Dict:
+            if not current:
+                return copy.deepcopy(self.data)
+            for key, value in changed.items():
+                if key in self.APPEND_ONLY_KEYS and isinstance(current.get(key), list) \
+                        and isinstance(value, list):
+                    fields = self.APPEND_ONLY_KEYS[key]
+                    seen = {self._entry_key(item, fields) for item in base.get(key, [])}
+                    seen.update(self._entry_key(item, fields) for item in current[key])
+                    current[key] = current[key] + [
+                        copy.deepcopy(item) for item in value if self._entry_key(item, fields) not in seen
+                    ]
+                else:
+                    current[key] = copy.deepcopy(value)
+            for key in removed:
+                current.pop(key, None)
+            return current
+
         try:
-            with open(self.profile_path, "w", encoding="utf-8") as f:
-                json.dump(self.data, f, indent=2)
+            try:
+                self.data = update_json(self.profile_path, merge, fsync=True)
+            except ValueError:
+                # Unreadable file (it was ignored on load): replace it
+                atomic_write_json(self.profile_path, self.data, fsync=True)
+            self._base = copy.deepcopy(self.data)
             return True
         except Exception as e:
             print(f"Error saving profile: {e}")
             return False
 
+    @staticmethod
+    def _entry_key(item, fields: tuple) -> tuple:
+        """Identity of an append-only list entry (the whole entry if it lacks the fields)."""
+        if isinstance(item, dict) and all(field in item for field in fields):
+            return tuple(item[field] for field in fields)
+        return (json.dumps(item, sort_keys=True, default=str),)
+
+    def get_trends(self, today: Optional[datetime] = None) -> TrendEngine:
+        """Rolling trend state saved with the profile, windows ending today (default: now)."""
+        return TrendEngine.from_state(self.data.get("trends"), today or datetime.now())
+
     def get_current_state(self) -> Dict:
         """Get complete current state."""
         return self.data.copy()
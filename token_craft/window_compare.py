@@ -0,0 +1,192 @@
+"""
+Multi-Window Comparison
+
+Compares any number of named date windows (before/after, sprints, weeks)
+in one streaming pass over history.jsonl: each prompt is routed to every
+window whose days contain it, so windows share a single parse instead of
+one export and aggregate per window. Windows may overlap.
+
+Windows are whole local calendar days, both ends inclusive. Prompts are
+the entries team_aggregator.py export counts (sessionId and display
+text); tokens come from stats-cache.json dailyModelTokens for the
+window's days.
+"""
+
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .records import Codebook, project_display_name
+from .token_attribution import LocalDayKeys, daily_token_totals
+
+# Metrics compared between windows, in report order
+METRICS = (
+    "sessions",
+    "messages",
+    "active_days",
+    "avg_messages_per_session",
+    "avg_prompt_chars",
+    "tokens",
+    "tokens_per_session",
+)
+
+
+class DateWindow:
+    """A named, inclusive range of days."""
+
+    __slots__ = ("name", "date_from", "date_to")
+
+    def __init__(self, name: str, date_from: str, date_to: str):
+        """
+        Define a window.
+
+        Args:
+            name: Label shown in the report
+            date_from: First day, YYYY-MM-DD
+            date_to: Last day, YYYY-MM-DD (inclusive)
+
+        Raises:
+            ValueError: Malformed dates or date_from after date_to
+        """
+        for value in (date_from, date_to):
+            datetime.strptime(value, "%Y-%m-%d")
+        if date_from > date_to:
+            raise ValueError(f"Window {name!r} starts after it ends ({date_from} > {date_to})")
+        self.name = name
+        self.date_from = date_from
+        self.date_to = date_to
+
+    @classmethod
+    def parse(cls, spec: str) -> "DateWindow":
+        """
+        Parse "NAME=YYYY-MM-DD:YYYY-MM-DD".
+
+        Raises:
+            ValueError: Spec is not in that form
+        """
+        name, sep, dates = spec.partition("=")
+        date_from, sep2, date_to = dates.partition(":")
+        if not (sep and sep2 and name):
+            raise ValueError(f"Invalid window {spec!r}; expected NAME=YYYY-MM-DD:YYYY-MM-DD")
+        return cls(name.strip(), date_from.strip(), date_to.strip())
+
+    def __contains__(self, day: str) -> bool:
+        return self.date_from <= day <= self.date_to
+
+    def __repr__(self):
+        return f"DateWindow({self.name!r}, {self.date_from!r}, {self.date_to!r})"
+
+
+class _WindowTotals:
+    """Running totals of one window."""
+
+    __slots__ = ("messages", "chars", "days", "session_projects", "project_messages")
+
+    def __init__(self):
+        self.messages = 0
+        self.chars = 0
+        self.days = set()
+        self.session_projects = {}  # session ID -> project name code
+        self.project_messages = {}  # project name code -> messages
+
+
+def _pct_change(before: float, after: float) -> Optional[float]:
+    if not before:
+        return None
+    return round((after - before) / before * 100, 1)
+
+
+def compare_windows(
+    messages: Iterable,
+    windows: List[DateWindow],
+    stats_data: Optional[Dict] = None,
+) -> Dict:
+    """
+    Route prompts into all windows in one pass and summarize each.
+
+    Args:
+        messages: records.Message (or entry dicts), e.g. from
+            records.parse_history_lines over an open history.jsonl
+        windows: Windows to compare; deltas are against the first
+        stats_data: Parsed stats-cache.json for token totals (optional)
+
+    Returns:
+        Dict with "windows" (per-window metrics and by_project counts),
+        "deltas" (percent change of each metric vs the first window,
+        None where the first window's value is 0) and "messages_scanned"
+    """
+    totals = [_WindowTotals() for _ in windows]
+    projects = Codebook()
+    day_of = LocalDayKeys()
+    windows_of_day = {}  # day -> totals of the windows containing it
+    scanned = 0
+
+    for message in messages:
+        scanned += 1
+        session_id = message.get("sessionId")
+        display = message.get("display")
+        if session_id is None or display is None:
+            continue
+        day = day_of(message.get("timestamp", 0))
+        if day is None:
+            continue
+
+        targets = windows_of_day.get(day)
+        if targets is None:
+            targets = windows_of_day[day] = [t for w, t in zip(windows, totals) if day in w]
+        if not targets:
+            continue
+
+        project = None
+        for window_totals in targets:
+            window_totals.messages += 1
+            window_totals.chars += len(display)
+            window_totals.days.add(day)
+
+            # Sessions belong to the project of their first prompt in the window
+            code = window_totals.session_projects.get(session_id)
+            if code is None:
+                if project is None:
+                    project = projects.encode(project_display_name(message.get("project", "Unknown")))
+                code = window_totals.session_projects[session_id] = project
+            window_totals.project_messages[code] = window_totals.project_messages.get(code, 0) + 1
+
+    daily_tokens = daily_token_totals(stats_data or {})
+
+    results = []
+    for window, window_totals in zip(windows, totals):
+        sessions = len(window_totals.session_projects)
+        messages_count = window_totals.messages
+        tokens = sum(t for day, t in daily_tokens.items() if day in window)
+
+        by_project = {}
+        for code in window_totals.session_projects.values():
+            pstats = by_project.get(code)
+            if pstats is None:
+                pstats = by_project[code] = {"sessions": 0, "messages": window_totals.project_messages[code]}
+            pstats["sessions"] += 1
+
+        results.append({
+            "name": window.name,
+            "from": window.date_from,
+            "to": window.date_to,
+            "sessions": sessions,
+            "messages": messages_count,
+            "active_days": len(window_totals.days),
+            "avg_messages_per_session": round(messages_count / sessions, 2) if sessions else 0,
+            "avg_prompt_chars": round(window_totals.chars / messages_count, 1) if messages_count else 0,
+            "tokens": tokens,
+            "tokens_per_session": round(tokens / sessions) if sessions else 0,
+            "by_project": {projects.decode(code): pstats for code, pstats in by_project.items()},
+        })
+
+    deltas = []
+    if results:
+        first = results[0]
+        for result in results[1:]:
+            deltas.append({
+                "name": result["name"],
+                "vs": first["name"],
+                **{metric: _pct_change(first[metric], result[metric]) for metric in METRICS},
+            })
+
+    return {"windows": results, "deltas": deltas, "messages_scanned": scanned}